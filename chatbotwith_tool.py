@@ -1,33 +1,146 @@
-"""A Streamlit app demonstrating a LangChain agent using GPT-OSS with tool calling capabilities."""
+"""A Streamlit app demonstrating a LangChain agent using GPT-OSS with tool calling capabilities.
+
+Equipment data comes from a local SQLite store loaded from `data/equipment.csv` (see `equipment_store.py`).
+Batch tools look up many equipment codes in one tool call.
+
+Streamlit re-runs this whole script on every interaction, so anything expensive is kept across reruns:
+  - The model and its tool bindings, the tool thread pool, the equipment store and the tool result cache
+    are process-wide (`st.cache_resource`)
+  - Lookup tool results are cached per normalized equipment code (LRU + TTL)
+  - Answers are memoized per browser session and input, so a rerun makes no model or tool calls
+"""
 
 import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import streamlit as st
 from langchain.tools import tool
-from langchain_ollama import ChatOllama
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+
+from equipment_store import Equipment, EquipmentStore, normalize_code
+
+# Import the registry as the multi-agent modules do (`llm_registry`), so there is one registry
+# (one set of clients, factory and callbacks) per process, not one per import path
+MULTI_AGENT_DIR = str(Path(__file__).resolve().parent / "multi_agent")
+if MULTI_AGENT_DIR not in sys.path:
+    sys.path.append(MULTI_AGENT_DIR)
+
+from llm_registry import get_llm, warm_up  # noqa: E402
+
+# ------------------ TOOL RESULT CACHE ------------------
+
+
+class ToolResultCache:
+    """LRU + TTL cache of deterministic tool results, keyed by tool name and normalized equipment code."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0) -> None:
+        """Keep at most `max_entries` results, each for at most `ttl_seconds`."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_compute(self, tool_name: str, code: str, compute: Callable[[], str]) -> str:
+        """Return the cached result for (tool, code), computing and storing it on a miss or after expiry."""
+        return self.get_or_compute_many(tool_name, [code], lambda _: {code: compute()})[code]
+
+    def get_or_compute_many(self, tool_name: str, codes: list[str], compute_many: Callable[[list[str]], dict[str, str]]) -> dict[str, str]:
+        """Return the results for many codes, computing all misses with a single `compute_many(missing_codes)` call."""
+        results: dict[str, str] = {}
+        missing = []
+        with self._lock:
+            for code in dict.fromkeys(codes):
+                entry = self._entries.get((tool_name, code))
+                if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                    self._entries.move_to_end((tool_name, code))
+                    results[code] = entry[1]
+                    self.stats["hits"] += 1
+                else:
+                    missing.append(code)
+                    self.stats["misses"] += 1
+        if missing:
+            computed = compute_many(missing)
+            with self._lock:
+                for code, result in computed.items():
+                    self._entries[(tool_name, code)] = (time.monotonic(), result)
+                    self._entries.move_to_end((tool_name, code))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            results.update(computed)
+        return results
 
-# ✅ Use ChatOllama (supports tool calling)
-llm = ChatOllama(model="gpt-oss:latest", temperature=0)
+
+@st.cache_resource
+def get_tool_cache() -> ToolResultCache:
+    """Return the tool result cache shared by every session and rerun."""
+    return ToolResultCache()
+
+
+@st.cache_resource
+def get_equipment_store() -> EquipmentStore:
+    """Return the equipment store, bulk-loaded from the CSV once per process."""
+    return EquipmentStore.from_csv()
+
+
+tool_cache = get_tool_cache()
+store = get_equipment_store()
 
 # ------------------ TOOLS ------------------
 
 
+def _technical_details(code: str, equipment: Equipment | None) -> str:
+    """Describe the technical specifications of one piece of equipment."""
+    if equipment is None:
+        return f"No technical details found for {code}."
+    return f"Technical details for {code}: {equipment.model}, Power: {equipment.power_w} W, Dimensions: {equipment.dimensions}."
+
+
+def _history(code: str, equipment: Equipment | None) -> str:
+    """Describe the purchase and service history of one piece of equipment."""
+    if equipment is None or equipment.purchased_on is None:
+        return f"No history found for {code}."
+    return f"History for {code}: Purchased on {equipment.purchased_on}, Last serviced on {equipment.last_serviced_on or 'never'}."
+
+
+def _describe_many(tool_name: str, equipment_names: list[str], describe: Callable[[str, Equipment | None], str]) -> str:
+    """Describe many codes with one store query for the ones not cached yet, one line per code."""
+    codes = [normalize_code(name) for name in equipment_names]
+    results = tool_cache.get_or_compute_many(tool_name, codes, lambda missing: {code: describe(code, e) for code, e in store.get_many(missing).items()})
+    return "\n".join(results[code] for code in dict.fromkeys(codes))
+
+
 @tool
 def technical_document_lookup(equipment_name: str) -> str:
     """Retrieve technical specifications for an equipment code (EQ#####)."""
-    code = equipment_name.strip().upper()
-    if code in {"EQ12345", "EQ67890"}:
-        return f"Technical details for {code}: Model X, Power: 999 W, Dimensions: 50x50x50 cm."
-    return f"No technical details found for {equipment_name}."
+    code = normalize_code(equipment_name)
+    return tool_cache.get_or_compute("technical_document_lookup", code, lambda: _technical_details(code, store.get(code)))
 
 
 @tool
 def equipment_history(equipment_name: str) -> str:
     """Fetch service/purchase history for an equipment code (EQ#####)."""
-    code = equipment_name.strip().upper()
-    if code == "EQ12345":
-        return "History for EQ12345: Purchased on 2023-01-15, Last serviced on 2024-06-10."
-    return f"No history found for {equipment_name}."
+    code = normalize_code(equipment_name)
+    return tool_cache.get_or_compute("equipment_history", code, lambda: _history(code, store.get(code)))
+
+
+@tool
+def technical_document_lookup_batch(equipment_names: list[str]) -> str:
+    """Retrieve technical specifications for several equipment codes (EQ#####) in one call; use it instead of repeated single lookups."""
+    return _describe_many("technical_document_lookup", equipment_names, _technical_details)
+
+
+@tool
+def equipment_history_batch(equipment_names: list[str]) -> str:
+    """Fetch service/purchase history for several equipment codes (EQ#####) in one call; use it instead of repeated single lookups."""
+    return _describe_many("equipment_history", equipment_names, _history)
 
 
 @tool
@@ -43,14 +156,66 @@ def email_vendor(text: str) -> str:
     return "Failed to send email. No valid equipment code found."
 
 
-tools = [technical_document_lookup, equipment_history, email_vendor]
+tools = [technical_document_lookup, equipment_history, technical_document_lookup_batch, equipment_history_batch, email_vendor]
+
+# Built once: tool name -> tool
+TOOL_MAP = {t.name: t for t in tools}
+
+# Seconds a tool may run before its result is replaced by a timeout message
+DEFAULT_TOOL_TIMEOUT = 10.0
+TOOL_TIMEOUTS = {"email_vendor": 20.0}
+
 
-# ✅ Bind tools to the model
-agent_llm = llm.bind_tools(tools)
+@st.cache_resource
+def get_tool_pool() -> ThreadPoolExecutor:
+    """Return the thread pool shared by all requests, so one turn's tool calls run side by side."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool")
+
+
+@st.cache_resource
+def get_agent_llms() -> tuple[BaseChatModel, Runnable]:
+    """Return the shared ChatOllama client (supports tool calling) and its tool binding, built once per process."""
+    llm = get_llm(temperature=0)
+    warm_up()  # Start loading the model right away
+    return llm, llm.bind_tools(tools)
+
+
+tool_pool = get_tool_pool()
+
+# ✅ Model and tool bindings
+llm, agent_llm = get_agent_llms()
 
 # ------------------ AGENT LOOP ------------------
 
 
+def run_tool_calls(tool_calls: list[dict]) -> list[dict]:
+    """Run all requested tool calls concurrently and return one tool message per call, in order.
+
+    A tool that fails, is unknown or exceeds its timeout yields an error message for the model
+    instead of failing the whole turn, so a turn costs about as much as its slowest tool.
+    """
+    start = time.monotonic()
+    futures = [tool_pool.submit(TOOL_MAP[call["name"]].run, call["args"]) if call["name"] in TOOL_MAP else None for call in tool_calls]
+
+    tool_messages = []
+    for call, future in zip(tool_calls, futures, strict=True):
+        name = call["name"]
+        timeout = TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT)
+        if future is None:
+            content = f"Unknown tool: {name}."
+        else:
+            try:
+                # All calls started together, so each deadline counts from the common start
+                content = future.result(timeout=max(0.0, start + timeout - time.monotonic()))
+            except TimeoutError:
+                future.cancel()
+                content = f"Tool {name} timed out after {timeout:g}s."
+            except Exception as exc:  # noqa: BLE001
+                content = f"Tool {name} failed: {exc}"
+        tool_messages.append({"role": "tool", "content": content, "tool_call_id": call["id"]})
+    return tool_messages
+
+
 def run_agent(user_input: str) -> str:
     """Run the agent with the given user input, handling tool calls if necessary.
 
@@ -64,27 +229,9 @@ def run_agent(user_input: str) -> str:
     # Step 1: Ask model
     response = agent_llm.invoke(user_input)
 
-    # Step 2: If tool call exists
+    # Step 2: If tool call exists, execute all requested tool calls concurrently
     if response.tool_calls:
-        # Build a mapping from tool name to tool function once
-        tool_map = {t.name: t for t in tools}
-
-        # Execute all requested tool calls
-        tool_messages = []
-        for call in response.tool_calls:
-            name = call["name"]
-            args = call["args"]
-
-            tool_fn = tool_map[name]
-            tool_result = tool_fn.run(args)
-
-            tool_messages.append(
-                {
-                    "role": "tool",
-                    "content": tool_result,
-                    "tool_call_id": call["id"],
-                },
-            )
+        tool_messages = run_tool_calls(response.tool_calls)
 
         # Step 3: Send all tool results back to model
         messages = [{"role": "user", "content": user_input}, response, *tool_messages]
@@ -102,5 +249,9 @@ st.title("LangChain + GPT-OSS Tool Calling Agent")
 user_input = st.text_input("Ask something:")
 
 if user_input:
-    result = run_agent(user_input)
-    st.write("Response:", result)
+    # Reruns (any widget interaction) reuse this session's answer instead of calling the model again
+    answers = st.session_state.setdefault("answers", {})
+    key = " ".join(user_input.split())
+    if key not in answers:
+        answers[key] = run_agent(user_input)
+    st.write("Response:", answers[key])
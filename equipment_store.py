@@ -0,0 +1,108 @@
+"""Equipment Store.
+
+A local SQLite table of equipment, keyed by normalized equipment code:
+  - `load_csv` bulk-loads (upserts) rows from a CSV file in one transaction
+  - `get_many` looks up any number of codes with one indexed query per 500 codes
+
+Used by the equipment tools in `chatbotwith_tool.py`.
+"""
+
+import csv
+import logging
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CSV_PATH = Path(__file__).resolve().parent / "data" / "equipment.csv"
+
+# Stays well below SQLite's limit on query parameters
+_BATCH_SIZE = 500
+
+_COLUMNS = ("code", "model", "power_w", "dimensions", "purchased_on", "last_serviced_on")
+
+
+def normalize_code(equipment_name: str) -> str:
+    """Normalize an equipment code, e.g. " eq-12345 " -> "EQ12345"."""
+    return re.sub(r"[\s-]", "", equipment_name.upper())
+
+
+@dataclass(frozen=True)
+class Equipment:
+    """One piece of equipment: technical specification and service history."""
+
+    code: str
+    model: str
+    power_w: int
+    dimensions: str
+    purchased_on: str | None
+    last_serviced_on: str | None
+
+
+class EquipmentStore:
+    """SQLite-backed equipment table with bulk CSV loading and batch lookups."""
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        """Open (or create) the store; the default keeps it in memory."""
+        # One connection shared by the tool threads, serialized by a lock
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS equipment ("
+                "code TEXT PRIMARY KEY, model TEXT NOT NULL, power_w INTEGER NOT NULL, dimensions TEXT NOT NULL, "
+                "purchased_on TEXT, last_serviced_on TEXT) WITHOUT ROWID",
+            )
+
+    @classmethod
+    def from_csv(cls, csv_path: str | Path = DEFAULT_CSV_PATH, path: str | Path = ":memory:") -> "EquipmentStore":
+        """Create a store and load a CSV file into it."""
+        store = cls(path)
+        store.load_csv(csv_path)
+        return store
+
+    def load_csv(self, csv_path: str | Path) -> int:
+        """Insert or replace every row of a CSV file (columns as in `data/equipment.csv`); return the row count."""
+
+        def rows(reader: Iterable[dict[str, str]]) -> Iterator[tuple]:
+            for row in reader:
+                yield (
+                    normalize_code(row["code"]),
+                    row["model"],
+                    int(row["power_w"]),
+                    row["dimensions"],
+                    row.get("purchased_on") or None,
+                    row.get("last_serviced_on") or None,
+                )
+
+        with Path(csv_path).open(newline="", encoding="utf-8") as file, self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR REPLACE INTO equipment VALUES (?, ?, ?, ?, ?, ?)", rows(csv.DictReader(file)))
+            loaded = self._db.total_changes - before
+        logger.info("Loaded %d equipment rows from %s", loaded, csv_path)
+        return loaded
+
+    def get(self, code: str) -> Equipment | None:
+        """Return one piece of equipment, or None if the code is unknown."""
+        return self.get_many([code])[normalize_code(code)]
+
+    def get_many(self, codes: Iterable[str]) -> dict[str, Equipment | None]:
+        """Return every requested (normalized) code mapped to its equipment, or None if unknown."""
+        wanted = list(dict.fromkeys(normalize_code(code) for code in codes))
+        found: dict[str, Equipment | None] = dict.fromkeys(wanted)
+        with self._lock:
+            for start in range(0, len(wanted), _BATCH_SIZE):
+                batch = wanted[start : start + _BATCH_SIZE]
+                query = f"SELECT {', '.join(_COLUMNS)} FROM equipment WHERE code IN ({', '.join('?' * len(batch))})"  # noqa: S608
+                for row in self._db.execute(query, batch):
+                    found[row[0]] = Equipment(*row)
+        return found
+
+    def __len__(self) -> int:
+        """Return the number of stored equipment rows."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM equipment").fetchone()[0]
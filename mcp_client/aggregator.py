@@ -0,0 +1,96 @@
+"""Multi-Server MCP Aggregator.
+
+Connect to several MCP servers at once and expose their tools as one catalog:
+  1. All configured servers are connected in parallel (one handshake round, not N)
+  2. Tool catalogs are merged under namespaced names: "<server>__<tool>"
+  3. Each call_tool is routed to the owning server over a persistent pooled session
+
+A server that fails to connect is logged and left out; the others stay usable.
+
+Usage:
+  async with MCPAggregator({"custom": "http://localhost:8000/sse", "everything": SERVER_PARAMS}) as agg:
+      tools = await agg.list_tools()
+      result = await agg.call_tool("custom__greet", {"name": "Alice"})
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from catalog_cache import CatalogCache
+from mcp.types import CallToolResult, Tool
+from session_pool import ServerConfig, SessionPool
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_SEPARATOR = "__"
+
+
+class MCPAggregator:
+    """Aggregate the tools of several MCP servers behind a single interface."""
+
+    def __init__(self, servers: dict[str, ServerConfig], catalog_cache: CatalogCache | None = None, max_sessions_per_server: int = 2) -> None:
+        """Configure the servers to aggregate, keyed by the namespace used for their tools."""
+        for name in servers:
+            if NAMESPACE_SEPARATOR in name:
+                msg = f"Server name '{name}' must not contain '{NAMESPACE_SEPARATOR}'"
+                raise ValueError(msg)
+        self.pool = SessionPool(servers, max_sessions_per_server=max_sessions_per_server, catalog_cache=catalog_cache)
+        self.connected: list[str] = []
+        self._routes: dict[str, tuple[str, str]] = {}
+
+    async def __aenter__(self) -> "MCPAggregator":
+        """Connect to every server and load the merged catalog."""
+        await self.pool.__aenter__()
+        try:
+            await self.connect()
+        except BaseException:
+            await self.pool.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close every server session."""
+        await self.pool.close()
+
+    async def connect(self) -> None:
+        """Connect to all servers in parallel, keeping the ones that come up."""
+        names = list(self.pool.servers)
+        results = await asyncio.gather(*(self.pool.warm([name]) for name in names), return_exceptions=True)
+        self.connected = []
+        for name, result in zip(names, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning("Skipping server '%s': %s", name, result)
+            else:
+                self.connected.append(name)
+        logger.info("Connected to %d/%d servers: %s", len(self.connected), len(names), ", ".join(self.connected))
+        await self.list_tools()
+
+    async def list_tools(self) -> list[Tool]:
+        """Return the merged, namespaced tool catalog of all connected servers."""
+        catalogs = await asyncio.gather(*(self.pool.list_catalog(name, "tools") for name in self.connected), return_exceptions=True)
+        tools: list[Tool] = []
+        routes: dict[str, tuple[str, str]] = {}
+        for name, catalog in zip(self.connected, catalogs, strict=True):
+            if isinstance(catalog, Exception):
+                logger.warning("Could not list tools of server '%s': %s", name, catalog)
+                continue
+            for tool in catalog:
+                namespaced = f"{name}{NAMESPACE_SEPARATOR}{tool.name}"
+                routes[namespaced] = (name, tool.name)
+                tools.append(tool.model_copy(update={"name": namespaced}))
+        self._routes = routes
+        return tools
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> CallToolResult:
+        """Route a namespaced tool call to the server that owns the tool."""
+        server, _, _ = name.partition(NAMESPACE_SEPARATOR)
+        if name not in self._routes and server in self.connected:
+            # The server's tools may have changed since its catalog was cached
+            await self.pool.invalidate_catalog(server, "tools")
+            await self.list_tools()
+        if name not in self._routes:
+            msg = f"Unknown tool: '{name}'"
+            raise KeyError(msg)
+        server, tool = self._routes[name]
+        return await self.pool.call_tool(server, tool, arguments)
@@ -0,0 +1,190 @@
+"""MCP Catalog Cache.
+
+Cache tool, resource and prompt catalogs (including JSON schemas) so that
+reconnecting to a server does not download them again:
+  - Entries live in memory (and on disk with `cache_dir`), keyed by server name, version and capabilities
+  - Entries are fetched again after `ttl_seconds`: a server's reported version is not always its own
+    (FastMCP servers report the MCP SDK version), so the key alone cannot catch every catalog change
+  - `notifications/*/list_changed` from the server invalidates the matching entry
+  - Uncached catalogs are fetched page by page through pagination cursors, lazily
+
+Usage:
+  cache = CatalogCache(cache_dir=DEFAULT_CACHE_DIR)  # or CatalogCache() for memory only
+  handler = ListChangedHandler(cache)
+  async with stdio_client(SERVER_PARAMS) as (read, write), ClientSession(read, write, message_handler=handler) as session:
+      init_result = await session.initialize()
+      handler.key = cache.key_for(init_result)
+      tools = await cache.get(session, init_result, "tools")
+"""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any, Literal
+
+from mcp import ClientSession
+from mcp.shared.session import RequestResponder
+from mcp.types import (
+    ClientResult,
+    InitializeResult,
+    Prompt,
+    PromptListChangedNotification,
+    Resource,
+    ResourceListChangedNotification,
+    ServerNotification,
+    ServerRequest,
+    Tool,
+    ToolListChangedNotification,
+)
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+CatalogKind = Literal["tools", "resources", "prompts"]
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "mcp_client" / "catalogs"
+DEFAULT_TTL_SECONDS = 10 * 60
+
+# Model used to (de)serialize each kind of catalog entry
+_ITEM_MODELS: dict[str, type[BaseModel]] = {"tools": Tool, "resources": Resource, "prompts": Prompt}
+
+# Which catalog a list_changed notification invalidates
+_LIST_CHANGED: dict[type, CatalogKind] = {
+    ToolListChangedNotification: "tools",
+    ResourceListChangedNotification: "resources",
+    PromptListChangedNotification: "prompts",
+}
+
+
+class CatalogCache:
+    """In-memory and on-disk cache of server catalogs."""
+
+    def __init__(self, cache_dir: Path | None = None, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+        """Create the cache; pass a `cache_dir` (e.g. DEFAULT_CACHE_DIR) to also keep entries across runs.
+
+        Catalogs older than `ttl_seconds` are fetched from the server again.
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._memory: dict[tuple[str, str], tuple[float, list[Any]]] = {}  # (key, kind) -> (fetched at, items)
+        # Bumped on every invalidation so a fetch that raced a list_changed is not stored
+        self._generation: dict[str, int] = {}
+
+    @staticmethod
+    def key_for(init_result: InitializeResult) -> str:
+        """Build the cache key for a server from its name, version and capabilities."""
+        info = init_result.serverInfo
+        capabilities = init_result.capabilities.model_dump_json(exclude_none=True)
+        digest = hashlib.sha256(capabilities.encode()).hexdigest()[:12]
+        return f"{info.name}@{info.version}-{digest}"
+
+    async def get(self, session: ClientSession, init_result: InitializeResult, kind: CatalogKind = "tools") -> list[Any]:
+        """Return the full catalog, from cache if possible, otherwise from the server."""
+        return [item async for item in self.iter(session, init_result, kind)]
+
+    async def iter(self, session: ClientSession, init_result: InitializeResult, kind: CatalogKind = "tools") -> AsyncIterator[Any]:
+        """Yield catalog entries, fetching further pages from the server only as they are consumed.
+
+        The catalog is stored once every page has been fetched.
+        """
+        key = self.key_for(init_result)
+        cached = self._load(key, kind)
+        if cached is not None:
+            for item in cached:
+                yield item
+            return
+
+        lister = {"tools": session.list_tools, "resources": session.list_resources, "prompts": session.list_prompts}[kind]
+        generation = self._generation.get(key, 0)
+        items: list[Any] = []
+        cursor: str | None = None
+        while True:
+            page = await lister(cursor)
+            for item in getattr(page, kind):
+                items.append(item)
+                yield item
+            cursor = page.nextCursor
+            if not cursor:
+                break
+        if self._generation.get(key, 0) == generation:
+            self._store(key, kind, items)
+
+    def invalidate(self, key: str, kind: CatalogKind | None = None) -> None:
+        """Drop one catalog (or all catalogs when `kind` is None) for a server key."""
+        self._generation[key] = self._generation.get(key, 0) + 1
+        for k in [kind] if kind else list(_ITEM_MODELS):
+            self._memory.pop((key, k), None)
+            path = self._path(key, k)
+            if path is not None:
+                path.unlink(missing_ok=True)
+        logger.info("Invalidated cached %s for %s", kind or "catalogs", key)
+
+    def _load(self, key: str, kind: CatalogKind) -> list[Any] | None:
+        """Return a fresh cached catalog from memory, falling back to disk."""
+        entry = self._memory.get((key, kind))
+        if entry is None:
+            entry = self._load_file(key, kind)
+        if entry is None:
+            return None
+        fetched_at, items = entry
+        if time.time() - fetched_at > self.ttl_seconds:
+            self._memory.pop((key, kind), None)
+            return None
+        self._memory[key, kind] = entry
+        return items
+
+    def _load_file(self, key: str, kind: CatalogKind) -> tuple[float, list[Any]] | None:
+        """Return a catalog and its fetch time from disk, if there is a readable file."""
+        path = self._path(key, kind)
+        if path is None or not path.exists():
+            return None
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            return float(raw["fetched_at"]), [_ITEM_MODELS[kind].model_validate(item) for item in raw["items"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable catalog cache file: %s", path)
+            return None
+
+    def _store(self, key: str, kind: CatalogKind, items: list[Any]) -> None:
+        """Save a catalog in memory and on disk."""
+        fetched_at = time.time()
+        self._memory[key, kind] = (fetched_at, items)
+        path = self._path(key, kind)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"fetched_at": fetched_at, "items": [item.model_dump(mode="json", exclude_none=True) for item in items]}
+            path.write_text(json.dumps(data), encoding="utf-8")
+        except OSError:
+            logger.warning("Could not write catalog cache file: %s", path)
+
+    def _path(self, key: str, kind: CatalogKind) -> Path | None:
+        """Return the on-disk location of a catalog, or None for a memory-only cache."""
+        if self.cache_dir is None:
+            return None
+        safe_key = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.cache_dir / f"{safe_key}-{kind}.json"
+
+
+class ListChangedHandler:
+    """ClientSession message handler that invalidates cached catalogs on list_changed.
+
+    Set `key` (from `CatalogCache.key_for`) once the session is initialized.
+    """
+
+    def __init__(self, cache: CatalogCache) -> None:
+        """Bind the handler to a cache."""
+        self.cache = cache
+        self.key: str | None = None
+
+    async def __call__(self, message: RequestResponder[ServerRequest, ClientResult] | ServerNotification | Exception) -> None:
+        """Invalidate the matching catalog when the server reports a list change."""
+        if not isinstance(message, ServerNotification) or self.key is None:
+            return
+        kind = _LIST_CHANGED.get(type(message.root))
+        if kind is not None:
+            self.cache.invalidate(self.key, kind)
@@ -0,0 +1,141 @@
+"""Concurrent MCP Client Helpers.
+
+Fire independent MCP requests concurrently instead of one after another:
+  - discover: fetch tools, resources and prompts in parallel (or read them from a `CatalogCache`)
+  - call_many: run a batch of tool calls with a concurrency limit and per-call timeouts
+
+A failing or timed-out call does not abort the batch; every call gets an outcome,
+so a batch costs roughly its slowest call rather than the sum of all calls.
+
+Usage:
+  catalog = await discover(session, init_result.capabilities)
+  outcomes = await call_many(session, [ToolCall("echo", {"message": "hi"})], max_concurrency=4)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from catalog_cache import CatalogCache
+from mcp import ClientSession
+from mcp.types import CallToolResult, InitializeResult, Prompt, Resource, ServerCapabilities, Tool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_CALL_TIMEOUT = 30.0
+
+
+@dataclass
+class ServerCatalog:
+    """Everything a server advertises: tools, resources and prompts."""
+
+    tools: list[Tool] = field(default_factory=list)
+    resources: list[Resource] = field(default_factory=list)
+    prompts: list[Prompt] = field(default_factory=list)
+
+
+@dataclass
+class ToolCall:
+    """A single tool invocation in a batch."""
+
+    name: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    timeout: float | None = None
+
+
+@dataclass
+class CallOutcome:
+    """Result of one call in a batch: either a result or the error that replaced it."""
+
+    call: ToolCall
+    result: CallToolResult | None = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the call completed and the tool did not report an error."""
+        return self.error is None and self.result is not None and not self.result.isError
+
+
+async def discover(
+    session: ClientSession,
+    capabilities: ServerCapabilities | None = None,
+    *,
+    cache: CatalogCache | None = None,
+    init_result: InitializeResult | None = None,
+) -> ServerCatalog:
+    """Fetch tools, resources and prompts concurrently.
+
+    Lists the server does not advertise in `capabilities` are skipped. A list that
+    fails to load is logged and left empty so the other lists are still returned.
+    With a `cache`, pass the session's `init_result`: lists are read from the cache and only
+    fetched (every page) when missing or stale.
+    """
+    if cache is not None and init_result is None:
+        message = "discover() needs the session's init_result to use a catalog cache"
+        raise ValueError(message)
+    if capabilities is None and init_result is not None:
+        capabilities = init_result.capabilities
+    wanted = {
+        "tools": capabilities is None or capabilities.tools is not None,
+        "resources": capabilities is None or capabilities.resources is not None,
+        "prompts": capabilities is None or capabilities.prompts is not None,
+    }
+    requests = {
+        "tools": session.list_tools,
+        "resources": session.list_resources,
+        "prompts": session.list_prompts,
+    }
+
+    async def fetch(kind: str) -> list[Any]:
+        if cache is not None:
+            return await cache.get(session, init_result, kind)
+        return getattr(await requests[kind](), kind)
+
+    kinds = [kind for kind, enabled in wanted.items() if enabled]
+    results = await asyncio.gather(*(fetch(kind) for kind in kinds), return_exceptions=True)
+
+    catalog = ServerCatalog()
+    for kind, result in zip(kinds, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.warning("Could not list %s: %s", kind, result)
+            continue
+        setattr(catalog, kind, result)
+    return catalog
+
+
+async def call_many(
+    session: ClientSession,
+    calls: list[ToolCall],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: float = DEFAULT_CALL_TIMEOUT,  # noqa: ASYNC109
+) -> list[CallOutcome]:
+    """Run tool calls concurrently and return one outcome per call, in input order.
+
+    Args:
+        session: An initialized client session.
+        calls: The tool calls to run.
+        max_concurrency: Maximum number of calls in flight at once.
+        timeout: Default per-call timeout in seconds; `ToolCall.timeout` overrides it.
+
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(call: ToolCall) -> CallOutcome:
+        async with semaphore:
+            start = time.perf_counter()
+            seconds = timeout if call.timeout is None else call.timeout
+            # Whatever goes wrong becomes this call's outcome, so the other results survive
+            try:
+                result = await session.call_tool(call.name, arguments=call.arguments, read_timeout_seconds=timedelta(seconds=seconds))
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Tool call '%s' failed: %r", call.name, exc)
+                return CallOutcome(call=call, error=exc, elapsed=time.perf_counter() - start)
+            return CallOutcome(call=call, result=result, elapsed=time.perf_counter() - start)
+
+    return list(await asyncio.gather(*(run_one(call) for call in calls)))
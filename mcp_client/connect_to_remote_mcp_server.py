@@ -6,6 +6,9 @@ This server uses the Model Context Protocol (MCP). Once connected, it:
   3. Lists available prompts
   4. Makes example tool calls
 
+Discovery requests and tool calls are sent concurrently (see concurrent_calls.py).
+Catalogs are cached on disk for a few minutes (see catalog_cache.py), so a rerun skips the download.
+
 MCP Server used: @modelcontextprotocol/server-everything (test/demo server)
 This server is automatically downloaded and launched via npx.
 
@@ -22,9 +25,12 @@ import asyncio
 import json
 import logging
 
+from catalog_cache import DEFAULT_CACHE_DIR, CatalogCache, ListChangedHandler
+from concurrent_calls import CallOutcome, ToolCall, call_many, discover
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from mcp.shared.exceptions import McpError
+from mcp.types import Prompt, Resource, Tool
 
 # ============================================================
 # MCP Server Configuration
@@ -37,6 +43,15 @@ SERVER_PARAMS = StdioServerParameters(
     env=None,  # Inherits environment variables from the parent process
 )
 
+# Example tool calls: a simple echo and a math tool (get-sum)
+EXAMPLE_CALLS = [
+    ToolCall("echo", {"message": "Hello MCP! This is a test message."}),
+    ToolCall("get-sum", {"a": 42, "b": 58}),
+]
+
+# Tools, resources and prompts of servers seen in earlier runs (refreshed after the TTL or a list_changed)
+CATALOG_CACHE = CatalogCache(cache_dir=DEFAULT_CACHE_DIR)
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,16 +62,15 @@ def print_separator(title: str) -> None:
     logger.info("%s\n", "=" * 60)
 
 
-async def list_tools(session: ClientSession) -> list | None:
-    """List the available tools on the server."""
+def log_tools(tools: list[Tool]) -> None:
+    """Log the available tools on the server."""
     print_separator("AVAILABLE TOOLS")
 
-    result = await session.list_tools()
-    if not result.tools:
+    if not tools:
         logger.info("  No tools found.")
-        return None
+        return
 
-    for i, tool in enumerate(result.tools, 1):
+    for i, tool in enumerate(tools, 1):
         logger.info("  %d. %s", i, tool.name)
         if tool.description:
             logger.info("     Description: %s", tool.description)
@@ -67,89 +81,55 @@ async def list_tools(session: ClientSession) -> list | None:
                 logger.info("     Parameters: %s", param_names)
         logger.info("")
 
-    return result.tools
-
 
-async def list_resources(session: ClientSession) -> list | None:
-    """List the available resources on the server."""
+def log_resources(resources: list[Resource]) -> None:
+    """Log the available resources on the server."""
     print_separator("AVAILABLE RESOURCES")
 
-    result = await session.list_resources()
-    if not result.resources:
+    if not resources:
         logger.info("  No resources found.")
-        return None
+        return
 
-    for i, resource in enumerate(result.resources, 1):
+    for i, resource in enumerate(resources, 1):
         logger.info("  %d. %s", i, resource.name)
         logger.info("     URI: %s", resource.uri)
         if resource.description:
             logger.info("     Description: %s", resource.description)
         logger.info("")
 
-    return result.resources
 
-
-async def list_prompts(session: ClientSession) -> list | None:
-    """List the available prompts on the server."""
+def log_prompts(prompts: list[Prompt]) -> None:
+    """Log the available prompts on the server."""
     print_separator("AVAILABLE PROMPTS")
 
-    result = await session.list_prompts()
-    if not result.prompts:
+    if not prompts:
         logger.info("  No prompts found.")
-        return None
+        return
 
-    for i, prompt in enumerate(result.prompts, 1):
+    for i, prompt in enumerate(prompts, 1):
         logger.info("  %d. %s", i, prompt.name)
         if prompt.description:
             logger.info("     Description: %s", prompt.description)
         logger.info("")
 
-    return result.prompts
-
-
-async def call_tool_example(session: ClientSession) -> None:
-    """Call a simple example tool (echo)."""
-    print_separator("TOOL CALL EXAMPLE")
-
-    tool_name = "echo"
-    tool_args = {"message": "Hello MCP! This is a test message."}
 
-    logger.info("  Tool: %s", tool_name)
-    logger.info("  Arguments: %s", json.dumps(tool_args, ensure_ascii=False, indent=4))
-    logger.info("")
+def log_call_outcome(outcome: CallOutcome) -> None:
+    """Log the result (or error) of a single tool call."""
+    print_separator(f"TOOL CALL: {outcome.call.name}")
 
-    try:
-        result = await session.call_tool(tool_name, arguments=tool_args)
-        logger.info("  Result:")
-        for content in result.content:
-            logger.info("    - Type: %s", content.type)
-            if hasattr(content, "text"):
-                logger.info("      Text: %s", content.text)
-        if result.isError:
-            logger.warning("  ⚠️  Tool returned an error!")
-    except McpError:
-        logger.exception("Tool call failed.")
-
-
-async def call_add_tool_example(session: ClientSession) -> None:
-    """Call the math tool example (get-sum)."""
-    print_separator("MATH TOOL CALL EXAMPLE")
+    logger.info("  Arguments: %s", json.dumps(outcome.call.arguments, ensure_ascii=False, indent=4))
+    logger.info("  Took: %.2fs", outcome.elapsed)
+    if outcome.error is not None:
+        logger.error("  ❌ Tool call failed: %r", outcome.error)
+        return
 
-    tool_name = "get-sum"
-    tool_args = {"a": 42, "b": 58}
-
-    logger.info("  Tool: %s", tool_name)
-    logger.info("  Arguments: %s", json.dumps(tool_args, indent=4))
-    logger.info("")
-
-    try:
-        result = await session.call_tool(tool_name, arguments=tool_args)
-        logger.info("  Result:")
-        for content in result.content:
-            if hasattr(content, "text"):
-                logger.info("    %s + %s = %s", tool_args["a"], tool_args["b"], content.text)
-    except McpError:
-        logger.exception("Math tool call failed.")
+    logger.info("  Result:")
+    for content in outcome.result.content if outcome.result else []:
+        logger.info("    - Type: %s", content.type)
+        if hasattr(content, "text"):
+            logger.info("      Text: %s", content.text)
+    if not outcome.ok:
+        logger.warning("  ⚠️  Tool returned an error!")
 
 
 async def main() -> None:
@@ -161,9 +141,14 @@ async def main() -> None:
     logger.info("  Connection type: stdio (via npx)")
     logger.info("\n  Connecting...\n")
 
+    handler = ListChangedHandler(CATALOG_CACHE)
     try:
-        async with stdio_client(SERVER_PARAMS) as (read_stream, write_stream), ClientSession(read_stream, write_stream) as session:
+        async with (
+            stdio_client(SERVER_PARAMS) as (read_stream, write_stream),
+            ClientSession(read_stream, write_stream, message_handler=handler) as session,
+        ):
             init_result = await session.initialize()
+            handler.key = CATALOG_CACHE.key_for(init_result)
             logger.info("  ✅ Connection established successfully!\n")
 
             print_separator("SERVER INFO")
@@ -181,12 +166,16 @@ async def main() -> None:
                     if getattr(caps, "prompts", False):
                         logger.info("    - Prompts: ✅")
 
-            await list_tools(session)
-            await list_resources(session)
-            await list_prompts(session)
+            # Tools, resources and prompts are read from the cache, or fetched concurrently
+            catalog = await discover(session, cache=CATALOG_CACHE, init_result=init_result)
+            log_tools(catalog.tools)
+            log_resources(catalog.resources)
+            log_prompts(catalog.prompts)
 
-            await call_tool_example(session)
-            await call_add_tool_example(session)
+            # Independent tool calls run concurrently, so the batch costs about the slowest call
+            outcomes = await call_many(session, EXAMPLE_CALLS, max_concurrency=4, timeout=30.0)
+            for outcome in outcomes:
+                log_call_outcome(outcome)
 
             print_separator("COMPLETED")
             logger.info("  ✅ All operations completed successfully!")
@@ -0,0 +1,64 @@
+"""Simple example: use tools from several MCP servers at once.
+
+Connects in parallel to the custom server (mcp_server/my_server.py), the RAG
+server (mcp_rag_server/rag_server.py) and the stdio Everything and Filesystem
+servers, then calls tools on each through one namespaced catalog.
+
+Servers that are not running are skipped. Start the SSE servers first:
+  python ../mcp_server/my_server.py
+  python ../mcp_rag_server/rag_server.py
+
+Usage: python example_aggregator.py
+"""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from aggregator import MCPAggregator
+from catalog_cache import CatalogCache
+from mcp import StdioServerParameters
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_DIR = Path(__file__).resolve().parent.parent
+
+SERVERS = {
+    "custom": "http://localhost:8000/sse",
+    "rag": "http://localhost:8001/sse",
+    "everything": StdioServerParameters(command="npx", args=["-y", "@modelcontextprotocol/server-everything"]),
+    "fs": StdioServerParameters(command="npx", args=["-y", "@modelcontextprotocol/server-filesystem", str(ALLOWED_DIR)]),
+}
+
+EXAMPLE_CALLS = [
+    ("custom__greet", {"name": "Alice"}),
+    ("rag__rag_query", {"question": "What is MCP?", "top_k": 1}),
+    ("everything__get-sum", {"a": 42, "b": 58}),
+    ("fs__list_allowed_directories", {}),
+]
+
+
+async def main() -> None:
+    """Connect to every server and call one tool on each."""
+    start = time.perf_counter()
+    async with MCPAggregator(SERVERS, catalog_cache=CatalogCache()) as agg:
+        logger.info("✅ Connected to %s in %.2fs", agg.connected, time.perf_counter() - start)
+
+        tools = await agg.list_tools()
+        logger.info("Found %d tools:", len(tools))
+        for tool in tools:
+            logger.info("  - %s", tool.name)
+
+        available = {tool.name for tool in tools}
+        calls = [(name, args) for name, args in EXAMPLE_CALLS if name in available]
+        results = await asyncio.gather(*(agg.call_tool(name, args) for name, args in calls))
+        for (name, _), result in zip(calls, results, strict=True):
+            for content in result.content:
+                if hasattr(content, "text"):
+                    logger.info("%s → %s", name, content.text)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main())
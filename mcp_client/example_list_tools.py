@@ -1,7 +1,8 @@
 """Simple example: list all tools.
 
 Connects to the Everything MCP server and prints every available tool
-along with its description and parameters.
+along with its description and parameters. The catalog is cached on disk,
+so later runs within the cache TTL skip the schema download, unless the server reports a change.
 
 Usage: python example_list_tools.py
 """
@@ -9,6 +10,7 @@ Usage: python example_list_tools.py
 import asyncio
 import logging
 
+from catalog_cache import DEFAULT_CACHE_DIR, CatalogCache, ListChangedHandler
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
@@ -22,15 +24,18 @@ SERVER_PARAMS = StdioServerParameters(
 
 async def main() -> None:
     """Connect and list all tools."""
-    async with stdio_client(SERVER_PARAMS) as (read, write), ClientSession(read, write) as session:
-        await session.initialize()
+    cache = CatalogCache(cache_dir=DEFAULT_CACHE_DIR)
+    handler = ListChangedHandler(cache)
+    async with stdio_client(SERVER_PARAMS) as (read, write), ClientSession(read, write, message_handler=handler) as session:
+        init_result = await session.initialize()
+        handler.key = cache.key_for(init_result)
         logger.info("✅ Connected!")
 
-        # List all tools
-        result = await session.list_tools()
+        # List all tools (served from the cache when this server version was seen recently)
+        tools = await cache.get(session, init_result, "tools")
 
-        logger.info("Found %d tools:", len(result.tools))
-        for i, tool in enumerate(result.tools, 1):
+        logger.info("Found %d tools:", len(tools))
+        for i, tool in enumerate(tools, 1):
             logger.info("  %d. %s", i, tool.name)
             if tool.description:
                 logger.info("     → %s", tool.description)
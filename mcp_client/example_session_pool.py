@@ -0,0 +1,50 @@
+"""Simple example: reuse warm sessions from a session pool.
+
+Starts the Everything MCP server once, then sends several echo and get-sum
+calls concurrently over the pooled sessions. Only the first call pays the
+npx startup and initialize handshake.
+
+Usage: python example_session_pool.py
+"""
+
+import asyncio
+import logging
+import time
+
+from mcp import StdioServerParameters
+from session_pool import SessionPool
+
+logger = logging.getLogger(__name__)
+
+SERVERS = {
+    "everything": StdioServerParameters(
+        command="npx",
+        args=["-y", "@modelcontextprotocol/server-everything"],
+    ),
+}
+
+
+async def main() -> None:
+    """Warm the pool and run a batch of concurrent tool calls."""
+    async with SessionPool(SERVERS, max_sessions_per_server=2) as pool:
+        start = time.perf_counter()
+        await pool.warm()
+        logger.info("✅ Pool warmed in %.2fs", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        calls = [pool.call_tool("everything", "echo", {"message": f"Hello MCP #{i}!"}) for i in range(5)]
+        calls.append(pool.call_tool("everything", "get-sum", {"a": 42, "b": 58}))
+        results = await asyncio.gather(*calls)
+        logger.info("✅ %d calls finished in %.2fs", len(results), time.perf_counter() - start)
+
+        for result in results:
+            for content in result.content:
+                if hasattr(content, "text"):
+                    logger.info("  %s", content.text)
+
+        logger.info("Sessions in use per server: %s", pool.stats())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main())
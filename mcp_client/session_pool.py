@@ -0,0 +1,344 @@
+"""MCP Client Session Pool.
+
+Keep MCP server connections warm and reuse them across tool calls instead of
+spawning a new server process and doing a full `initialize` handshake per call:
+  1. Each pooled session owns its transport (stdio subprocess or SSE connection), which is
+     shut down if the server does not finish the initialize handshake in time
+  2. Concurrent `call_tool` requests are multiplexed over the least busy session
+  3. Dead sessions are detected with a ping health check and restarted; a call that finds its
+     session's transport closed drops that session and is retried once on a fresh one
+  4. The number of sessions per server is capped
+  5. New sessions are started outside the per-server lock, so a slow spawn and handshake
+     does not hold up calls that can use the sessions already running
+
+Usage:
+  async with SessionPool({"everything": SERVER_PARAMS}) as pool:
+      result = await pool.call_tool("everything", "echo", {"message": "Hello MCP!"})
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+from catalog_cache import CatalogCache, CatalogKind, ListChangedHandler
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, CallToolResult, InitializeResult
+
+logger = logging.getLogger(__name__)
+
+# A server is either launched as a stdio subprocess or reached over SSE by URL.
+ServerConfig = StdioServerParameters | str
+
+DEFAULT_MAX_SESSIONS = 4
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+DEFAULT_PING_TIMEOUT = 5.0
+DEFAULT_START_TIMEOUT = 30.0
+
+# Raised when a request is sent over a session whose transport has already closed (e.g. the server process died)
+TRANSPORT_CLOSED_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+
+class SessionUnavailableError(RuntimeError):
+    """Raised when a pooled session cannot be started or has died."""
+
+
+class PooledSession:
+    """A single warm MCP session whose transport lives in a dedicated task.
+
+    The transport context managers are entered and exited inside the same task,
+    which is what anyio (used by the MCP SDK) requires for its cancel scopes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: ServerConfig,
+        catalog_cache: CatalogCache | None = None,
+        start_timeout: float = DEFAULT_START_TIMEOUT,
+    ) -> None:
+        """Create an unstarted session for the given server configuration."""
+        self.name = name
+        self.config = config
+        self.start_timeout = start_timeout
+        self._list_changed = ListChangedHandler(catalog_cache) if catalog_cache is not None else None
+        self.session: ClientSession | None = None
+        self.init_result: InitializeResult | None = None
+        self.in_flight = 0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def alive(self) -> bool:
+        """Return True while the session is initialized and its transport is running."""
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Launch the transport, run the initialize handshake and wait until ready.
+
+        A server that does not finish the handshake within `start_timeout` seconds is shut down.
+        """
+        self._task = asyncio.create_task(self._run(), name=f"mcp-session-{self.name}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self.start_timeout)
+        except TimeoutError as exc:
+            # Cancelling the task exits the transport context, which stops the server process
+            self._task.cancel()
+            await asyncio.wait([self._task])
+            msg = f"Server '{self.name}' did not finish the initialize handshake within {self.start_timeout:g} s"
+            raise SessionUnavailableError(msg) from exc
+        if self._error is not None:
+            msg = f"Could not start session for server '{self.name}'"
+            raise SessionUnavailableError(msg) from self._error
+
+    async def close(self) -> None:
+        """Close the session and shut down its transport."""
+        self._closing.set()
+        if self._task is not None:
+            with contextlib.suppress(Exception):
+                await self._task
+
+    async def _run(self) -> None:
+        """Own the transport for the whole lifetime of the session."""
+        transport = sse_client(self.config) if isinstance(self.config, str) else stdio_client(self.config)
+        try:
+            async with transport as (read, write), ClientSession(read, write, message_handler=self._list_changed) as session:
+                self.init_result = await session.initialize()
+                if self._list_changed is not None:
+                    self._list_changed.key = CatalogCache.key_for(self.init_result)
+                self.session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as exc:  # noqa: BLE001
+            self._error = exc
+            logger.warning("Session for server '%s' stopped: %s", self.name, exc)
+        finally:
+            self.session = None
+            self._ready.set()
+
+
+class SessionPool:
+    """Pool of warm MCP sessions, keyed by server name."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        servers: dict[str, ServerConfig],
+        max_sessions_per_server: int = DEFAULT_MAX_SESSIONS,
+        max_in_flight_per_session: int = DEFAULT_MAX_IN_FLIGHT,
+        health_check_interval: float | None = DEFAULT_HEALTH_CHECK_INTERVAL,
+        catalog_cache: CatalogCache | None = None,
+        start_timeout: float = DEFAULT_START_TIMEOUT,
+    ) -> None:
+        """Configure the pool.
+
+        Args:
+            servers: Mapping of server name to stdio parameters or SSE URL.
+            max_sessions_per_server: Hard cap on sessions opened per server.
+            max_in_flight_per_session: Requests a session takes before another one is started.
+                Once the cap is reached, requests are multiplexed over the least busy session.
+            health_check_interval: Seconds between background pings, or None to disable.
+            catalog_cache: Cache used by `list_catalog`; sessions invalidate it on list_changed.
+            start_timeout: Seconds a new session may take to connect and finish its handshake.
+
+        """
+        self.servers = servers
+        self.max_sessions_per_server = max_sessions_per_server
+        self.max_in_flight_per_session = max_in_flight_per_session
+        self.health_check_interval = health_check_interval
+        self.catalog_cache = catalog_cache or CatalogCache(cache_dir=None)
+        self.start_timeout = start_timeout
+        self._sessions: dict[str, list[PooledSession]] = {name: [] for name in servers}
+        # Sessions being started; they join `_sessions` once their handshake is done
+        self._starting: dict[str, set[asyncio.Task[PooledSession]]] = {name: set() for name in servers}
+        self._locks: dict[str, asyncio.Lock] = {name: asyncio.Lock() for name in servers}
+        self._health_task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> "SessionPool":
+        """Start the background health check loop."""
+        if self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop(), name="mcp-pool-health")
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close every pooled session."""
+        await self.close()
+
+    async def warm(self, names: list[str] | None = None, sessions_per_server: int = 1) -> None:
+        """Start sessions ahead of time so the first call skips process startup."""
+        targets = names or list(self.servers)
+        await asyncio.gather(*(self._ensure_sessions(name, sessions_per_server) for name in targets))
+
+    @contextlib.asynccontextmanager
+    async def session(self, name: str) -> AsyncIterator[ClientSession]:
+        """Borrow the least busy session for a server, starting one if needed.
+
+        A session whose transport turns out to be closed is dropped from the pool.
+        """
+        pooled = await self._acquire(name)
+        pooled.in_flight += 1
+        try:
+            if pooled.session is None:
+                msg = f"Session for server '{name}' is no longer running"
+                raise SessionUnavailableError(msg)
+            yield pooled.session
+        except TRANSPORT_CLOSED_ERRORS:
+            await self._discard(name, pooled)
+            raise
+        except McpError as exc:
+            if exc.error.code == CONNECTION_CLOSED:
+                await self._discard(name, pooled)
+            raise
+        finally:
+            pooled.in_flight -= 1
+
+    async def call_tool(self, name: str, tool: str, arguments: dict[str, Any] | None = None) -> CallToolResult:
+        """Call a tool on the named server over a pooled session.
+
+        If the session's transport was already closed, the request never reached the server,
+        so it is retried once on a fresh session.
+        """
+        try:
+            async with self.session(name) as session:
+                return await session.call_tool(tool, arguments=arguments or {})
+        except TRANSPORT_CLOSED_ERRORS:
+            logger.warning("Session for server '%s' was closed, retrying '%s' on a new session", name, tool)
+        async with self.session(name) as session:
+            return await session.call_tool(tool, arguments=arguments or {})
+
+    async def list_catalog(self, name: str, kind: CatalogKind = "tools") -> list[Any]:
+        """Return a server's tools, resources or prompts, served from the catalog cache when possible."""
+        pooled = await self._acquire(name)
+        if pooled.session is None or pooled.init_result is None:
+            msg = f"Session for server '{name}' is no longer running"
+            raise SessionUnavailableError(msg)
+        return await self.catalog_cache.get(pooled.session, pooled.init_result, kind)
+
+    async def invalidate_catalog(self, name: str, kind: CatalogKind | None = None) -> None:
+        """Drop a server's cached catalog (all kinds when `kind` is None), so the next listing fetches it."""
+        pooled = await self._acquire(name)
+        if pooled.init_result is None:
+            msg = f"Session for server '{name}' is no longer running"
+            raise SessionUnavailableError(msg)
+        self.catalog_cache.invalidate(CatalogCache.key_for(pooled.init_result), kind)
+
+    async def health_check(self) -> None:
+        """Ping every pooled session and restart the ones that do not answer."""
+        for name in self.servers:
+            sessions = list(self._sessions[name])
+            results = await asyncio.gather(*(self._ping(s) for s in sessions))
+            dead = [s for s, ok in zip(sessions, results, strict=True) if not ok]
+            restarts = []
+            for pooled in dead:
+                logger.warning("Restarting dead session for server '%s'", name)
+                await self._discard(name, pooled)
+                async with self._locks[name]:
+                    if len(self._sessions[name]) + len(self._starting[name]) < self.max_sessions_per_server:
+                        restarts.append(self._spawn(name))
+            await asyncio.gather(*restarts)
+
+    async def close(self) -> None:
+        """Stop the health check loop and close every session."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        starting = [task for group in self._starting.values() for task in group]
+        started = await asyncio.gather(*starting, return_exceptions=True)
+        sessions = [s for group in self._sessions.values() for s in group]
+        sessions += [s for s in started if isinstance(s, PooledSession) and s not in sessions]
+        await asyncio.gather(*(s.close() for s in sessions))
+        for group in self._sessions.values():
+            group.clear()
+
+    def stats(self) -> dict[str, list[int]]:
+        """Return the in-flight request count of every session, per server."""
+        return {name: [s.in_flight for s in group] for name, group in self._sessions.items()}
+
+    async def _acquire(self, name: str) -> PooledSession:
+        """Pick the least busy live session, or start a new one while under the cap."""
+        if name not in self.servers:
+            msg = f"Unknown MCP server: '{name}'"
+            raise KeyError(msg)
+        async with self._locks[name]:
+            sessions = self._sessions[name]
+            sessions[:] = [s for s in sessions if s.alive]
+            starting = self._starting[name]
+            least_busy = min(sessions, key=lambda s: s.in_flight, default=None)
+            saturated = least_busy is None or least_busy.in_flight >= self.max_in_flight_per_session
+            if saturated and len(sessions) + len(starting) < self.max_sessions_per_server:
+                start = self._spawn(name)
+            elif least_busy is None and starting:
+                start = next(iter(starting))  # wait for a session another call is starting
+            elif least_busy is None:
+                msg = f"No session available for server '{name}'"
+                raise SessionUnavailableError(msg)
+            else:
+                return least_busy
+        # Wait outside the lock; shielded, so a cancelled caller does not abort a start others may wait for
+        return await asyncio.shield(start)
+
+    async def _ensure_sessions(self, name: str, count: int) -> None:
+        """Start sessions for a server until `count` are alive (bounded by the cap)."""
+        async with self._locks[name]:
+            sessions = self._sessions[name]
+            sessions[:] = [s for s in sessions if s.alive]
+            missing = min(count, self.max_sessions_per_server) - len(sessions) - len(self._starting[name])
+            starts = [self._spawn(name) for _ in range(missing)]
+            starts += [task for task in self._starting[name] if task not in starts]
+        await asyncio.gather(*starts)
+
+    def _spawn(self, name: str) -> asyncio.Task[PooledSession]:
+        """Start a session in a background task (call with the server's lock held); it joins the pool once ready."""
+        task = asyncio.create_task(self._start_session(name), name=f"mcp-start-{name}")
+        self._starting[name].add(task)
+
+        def join(task: asyncio.Task[PooledSession]) -> None:
+            self._starting[name].discard(task)
+            if not task.cancelled() and task.exception() is None:
+                self._sessions[name].append(task.result())
+
+        task.add_done_callback(join)
+        return task
+
+    async def _discard(self, name: str, pooled: PooledSession) -> None:
+        """Drop a session from the pool and shut down its transport."""
+        async with self._locks[name]:
+            if pooled in self._sessions[name]:
+                self._sessions[name].remove(pooled)
+                logger.warning("Dropped closed session for server '%s'", name)
+        await pooled.close()
+
+    async def _start_session(self, name: str) -> PooledSession:
+        """Start and initialize a new session for a server."""
+        pooled = PooledSession(name, self.servers[name], self.catalog_cache, self.start_timeout)
+        await pooled.start()
+        logger.info("Started session for server '%s'", name)
+        return pooled
+
+    async def _ping(self, pooled: PooledSession) -> bool:
+        """Return True if the session answers a ping in time."""
+        if not pooled.alive or pooled.session is None:
+            return False
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), timeout=DEFAULT_PING_TIMEOUT)
+        except Exception:  # noqa: BLE001
+            return False
+        return True
+
+    async def _health_loop(self) -> None:
+        """Run `health_check` periodically until the pool is closed."""
+        while True:
+            await asyncio.sleep(self.health_check_interval or DEFAULT_HEALTH_CHECK_INTERVAL)
+            try:
+                await self.health_check()
+            except SessionUnavailableError:
+                logger.exception("Health check could not restart a session.")
@@ -59,7 +59,7 @@ async def main() -> None:  # noqa: C901, PLR0912
             if hasattr(content, "text"):
                 logger.info("%s", content.text)
 
-        # ---- Step 5: Add a new document ----
+        # ---- Step 5: Add a new document (skipped by the server on later runs, as it is already there) ----
         print_separator("ADDING A NEW DOCUMENT")
         new_doc = "Streamlit is a Python framework for building interactive data science web applications quickly."
         logger.info("  Adding: %s", new_doc)
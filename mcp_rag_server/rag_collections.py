@@ -0,0 +1,172 @@
+"""RAG Collections.
+
+Named, isolated knowledge bases inside one server, sharing one embedding model:
+  - A collection's index is loaded from disk the first time it is used
+  - Loaded collections are kept in LRU order; when their total size exceeds the memory budget,
+    the least recently used ones are written to disk (if changed) and dropped from memory
+  - New documents are encoded on their own; existing embeddings are never recomputed
+  - Adding a document a collection already has is a no-op, so repeated adds do not pile up duplicates
+  - With `mmap`, loaded embeddings stay on disk and are scanned in blocks, so only documents count towards the budget
+
+Each collection is stored in `<storage_dir>/<name>/` (see `RAGEngine.save`).
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from encode_scheduler import EncodeScheduler
+from rag_engine import DEFAULT_MODEL_NAME, RAGEngine, load_model
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORAGE_DIR = Path(os.environ.get("RAG_COLLECTIONS_DIR", Path(__file__).resolve().parent / ".cache" / "collections"))
+DEFAULT_MEMORY_BUDGET_MB = float(os.environ.get("RAG_MEMORY_BUDGET_MB", "256"))
+DEFAULT_MMAP = os.environ.get("RAG_MMAP_EMBEDDINGS", "0") == "1"
+
+# Collection names become directory names, so keep them to a safe alphabet
+_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def validate_name(name: str) -> str:
+    """Return the collection name, or raise ValueError if it is not 1-64 letters, digits, "_" or "-"."""
+    if not _NAME.match(name):
+        message = f"Invalid collection name {name!r}: use 1-64 letters, digits, '_' or '-'."
+        raise ValueError(message)
+    return name
+
+
+class CollectionManager:
+    """Load, create and evict named RAG collections that share one embedding model."""
+
+    def __init__(
+        self,
+        storage_dir: str | Path = DEFAULT_STORAGE_DIR,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+        model_name: str = DEFAULT_MODEL_NAME,
+        model: "SentenceTransformer | None" = None,
+        *,
+        mmap: bool = DEFAULT_MMAP,
+    ) -> None:
+        """Keep collections under `storage_dir`, with at most `memory_budget_mb` of them in memory."""
+        self.storage_dir = Path(storage_dir)
+        self.memory_budget_bytes = int(memory_budget_mb * 1_000_000)
+        self.model_name = model_name
+        self._model = model
+        self._encoder: EncodeScheduler | None = None
+        self.mmap = mmap
+        self._loaded: OrderedDict[str, RAGEngine] = OrderedDict()  # least recently used first
+        self._dirty: set[str] = set()
+        self._lock = threading.RLock()
+        self.stats = {"loads": 0, "evictions": 0, "saves": 0}
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """Return the shared embedding model, loading it on first use."""
+        with self._lock:
+            if self._model is None:
+                self._model = load_model(self.model_name)
+            return self._model
+
+    @property
+    def encoder(self) -> EncodeScheduler:
+        """Return the encode scheduler shared by all collections (its `stats` cover every collection)."""
+        with self._lock:
+            if self._encoder is None:
+                self._encoder = EncodeScheduler(self.model)
+            return self._encoder
+
+    @property
+    def memory_bytes(self) -> int:
+        """Return the approximate memory used by the loaded collections."""
+        with self._lock:
+            return sum(engine.nbytes for engine in self._loaded.values())
+
+    def names(self) -> list[str]:
+        """Return the names of all collections, loaded or on disk."""
+        with self._lock:
+            on_disk = {path.parent.name for path in self.storage_dir.glob("*/documents.json")} if self.storage_dir.is_dir() else set()
+            return sorted(on_disk | set(self._loaded))
+
+    def is_loaded(self, name: str) -> bool:
+        """Return True if the collection is currently in memory."""
+        with self._lock:
+            return name in self._loaded
+
+    def get(self, name: str, *, create: bool = False) -> RAGEngine | None:
+        """Return a collection, loading it from disk if needed; None if it does not exist and `create` is False."""
+        validate_name(name)
+        with self._lock:
+            engine = self._loaded.get(name)
+            if engine is not None:
+                self._loaded.move_to_end(name)
+                return engine
+            directory = self.storage_dir / name
+            if (directory / "documents.json").exists():
+                engine = RAGEngine.load(directory, model=self.model, mmap=self.mmap, encoder=self.encoder)
+                self.stats["loads"] += 1
+                logger.info("📂 Loaded collection %r (%d documents)", name, len(engine.documents))
+            elif create:
+                engine = RAGEngine(model=self.model, encoder=self.encoder)
+                self._dirty.add(name)
+                logger.info("🆕 Created collection %r", name)
+            else:
+                return None
+            self._loaded[name] = engine
+            self._enforce_budget()
+            return engine
+
+    def add_documents(self, name: str, documents: list[str]) -> tuple[int, int]:
+        """Add the documents a collection does not have yet (creating it if needed); return (added, total) counts."""
+        with self._lock:
+            engine = self.get(name, create=True)
+            known = set(engine.documents)
+            new = [document for document in dict.fromkeys(documents) if document not in known]
+            if len(new) < len(documents):
+                logger.info("Skipped %d documents already in collection %r", len(documents) - len(new), name)
+            if new:
+                engine.add_documents(new)
+                self._dirty.add(name)
+                self._enforce_budget()
+            return len(new), len(engine.documents)
+
+    def query(self, name: str, question: str, top_k: int = 3) -> list[dict] | None:
+        """Query a collection; None if it does not exist."""
+        engine = self.get(name)
+        # The engine stays usable even if another call evicts it meanwhile
+        return engine.query(question, top_k=top_k) if engine is not None else None
+
+    def evict(self, name: str) -> None:
+        """Write a collection to disk if it changed, and drop it from memory."""
+        with self._lock:
+            engine = self._loaded.pop(name, None)
+            if engine is None:
+                return
+            if name in self._dirty:
+                self._save(name, engine)
+            self.stats["evictions"] += 1
+            logger.info("💤 Evicted collection %r (%.1f MB)", name, engine.nbytes / 1e6)
+
+    def flush(self) -> None:
+        """Write every changed collection to disk (they stay loaded)."""
+        with self._lock:
+            for name in list(self._dirty):
+                self._save(name, self._loaded[name])
+
+    def _save(self, name: str, engine: RAGEngine) -> None:
+        """Write one collection to disk (call with the lock held)."""
+        engine.save(self.storage_dir / name)
+        self._dirty.discard(name)
+        self.stats["saves"] += 1
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently used collections until the rest fit the budget; the most recent one always stays."""
+        while len(self._loaded) > 1 and self.memory_bytes > self.memory_budget_bytes:
+            self.evict(next(iter(self._loaded)))
@@ -5,46 +5,111 @@ A minimal Retrieval-Augmented Generation engine:
   - Uses sentence-transformers for embedding
   - Uses cosine similarity for retrieval
   - Returns top-k most relevant documents for a query.
+
+Several engines can share one loaded model (`model=`), and an engine can be saved to
+and loaded from a directory (`documents.json` and `embeddings.npy`). Loaded with `mmap=True`,
+the embeddings stay on disk and queries scan them in blocks (see `exact_search.py`).
 """
 
+import json
 import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from encode_scheduler import EncodeScheduler
+from exact_search import open_embeddings, search
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def load_model(model_name: str = DEFAULT_MODEL_NAME) -> "SentenceTransformer":
+    """Load a sentence-transformer model."""
+    # Imported here: sentence-transformers loads torch, which takes seconds
+    from sentence_transformers import SentenceTransformer  # noqa: PLC0415
+
+    logger.info("Loading embedding model: %s...", model_name)
+    model = SentenceTransformer(model_name)
+    logger.info("Model loaded.")
+    return model
+
 
 class RAGEngine:
     """In-memory RAG engine: embeddings, vector store and retrieval."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2") -> None:
-        """Initialize the RAG engine with a sentence-transformer model."""
-        logger.info("Loading embedding model: %s...", model_name)
-        self.model = SentenceTransformer(model_name)
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        model: "SentenceTransformer | None" = None,
+        encoder: EncodeScheduler | None = None,
+    ) -> None:
+        """Initialize the RAG engine with a sentence-transformer model, or with an already loaded (shared) one and its encoder."""
+        self.model = model if model is not None else load_model(model_name)
+        # Documents are encoded in length-bucketed batches (see encode_scheduler.py)
+        self.encoder = encoder if encoder is not None else EncodeScheduler(self.model)
         self.documents: list[str] = []
         self.embeddings: np.ndarray | None = None
-        logger.info("Model loaded.")
+
+    @property
+    def nbytes(self) -> int:
+        """Return the approximate memory used by the documents and their in-memory embeddings."""
+        # Memory-mapped embeddings live in the OS page cache, not in this process's memory
+        in_memory = self.embeddings is not None and not isinstance(self.embeddings, np.memmap)
+        embedding_bytes = self.embeddings.nbytes if in_memory else 0
+        return embedding_bytes + sum(len(document) for document in self.documents)
 
     def add_documents(self, documents: list[str]) -> None:
-        """Add documents to the vector store and compute embeddings."""
+        """Add documents to the vector store, computing embeddings for the new documents only.
+
+        Memory-mapped embeddings are read into memory to append the new ones.
+        """
+        if not documents:
+            return
+        new_embeddings = self.encoder.encode(documents)
+        self.embeddings = new_embeddings if self.embeddings is None else np.vstack([self.embeddings, new_embeddings])
         self.documents.extend(documents)
-        self.embeddings = self.model.encode(self.documents, convert_to_numpy=True)
         logger.info("Added %d documents. Total: %d", len(documents), len(self.documents))
 
+    def save(self, directory: str | Path) -> None:
+        """Write the documents and embeddings to a directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        # Write to temporary files first, so that a crash never leaves a half-written index
+        documents_tmp = directory / "documents.json.tmp"
+        documents_tmp.write_text(json.dumps(self.documents, ensure_ascii=False), encoding="utf-8")
+        embeddings = self.embeddings if self.embeddings is not None else np.empty((0, 0), dtype=np.float32)
+        with (directory / "embeddings.npy.tmp").open("wb") as file:
+            np.save(file, embeddings)
+        (directory / "embeddings.npy.tmp").replace(directory / "embeddings.npy")
+        documents_tmp.replace(directory / "documents.json")
+
+    @classmethod
+    def load(cls, directory: str | Path, model: "SentenceTransformer", *, mmap: bool = False, encoder: EncodeScheduler | None = None) -> "RAGEngine":
+        """Create an engine from a directory written by `save`, using an already loaded model.
+
+        With `mmap`, the embeddings are memory-mapped instead of read into memory.
+        """
+        directory = Path(directory)
+        engine = cls(model=model, encoder=encoder)
+        engine.documents = json.loads((directory / "documents.json").read_text(encoding="utf-8"))
+        path = directory / "embeddings.npy"
+        embeddings = open_embeddings(path) if mmap else np.load(path)
+        engine.embeddings = embeddings if engine.documents else None
+        return engine
+
     def query(self, question: str, top_k: int = 3) -> list[dict]:
         """Retrieve the top-k most relevant documents for the given question."""
         if not self.documents or self.embeddings is None:
             return []
 
         query_embedding = self.model.encode([question], convert_to_numpy=True)[0]
-        scores = np.dot(self.embeddings, query_embedding) / (np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding))
-        top_indices = np.argsort(scores)[::-1][:top_k]
-
-        results = []
-        for rank, idx in enumerate(top_indices, 1):
-            results.append({"rank": rank, "score": float(scores[idx]), "document": self.documents[idx]})
-        return results
+        hits = search(self.embeddings, query_embedding, top_k)
+        return [{"rank": rank, "score": score, "document": self.documents[idx]} for rank, (idx, score) in enumerate(hits, 1)]
 
 
 # ============================================================
@@ -4,20 +4,68 @@ An MCP server that exposes a RAG system as tools:
   - rag_query: Search documents using natural language.
   - rag_add_document: Add a new document to the knowledge base.
   - rag_list_documents: List all documents in the knowledge base.
+  - rag_list_collections: List the knowledge bases (collections) and which are in memory.
+  - profiling_*: Admin tools (with MCP_PROFILE_ADMIN=1) that profile the RAG tools (see `tool_profiler.py`).
+
+Every RAG tool takes a `collection` name, so each team gets an isolated knowledge base;
+all collections share one embedding model (see `rag_collections.py`). The "default" collection
+starts with the sample documents.
+
+The collections (and the embedding model) are created on first use by `get_collections`,
+so importing this module stays fast.
 """
 
+import atexit
 import logging
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
 
 from mcp.server.fastmcp import FastMCP
-from rag_engine import SAMPLE_DOCUMENTS, RAGEngine
+from rag_collections import CollectionManager
+from rag_engine import SAMPLE_DOCUMENTS
+
+try:
+    from agenticai_foundations_to_advanced.tool_profiler import ToolProfiler, register_admin_tools
+except ImportError:  # Only `pip install -r requirements.txt`, without the project package: no profiling
+    ToolProfiler = register_admin_tools = None
 
 logger = logging.getLogger(__name__)
 
-# ---- Initialize RAG engine ----
-logger.info("Initializing RAG Engine...")
-rag = RAGEngine()
-rag.add_documents(SAMPLE_DOCUMENTS)
-logger.info("RAG Engine initialized.")
+DEFAULT_COLLECTION = "default"
+
+# Off unless MCP_PROFILE_RATE is set (see `tool_profiler.py`)
+profiler = ToolProfiler.from_env(Path(__file__).resolve().parent / ".cache" / "profiles") if ToolProfiler is not None else None
+if profiler is None and any(name.startswith("MCP_PROFILE_") for name in os.environ):
+    logger.warning("⚠️  MCP_PROFILE_* is set, but profiling needs the project package (`pip install -e .`); tools run unprofiled")
+
+
+def profile(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool with the profiler, if the project package that provides it is installed."""
+    return fn if profiler is None else profiler.profile(fn)
+
+
+_collections: CollectionManager | None = None
+_collections_lock = threading.Lock()
+
+
+def get_collections() -> CollectionManager:
+    """Return the collection manager, creating the default collection from the sample documents on first use."""
+    global _collections  # noqa: PLW0603
+    with _collections_lock:
+        if _collections is None:
+            logger.info("Initializing RAG collections...")
+            collections = CollectionManager()
+            if DEFAULT_COLLECTION not in collections.names():
+                collections.add_documents(DEFAULT_COLLECTION, SAMPLE_DOCUMENTS)
+            # Collections changed since their last eviction are only in memory
+            atexit.register(collections.flush)
+            _collections = collections
+            logger.info("RAG collections initialized.")
+        return _collections
+
 
 # ---- Create MCP server ----
 server = FastMCP(
@@ -28,10 +76,16 @@ server = FastMCP(
 
 
 @server.tool()
-def rag_query(question: str, top_k: int = 3) -> str:
-    """Search the knowledge base using a natural language question."""
-    results = rag.query(question, top_k=top_k)
-
+@profile
+def rag_query(question: str, top_k: int = 3, collection: str = DEFAULT_COLLECTION) -> str:
+    """Search a knowledge base (collection) using a natural language question."""
+    try:
+        results = get_collections().query(collection, question, top_k=top_k)
+    except ValueError as exc:
+        return f"❌ {exc}"
+
+    if results is None:
+        return f"Collection {collection!r} not found."
     if not results:
         return "No documents found in the knowledge base."
 
@@ -46,32 +100,63 @@ def rag_query(question: str, top_k: int = 3) -> str:
 
 
 @server.tool()
-def rag_add_document(document: str) -> str:
-    """Add a new document to the knowledge base."""
-    rag.add_documents([document])
-    return f"✅ Document added. Total documents: {len(rag.documents)}"
+@profile
+def rag_add_document(document: str, collection: str = DEFAULT_COLLECTION) -> str:
+    """Add a new document to a knowledge base (collection), creating the collection if needed."""
+    try:
+        added, total = get_collections().add_documents(collection, [document])
+    except ValueError as exc:
+        return f"❌ {exc}"
+    if not added:
+        return f"💡 Document already in {collection!r}. Total documents: {total}"
+    return f"✅ Document added to {collection!r}. Total documents: {total}"
 
 
 @server.tool()
-def rag_list_documents() -> str:
-    """List all documents currently in the knowledge base."""
+@profile
+def rag_list_documents(collection: str = DEFAULT_COLLECTION) -> str:
+    """List all documents currently in a knowledge base (collection)."""
+    try:
+        rag = get_collections().get(collection)
+    except ValueError as exc:
+        return f"❌ {exc}"
+    if rag is None:
+        return f"Collection {collection!r} not found."
     if not rag.documents:
         return "Knowledge base is empty."
 
-    output = f"Knowledge base ({len(rag.documents)} documents):\n\n"
+    output = f"Knowledge base {collection!r} ({len(rag.documents)} documents):\n\n"
     for i, doc in enumerate(rag.documents, 1):
         output += f"  {i}. {doc}\n"
 
     return output
 
 
+@server.tool()
+@profile
+def rag_list_collections() -> str:
+    """List all knowledge bases (collections) and which of them are loaded in memory."""
+    collections = get_collections()
+    output = f"Collections ({collections.memory_bytes / 1e6:.1f} of {collections.memory_budget_bytes / 1e6:.0f} MB in memory):\n\n"
+    for name in collections.names():
+        output += f"  - {name}{' (loaded)' if collections.is_loaded(name) else ''}\n"
+    return output
+
+
+# Only with MCP_PROFILE_ADMIN=1 (see `tool_profiler.py`)
+if profiler is not None and os.environ.get("MCP_PROFILE_ADMIN") == "1":
+    register_admin_tools(server, profiler)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(message)s")
     # use module logger for messages
+    collections = get_collections()
+    collections.get(DEFAULT_COLLECTION)  # Load the model before the first request
     logger.info("🚀 Starting RAG MCP Server...")
     logger.info("   Host: localhost")
     logger.info("   Port: 8001")
     logger.info("   Transport: SSE")
-    logger.info("   Documents loaded: %d", len(rag.documents))
+    logger.info("   Collections: %s", ", ".join(collections.names()))
     logger.info("\n   Press Ctrl+C to stop.\n")
     server.run(transport="sse")
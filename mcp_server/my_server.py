@@ -5,6 +5,7 @@ A simple MCP server that exposes the following tools:
   - add: Add two numbers.
   - multiply: Multiply two numbers.
   - current_time: Return the current date and time.
+  - profiling_*: Admin tools (with MCP_PROFILE_ADMIN=1) that profile the tools above (see `tool_profiler.py`).
 
 Run this server in one terminal:
   python my_server.py
@@ -13,12 +14,32 @@ Then connect to it from another terminal using my_client.py.
 """
 
 import logging
+import os
+from collections.abc import Callable
 from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
 
 from mcp.server.fastmcp import FastMCP
 
+try:
+    from agenticai_foundations_to_advanced.tool_profiler import ToolProfiler, register_admin_tools
+except ImportError:  # Only `pip install -r requirements.txt`, without the project package: no profiling
+    ToolProfiler = register_admin_tools = None
+
 logger = logging.getLogger(__name__)
 
+# Off unless MCP_PROFILE_RATE is set (see `tool_profiler.py`)
+profiler = ToolProfiler.from_env(Path(__file__).resolve().parent / ".cache" / "profiles") if ToolProfiler is not None else None
+if profiler is None and any(name.startswith("MCP_PROFILE_") for name in os.environ):
+    logger.warning("⚠️  MCP_PROFILE_* is set, but profiling needs the project package (`pip install -e .`); tools run unprofiled")
+
+
+def profile(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a tool with the profiler, if the project package that provides it is installed."""
+    return fn if profiler is None else profiler.profile(fn)
+
+
 # Create the server
 server = FastMCP(
     name="My Custom MCP Server",
@@ -28,12 +49,14 @@ server = FastMCP(
 
 
 @server.tool()
+@profile
 def greet(name: str) -> str:
     """Return a friendly greeting message for the given name."""
     return f"Hello, {name}! Welcome to our custom MCP server. 👋"
 
 
 @server.tool()
+@profile
 def add(a: float, b: float) -> str:
     """Add two numbers and return the result."""
     result = a + b
@@ -41,6 +64,7 @@ def add(a: float, b: float) -> str:
 
 
 @server.tool()
+@profile
 def multiply(a: float, b: float) -> str:
     """Multiply two numbers and return the result."""
     result = a * b
@@ -48,12 +72,18 @@ def multiply(a: float, b: float) -> str:
 
 
 @server.tool()
+@profile
 def current_time() -> str:
     """Return the current date and time in UTC."""
     now = datetime.now(tz=UTC)
     return f"Current date and time (UTC): {now.strftime('%Y-%m-%d %H:%M:%S')}"
 
 
+# Only with MCP_PROFILE_ADMIN=1 (see `tool_profiler.py`)
+if profiler is not None and os.environ.get("MCP_PROFILE_ADMIN") == "1":
+    register_admin_tools(server, profiler)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(message)s")
     logger.info("🚀 Starting My Custom MCP Server...")
@@ -4,14 +4,22 @@ A simple UI that shows the orchestrator workflow:
   1. User enters a query
   2. Research Agent gathers facts
   3. Writer Agent writes a polished response
-  4. Both outputs are displayed
+  4. Both outputs are displayed, streamed token by token as they are generated
+
+Queries run as background jobs on a worker pool shared by all browser sessions (see `jobs.py`);
+the page polls the job's progress, and a rerun does not interrupt it.
 
 Usage:
   streamlit run app.py
 """
 
 import streamlit as st
-from orchestrator import Orchestrator
+import writer_agent
+from jobs import Job, JobManager
+from llm_registry import warm_up
+from orchestrator import CACHE_PATH, Orchestrator
+from response_cache import ResponseCache
+from tracing import get_tracer
 
 st.set_page_config(page_title="Multi-Agent Orchestrator", page_icon="🤖")
 
@@ -20,28 +28,94 @@ st.markdown(
     "Enter a question below. The **Orchestrator** will delegate work to a **Research Agent** and a **Writer Agent**, then combine their results.",
 )
 
-# Initialize orchestrator
-if "orchestrator" not in st.session_state:
-    st.session_state.orchestrator = Orchestrator()
+
+@st.cache_resource
+def start_model_warm_up() -> None:
+    """Load the model in the background once per process, so the first query does not pay for it."""
+    warm_up()
+
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Return the response cache shared by every browser session."""
+    return ResponseCache(path=CACHE_PATH)
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Return the worker pool that runs queries for every browser session."""
+    return JobManager(Orchestrator(cache=get_response_cache()))
+
+
+start_model_warm_up()
+jobs = get_job_manager()
+
+# This session's job IDs; the jobs themselves live in the shared manager, so they survive reruns
+if "job_ids" not in st.session_state:
+    st.session_state.job_ids = []
 
 # User input
 query = st.text_input("Your question:", placeholder="e.g. What is quantum computing?")
 
-if st.button("Ask", type="primary") and query:
-    with st.spinner("🎯 Orchestrator is routing your query..."):
-        result = st.session_state.orchestrator.run(query)
+STAGE_LABELS = {
+    "direct": "💬 Answering directly...",
+    "research": "🔍 Research Agent is gathering facts...",
+    "writer": "✍️ Writer Agent is writing the response...",
+}
+
+
+def render_job(job: Job) -> None:
+    """Show a job's progress, route and (partial) outputs."""
+    if job.status == "queued":
+        st.info("⏳ Waiting for a free worker...")
+    elif job.status == "running":
+        st.status(STAGE_LABELS.get(job.stage, "🎯 Orchestrator is routing your query..."), state="running")
+        if st.button("Cancel", key=f"cancel-{job.id}"):
+            jobs.cancel(job.id)
+    elif job.status == "failed":
+        st.error(f"❌ {job.error}")
+    elif job.status == "cancelled":
+        st.warning("Cancelled.")
+    else:
+        st.success(f"✅ Done in {job.elapsed:.1f}s")
 
-    # Show the route taken
-    st.info(f"**Route:** {result['route']}")
+    if job.route:
+        st.info(f"**Route:** {job.route}")
+    if job.research:
+        with st.expander("🔍 Research Agent Output", expanded=not job.finished):
+            st.markdown(job.research)
+    if job.response:
+        st.subheader("📝 Final Response")
+        st.markdown(job.response)
 
-    # Show research findings if available
-    if result["research"]:
-        with st.expander("🔍 Research Agent Output", expanded=False):
-            st.markdown(result["research"])
 
-    # Show final response
-    st.subheader("📝 Final Response")
-    st.markdown(result["response"])
+@st.fragment(run_every=0.5)
+def poll_job(job_id: str) -> None:
+    """Re-render a running job every half second; rerun the page once it finishes to stop polling."""
+    job = jobs.get(job_id)
+    if job is None:
+        return
+    render_job(job)
+    if job.finished:
+        st.rerun()
+
+
+if st.button("Ask", type="primary") and query:
+    st.session_state.job_ids.append(jobs.submit(query))
+
+latest = jobs.get(st.session_state.job_ids[-1]) if st.session_state.job_ids else None
+if latest is not None and latest.finished:
+    render_job(latest)
+elif latest is not None:
+    poll_job(latest.id)
+
+earlier = [job for job_id in reversed(st.session_state.job_ids[:-1]) if (job := jobs.get(job_id)) is not None and job.result is not None]
+if earlier:
+    st.divider()
+    st.subheader("Earlier questions")
+    for job in earlier:
+        with st.expander(job.query):
+            st.markdown(job.response)
 
 # Sidebar with architecture info
 with st.sidebar:
@@ -77,3 +151,25 @@ User Query
 - **Writer Agent**: Transforms research into a polished response
 """,
     )
+
+    # Where the time goes: per-stage latency and token throughput of the queries run so far
+    st.header("Performance")
+    job_counts = jobs.stats()
+    st.caption(f"⚙️ Jobs: {job_counts['running']} running, {job_counts['queued']} queued")
+    rows = get_tracer().summary()
+    if rows:
+        seconds = st.column_config.NumberColumn(format="%.2f s")
+        st.dataframe(
+            rows,
+            hide_index=True,
+            column_config={"mean_s": seconds, "p95_s": seconds, "mean_ttft_s": seconds, "tokens_per_s": st.column_config.NumberColumn(format="%.1f")},
+        )
+        st.caption("Spans are also written as JSON lines to `.cache/traces.jsonl`.")
+        packing = writer_agent.packer.stats
+        if packing["packed"]:
+            st.caption(
+                f"📦 Context packing saved {writer_agent.packer.savings_rate:.0%} of research tokens "
+                f"({packing['duplicates']} duplicate and {packing['over_budget']} over-budget findings dropped).",
+            )
+    else:
+        st.caption("Ask a question to see per-stage timings.")
@@ -0,0 +1,145 @@
+"""Offline Orchestration Benchmark.
+
+Measure the multi-agent pipeline on any machine, without Ollama, using `FakeChatModel`
+with a simulated latency and token rate:
+  1. Overhead: wall time of `Orchestrator.run` minus the time the model itself needed
+  2. Concurrency scaling: throughput of concurrent `arun` calls per model concurrency limit
+  3. Cache effectiveness: share of repeated questions answered without a model call, and their latency
+
+Usage:
+  python benchmark.py --latency 0.05 --tokens-per-second 400 --queries 16
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from concurrency import DEFAULT_MODEL_CONCURRENCY, set_model_concurrency
+from fake_llm import FakeChatModel
+from llm_registry import DEFAULT_MODEL, set_llm_factory
+from orchestrator import Orchestrator
+from response_cache import ResponseCache
+from tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY_LEVELS = (1, 2, 4, 8)
+
+
+def install_fake_model(latency: float, tokens_per_second: float) -> FakeChatModel:
+    """Make every agent use one fake model and return it (its `stats` count all calls)."""
+    model = FakeChatModel(latency=latency, tokens_per_second=tokens_per_second)
+    set_llm_factory(lambda _: model)
+    # Keep benchmark spans out of the trace file
+    get_tracer().path = None
+    return model
+
+
+def make_queries(count: int) -> list[str]:
+    """Return `count` distinct research questions."""
+    return [f"What are the main facts about topic {i}?" for i in range(count)]
+
+
+def _model_seconds(model: FakeChatModel, before: dict[str, int]) -> float:
+    """Return the simulated model time spent since the `before` snapshot of its stats."""
+    calls = model.stats["calls"] - before["calls"]
+    tokens = model.stats["completion_tokens"] - before["completion_tokens"]
+    return calls * model.latency + tokens * model.seconds_per_token
+
+
+def measure_overhead(model: FakeChatModel, queries: list[str]) -> dict:
+    """Run queries one by one and split their wall time into model time and orchestration overhead."""
+    orch = Orchestrator(use_local_router=False)
+    walls = []
+    before = dict(model.stats)
+    for query in queries:
+        start = time.perf_counter()
+        orch.run(query)
+        walls.append(time.perf_counter() - start)
+    model_ms = 1000 * _model_seconds(model, before) / len(queries)
+    mean_ms = 1000 * statistics.fmean(walls)
+    return {"queries": len(queries), "mean_ms": mean_ms, "model_ms": model_ms, "overhead_ms": mean_ms - model_ms}
+
+
+def measure_concurrency(queries: list[str], levels: tuple[int, ...] = DEFAULT_CONCURRENCY_LEVELS) -> list[dict]:
+    """Run all queries concurrently through `arun` for each model concurrency limit."""
+
+    async def run_all(orch: Orchestrator) -> None:
+        await asyncio.gather(*(orch.arun(query) for query in queries))
+
+    rows = []
+    try:
+        for level in levels:
+            set_model_concurrency(DEFAULT_MODEL, level)
+            start = time.perf_counter()
+            asyncio.run(run_all(Orchestrator(use_local_router=False)))
+            seconds = time.perf_counter() - start
+            rows.append({"concurrency": level, "seconds": seconds, "queries_per_s": len(queries) / seconds})
+    finally:
+        set_model_concurrency(DEFAULT_MODEL, DEFAULT_MODEL_CONCURRENCY)
+    for row in rows:
+        row["speedup"] = row["queries_per_s"] / rows[0]["queries_per_s"]
+    return rows
+
+
+def measure_cache(model: FakeChatModel, queries: list[str], repeats: int = 3) -> dict:
+    """Ask every query `repeats` times (with varied casing and punctuation) against an exact-match cache."""
+    orch = Orchestrator(use_local_router=False, cache=ResponseCache(semantic=False))
+    cold, warm = [], []
+    hits = 0
+    for round_ in range(repeats):
+        for query in queries:
+            phrasing = query if round_ == 0 else f"  {query.upper().rstrip('?')} !"
+            calls = model.stats["calls"]
+            start = time.perf_counter()
+            orch.run(phrasing)
+            (cold if round_ == 0 else warm).append(time.perf_counter() - start)
+            hits += model.stats["calls"] == calls
+    requests = len(cold) + len(warm)
+    return {
+        "requests": requests,
+        "hit_rate": hits / requests,
+        "cold_ms": 1000 * statistics.fmean(cold),
+        "warm_ms": 1000 * statistics.fmean(warm) if warm else None,
+    }
+
+
+def run_benchmark(latency: float = 0.05, tokens_per_second: float = 400.0, queries: int = 16) -> dict:
+    """Run all three measurements and return their results."""
+    model = install_fake_model(latency, tokens_per_second)
+    try:
+        workload = make_queries(queries)
+        return {
+            "overhead": measure_overhead(model, workload),
+            "concurrency": measure_concurrency(workload),
+            "cache": measure_cache(model, workload),
+        }
+    finally:
+        set_llm_factory(None)
+
+
+# CLI usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the orchestrator offline with a simulated-latency model.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated time to first token, in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Simulated generation speed (0 = instant)")
+    parser.add_argument("--queries", type=int, default=16, help="Number of distinct queries")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+    results = run_benchmark(args.latency, args.tokens_per_second, args.queries)
+
+    overhead = results["overhead"]
+    logger.info("\n⏱️  Overhead (sequential run, %d queries)", overhead["queries"])
+    logger.info("   %.1f ms per query = %.1f ms model + %.2f ms orchestration", overhead["mean_ms"], overhead["model_ms"], overhead["overhead_ms"])
+
+    logger.info("\n📈 Concurrency scaling (arun, %d concurrent queries)", args.queries)
+    for row in results["concurrency"]:
+        logger.info("   limit %2d: %6.2f queries/s (%.2fx)", row["concurrency"], row["queries_per_s"], row["speedup"])
+
+    cache = results["cache"]
+    logger.info("\n💾 Cache (%d requests)", cache["requests"])
+    logger.info("   hit rate %.0f%%, cold %.1f ms, warm %.2f ms\n", 100 * cache["hit_rate"], cache["cold_ms"], cache["warm_ms"])
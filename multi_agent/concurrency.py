@@ -0,0 +1,163 @@
+"""Concurrency Controls for the Async Agents.
+
+Keep a shared Ollama backend from being overloaded when many users call `Orchestrator.arun`:
+  - FairLimiter: a first-come, first-served concurrency limit per model
+  - InflightCoalescer: concurrent identical requests share a single execution
+
+Both work across threads and event loops (e.g. one `asyncio.run` per Streamlit session),
+so the limits are truly process-wide.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import logging
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_CONCURRENCY = 2
+
+
+class FairLimiter:
+    """FIFO-fair concurrency limit usable from any thread or event loop."""
+
+    def __init__(self, limit: int) -> None:
+        """Allow at most `limit` holders at a time."""
+        self.limit = limit
+        self.active = 0
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future[None]]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        """Return the number of callers waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        """Wait for a slot; callers are served in arrival order."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                still_queued = waiter in self._waiters
+                if still_queued:
+                    self._waiters.remove(waiter)
+            # The slot may have been handed over just before the cancellation
+            if not still_queued and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it directly to the longest waiting caller (unless the limit was lowered)."""
+        with self._lock:
+            if not self._waiters or self.active > self.limit:
+                self.active -= 1
+                return
+            loop, future = self._waiters.popleft()
+        loop.call_soon_threadsafe(self._grant, future)
+
+    def set_limit(self, limit: int) -> None:
+        """Change the limit; raising it wakes as many waiters as there are new free slots."""
+        with self._lock:
+            self.limit = limit
+            woken = []
+            while self._waiters and self.active < self.limit:
+                self.active += 1
+                woken.append(self._waiters.popleft())
+        for loop, future in woken:
+            loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: asyncio.Future[None]) -> None:
+        """Wake a waiter on its own loop, passing the slot on if it was cancelled meanwhile."""
+        if future.cancelled():
+            self.release()
+        elif not future.done():
+            future.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+_limiters: dict[str, FairLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_model_limiter(model: str) -> FairLimiter:
+    """Return the process-wide limiter for a model, creating it with the default limit."""
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = FairLimiter(DEFAULT_MODEL_CONCURRENCY)
+        return _limiters[model]
+
+
+def set_model_concurrency(model: str, limit: int) -> None:
+    """Set how many requests may run against a model at the same time."""
+    get_model_limiter(model).set_limit(limit)
+
+
+class InflightCoalescer:
+    """Run identical concurrent requests once and share the result with every caller."""
+
+    def __init__(self) -> None:
+        """Create an empty in-flight table."""
+        self._inflight: dict[str, concurrent.futures.Future[Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:  # noqa: ANN401
+        """Await `func()` unless a call with the same key is already running, then share its result."""
+        while True:
+            with self._lock:
+                shared = self._inflight.get(key)
+                owner = shared is None
+                if owner:
+                    shared = concurrent.futures.Future()
+                    self._inflight[key] = shared
+                    self.stats["executed"] += 1
+                else:
+                    self.stats["coalesced"] += 1
+            if owner:
+                return await self._execute(key, shared, func)
+            logger.info("  🔗 Coalescing with an identical in-flight request")
+            try:
+                # Shielded so a follower's cancellation does not cancel the shared execution
+                return await asyncio.shield(asyncio.wrap_future(shared))
+            except asyncio.CancelledError:
+                if shared.cancelled():
+                    continue  # The owner was cancelled; retry (possibly as the new owner)
+                raise
+
+    async def _execute(self, key: str, shared: concurrent.futures.Future[Any], func: Callable[[], Awaitable[Any]]) -> Any:  # noqa: ANN401
+        """Run the request as its owner and publish the outcome to any followers."""
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            shared.cancel()
+            raise
+        except BaseException as exc:
+            # Followers must never wait on an unresolved future, whatever stopped the owner
+            shared.set_exception(exc)
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,182 @@
+"""Context Packer.
+
+Fit research findings into the writer's prompt budget before the writer runs:
+  1. Split the findings into bullets or paragraphs (headings are dropped, wrapped lines are joined)
+  2. Drop duplicate and near-duplicate bullets
+  3. Rank bullets by relevance to the query (word overlap, or cosine similarity with an embedder)
+  4. Add the most relevant bullets first while they fit in the token budget
+
+Tokens are estimated (about 4 characters per token) unless a `count_tokens` function is given.
+"""
+
+import logging
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+from embeddings import Embedder
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_BULLET = re.compile(r"^\s*(?:[-*•+]|\d+[.)])\s+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how in is it of on or the this that to was what when where which who why will with".split(),  # noqa: SIM905
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text (about 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def split_bullets(text: str) -> list[str]:
+    """Split findings into bullet texts, without markers, headings or blank lines."""
+    bullets: list[str] = []
+    continues = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or (stripped.endswith(":") and not _BULLET.match(line)):
+            continues = False
+            continue
+        if continues and not _BULLET.match(line):
+            # A wrapped continuation of the previous bullet or paragraph
+            bullets[-1] += " " + stripped
+        else:
+            bullets.append(_BULLET.sub("", line).strip())
+        continues = True
+    return bullets
+
+
+def _words(text: str) -> set[str]:
+    """Return the lowercase content words of a text."""
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+@dataclass
+class PackResult:
+    """Packed findings and what packing removed."""
+
+    text: str
+    tokens_before: int
+    tokens_after: int
+    kept: int
+    duplicates: int
+    over_budget: int
+
+    @property
+    def tokens_saved(self) -> int:
+        """Return how many tokens packing removed."""
+        return self.tokens_before - self.tokens_after
+
+
+class ContextPacker:
+    """Deduplicate and pack research bullets into a token budget, most relevant first."""
+
+    def __init__(
+        self,
+        count_tokens: TokenCounter = estimate_tokens,
+        embed: Embedder | None = None,
+        near_duplicate_threshold: float = DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    ) -> None:
+        """Configure token counting and relevance; without `embed`, relevance is word overlap with the query."""
+        self.count_tokens = count_tokens
+        self.embed = embed
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._lock = threading.Lock()
+        self.stats = {"packed": 0, "tokens_before": 0, "tokens_after": 0, "duplicates": 0, "over_budget": 0}
+
+    def pack(self, query: str, findings: str, budget: int) -> PackResult:
+        """Return the findings reduced to at most `budget` tokens."""
+        tokens_before = self.count_tokens(findings)
+        bullets = split_bullets(findings)
+        unique = self._deduplicate(bullets)
+
+        if tokens_before <= budget and len(unique) == len(bullets):
+            # Already fits: keep the writer's input exactly as the researcher wrote it
+            kept = bullets
+            text = findings
+        else:
+            kept, used = [], 0
+            ranked = self._rank(query, unique)
+            for index in ranked:
+                line = f"- {unique[index]}"
+                cost = self.count_tokens(line) + 1  # +1 for the newline
+                if used + cost <= budget:
+                    kept.append(line)
+                    used += cost
+            if not kept and ranked:
+                # Not even one bullet fits: keep the start of the most relevant one
+                kept.append(self._truncate(f"- {unique[ranked[0]]}", budget))
+            text = "\n".join(kept)
+
+        result = PackResult(
+            text=text,
+            tokens_before=tokens_before,
+            tokens_after=self.count_tokens(text),
+            kept=len(kept),
+            duplicates=len(bullets) - len(unique),
+            over_budget=len(unique) - len(kept),
+        )
+        self._record(result)
+        return result
+
+    @property
+    def savings_rate(self) -> float:
+        """Return the fraction of findings tokens removed so far."""
+        before = self.stats["tokens_before"]
+        return 1 - self.stats["tokens_after"] / before if before else 0.0
+
+    def _deduplicate(self, bullets: list[str]) -> list[str]:
+        """Drop bullets whose words mostly repeat an earlier bullet's."""
+        unique: list[str] = []
+        seen: list[set[str]] = []
+        for bullet in bullets:
+            words = _words(bullet)
+            if any(len(words & other) / (len(words | other) or 1) >= self.near_duplicate_threshold for other in seen):
+                continue
+            unique.append(bullet)
+            seen.append(words)
+        return unique
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """Cut a text at a word boundary so that it fits in the budget."""
+        words = text.split()
+        while len(words) > 1 and self.count_tokens(" ".join(words)) > budget:
+            words = words[: max(1, len(words) * 9 // 10)]
+        return " ".join(words)
+
+    def _rank(self, query: str, bullets: list[str]) -> list[int]:
+        """Return bullet indices ordered by relevance to the query (ties keep the original order)."""
+        if not bullets:
+            return []
+        if self.embed is not None:
+            vectors = self.embed([query, *bullets])
+            scores = vectors[1:] @ vectors[0]
+        else:
+            terms = _words(query)
+            scores = np.array([len(terms & _words(bullet)) / (len(terms) or 1) for bullet in bullets])
+        return sorted(range(len(bullets)), key=lambda i: -scores[i])
+
+    def _record(self, result: PackResult) -> None:
+        """Add a packing result to the running stats."""
+        with self._lock:
+            self.stats["packed"] += 1
+            self.stats["tokens_before"] += result.tokens_before
+            self.stats["tokens_after"] += result.tokens_after
+            self.stats["duplicates"] += result.duplicates
+            self.stats["over_budget"] += result.over_budget
+        if result.duplicates or result.over_budget:
+            logger.info(
+                "  📦 Context: %d → %d tokens (%d duplicate, %d over budget)",
+                result.tokens_before,
+                result.tokens_after,
+                result.duplicates,
+                result.over_budget,
+            )
@@ -0,0 +1,51 @@
+"""Local Sentence Embeddings.
+
+A small local embedding model (sentence-transformers) shared by the agents.
+The model is loaded on first use, so importing this module stays cheap.
+Vectors are L2-normalized, so a dot product is the cosine similarity.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+# Any function that maps a list of texts to a (len(texts), dim) array of normalized vectors
+Embedder = Callable[[list[str]], np.ndarray]
+
+
+class LocalEmbedder:
+    """Lazily loaded sentence-transformer that returns normalized embeddings."""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL) -> None:
+        """Remember the model name; the model itself is loaded on first call."""
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        """Embed the given texts."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer  # noqa: PLC0415
+
+                    logger.info("Loading embedding model: %s...", self.model_name)
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
+
+_default_embedder: LocalEmbedder | None = None
+
+
+def get_default_embedder() -> LocalEmbedder:
+    """Return the process-wide embedder so every component shares one model copy."""
+    global _default_embedder  # noqa: PLW0603
+    if _default_embedder is None:
+        _default_embedder = LocalEmbedder()
+    return _default_embedder
@@ -0,0 +1,160 @@
+"""Fake Chat Model.
+
+A deterministic stand-in for ChatOllama, so the agents can be tested and benchmarked without Ollama:
+  - Replies are picked by matching `replies` keys against the system prompt (e.g. "Research Agent")
+  - `latency` simulates the time to the first token, `tokens_per_second` the generation speed
+  - With tools bound, the first turn returns the configured `tool_calls`; once tool results are in
+    the conversation, the model answers with text
+  - Token usage is reported like Ollama does (one token per word), so tracing works unchanged
+
+Install it for every agent with:
+    llm_registry.set_llm_factory(lambda model: FakeChatModel(model=model, latency=0.2))
+"""
+
+import asyncio
+import json
+import re
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+
+DEFAULT_REPLIES = {
+    "Orchestrator Agent": "research_and_write",
+    "Research Agent": "Research Findings:\n- Fact one about the topic.\n- Fact two about the topic.\n- Fact three about the topic.",
+    "Writer Agent": "## Answer\n\nA clear, well-structured response based on the research findings.\n\n**Summary:** the three key facts.",
+}
+DEFAULT_REPLY = "Hello! How can I help you today?"
+
+
+def _words(text: str) -> list[str]:
+    """Split text into word tokens that keep their trailing whitespace."""
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model with simulated latency, token rate and tool calls."""
+
+    model: str = "fake"
+    temperature: float = 0.0
+    replies: dict[str, str] = Field(default_factory=lambda: dict(DEFAULT_REPLIES))
+    default_reply: str = DEFAULT_REPLY
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    tool_calls: list[dict[str, Any]] = Field(default_factory=list)
+    # Shared by the temperature variants `llm_registry` copies from one base client
+    stats: dict[str, int] = Field(default_factory=lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0})
+
+    @property
+    def _llm_type(self) -> str:
+        """Return the model type used in LangChain metadata."""
+        return "fake-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        """Return the parameters that identify this model."""
+        return {"model_name": self.model, "latency": self.latency, "tokens_per_second": self.tokens_per_second}
+
+    def bind_tools(self, tools: Sequence[dict[str, Any] | type | Callable | BaseTool], **kwargs: Any) -> Runnable[LanguageModelInput, AIMessage]:  # noqa: ANN401
+        """Bind tools; their presence makes the first turn answer with `tool_calls`."""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _reply(self, messages: list[BaseMessage], tools: list | None) -> AIMessage:
+        """Build the full reply for a conversation."""
+        prompt = "\n".join(str(m.content) for m in messages if isinstance(m, SystemMessage)) or "\n".join(str(m.content) for m in messages)
+        prompt_tokens = sum(len(_words(str(m.content))) for m in messages)
+        if tools and self.tool_calls and not any(isinstance(m, ToolMessage) for m in messages):
+            calls = [{"name": call["name"], "args": call.get("args", {}), "id": f"call_{i}", "type": "tool_call"} for i, call in enumerate(self.tool_calls)]
+            text, tool_calls = "", calls
+        else:
+            text = next((reply for key, reply in self.replies.items() if key in prompt), self.default_reply)
+            tool_calls = []
+        completion_tokens = len(_words(text)) if text else len(tool_calls)
+        self.stats["calls"] += 1
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["completion_tokens"] += completion_tokens
+        usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        return AIMessage(content=text, tool_calls=tool_calls, usage_metadata=usage, response_metadata={"model_name": self.model})
+
+    @property
+    def seconds_per_token(self) -> float:
+        """Return the simulated time per output token."""
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _chunks(self, message: AIMessage) -> list[AIMessageChunk]:
+        """Split a reply into streamed chunks; usage and tool calls ride on the last one."""
+        words = _words(str(message.content)) if message.content else [""]
+        chunks = [AIMessageChunk(content=word) for word in words]
+        chunks[-1] = AIMessageChunk(
+            content=words[-1],
+            tool_call_chunks=[{"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i} for i, c in enumerate(message.tool_calls)],
+            usage_metadata=message.usage_metadata,
+            response_metadata=message.response_metadata,
+        )
+        return chunks
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,  # noqa: ARG002
+        run_manager: CallbackManagerForLLMRun | None = None,  # noqa: ARG002
+        **kwargs: Any,  # noqa: ANN401
+    ) -> ChatResult:
+        """Sleep for the simulated latency and generation time, then return the reply."""
+        message = self._reply(messages, kwargs.get("tools"))
+        time.sleep(self.latency + self.seconds_per_token * (message.usage_metadata or {}).get("output_tokens", 0))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,  # noqa: ARG002
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,  # noqa: ARG002
+        **kwargs: Any,  # noqa: ANN401
+    ) -> ChatResult:
+        """Async version of `_generate`; waits without blocking the event loop."""
+        message = self._reply(messages, kwargs.get("tools"))
+        await asyncio.sleep(self.latency + self.seconds_per_token * (message.usage_metadata or {}).get("output_tokens", 0))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,  # noqa: ARG002
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Iterator[ChatGenerationChunk]:
+        """Yield the reply word by word at the simulated token rate."""
+        time.sleep(self.latency)
+        for chunk in self._chunks(self._reply(messages, kwargs.get("tools"))):
+            if chunk.content:
+                time.sleep(self.seconds_per_token)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager is not None:
+                run_manager.on_llm_new_token(str(chunk.content), chunk=generation)
+            yield generation
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,  # noqa: ARG002
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Async version of `_stream`."""
+        await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._reply(messages, kwargs.get("tools"))):
+            if chunk.content:
+                await asyncio.sleep(self.seconds_per_token)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(str(chunk.content), chunk=generation)
+            yield generation
@@ -0,0 +1,148 @@
+"""Background Jobs.
+
+Run Orchestrator queries on a process-wide worker pool instead of in the caller's thread:
+  - `submit` returns a job ID immediately; the pipeline runs on a worker thread
+  - The job is updated from `Orchestrator.stream` events, so callers can poll its stage and partial output
+  - Jobs outlive the caller (e.g. a Streamlit rerun); finished jobs are kept until `max_finished` is exceeded
+
+Used by `app.py`, so the Streamlit script thread only renders and many browser sessions share one backend.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from orchestrator import Orchestrator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_FINISHED = 256
+
+
+@dataclass
+class Job:
+    """A query and the progress of its pipeline run."""
+
+    id: str
+    query: str
+    status: str = "queued"  # queued, running, done, failed or cancelled
+    route: str | None = None
+    stage: str | None = None
+    research: str = ""
+    response: str = ""
+    result: dict | None = None
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    cancel_requested: bool = False
+
+    @property
+    def finished(self) -> bool:
+        """Return True once the job has stopped, successfully or not."""
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def elapsed(self) -> float:
+        """Return the seconds spent running so far (or in total, once finished)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def apply(self, event: dict) -> None:
+        """Update the job from one `Orchestrator.stream` event."""
+        if event["type"] == "route":
+            self.route = event["route"]
+        elif event["type"] == "stage":
+            self.stage = event["stage"]
+        elif event["type"] == "token" and event["stage"] == "research":
+            self.research += event["text"]
+        elif event["type"] == "token":
+            self.response += event["text"]
+        elif event["type"] == "done":
+            self.result = event["result"]
+
+
+class JobManager:
+    """Submit queries to a shared worker pool and look up their progress by job ID."""
+
+    def __init__(self, orchestrator: Orchestrator, max_workers: int = DEFAULT_MAX_WORKERS, max_finished: int = DEFAULT_MAX_FINISHED) -> None:
+        """Run jobs on `orchestrator` with at most `max_workers` pipelines at a time."""
+        self.orchestrator = orchestrator
+        self.max_finished = max_finished
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orchestrator-job")
+
+    def submit(self, query: str) -> str:
+        """Queue a query and return its job ID."""
+        job = Job(id=uuid.uuid4().hex[:12], query=query)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._pool.submit(self._run, job)
+        logger.info("  📨 Jobs: queued %s (%d waiting)", job.id, self.stats()["queued"])
+        return job.id
+
+    def get(self, job_id: str) -> Job | None:
+        """Return the job with this ID, or None if it is unknown or was evicted."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a job to stop after its current event; return False if it already finished."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_requested = True
+        return True
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of jobs per status."""
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0, "cancelled": 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """Stop accepting jobs and wait for the running ones."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, job: Job) -> None:
+        """Run one job on a worker thread, recording progress and the outcome."""
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        events = self.orchestrator.stream(job.query)
+        try:
+            for event in events:
+                job.apply(event)
+                if job.cancel_requested:
+                    job.status = "cancelled"
+                    break
+            else:
+                job.status = "done"
+        except Exception as exc:
+            logger.exception("  ❌ Jobs: %s failed", job.id)
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.status = "failed"
+        finally:
+            events.close()
+            job.finished_at = time.time()
+            with self._lock:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond `max_finished` (call with the lock held)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
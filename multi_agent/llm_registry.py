@@ -0,0 +1,135 @@
+"""Shared LLM Client Registry.
+
+One place to get chat model clients for every agent:
+  - One base client per model; variants that differ only in temperature are shallow
+    copies of it, so they share its HTTP connection pool
+  - Async requests use one connection pool per event loop, since pooled connections belong to
+    the loop that opened them (each `asyncio.run` gets its own)
+  - Requests ask Ollama to keep the model loaded (`keep_alive`) between queries
+  - `warm_up` loads the model in the background at startup, so the first user query
+    does not pay the model load
+
+`set_llm_factory` replaces how base clients are built (e.g. a fake model in tests), and
+`add_llm_callback` attaches a LangChain callback handler (e.g. the tracer) to every client.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from collections.abc import Callable
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-oss:latest"
+DEFAULT_KEEP_ALIVE = os.environ.get("AGENT_LLM_KEEP_ALIVE", "30m")
+
+LLMFactory = Callable[[str], BaseChatModel]
+
+_base_clients: dict[str, BaseChatModel] = {}
+_clients: dict[tuple[str, float], BaseChatModel] = {}
+_factory: LLMFactory | None = None
+_callbacks: list[BaseCallbackHandler] = []
+_warmed: set[str] = set()
+_lock = threading.Lock()
+
+
+class _PerLoopAsyncClient:
+    """Stand-in for ChatOllama's async client that gives each running event loop its own client."""
+
+    def __init__(self, make_client: Callable[[], Any]) -> None:
+        """Create clients with `make_client()`, one per event loop, on first use in that loop."""
+        self._make_client = make_client
+        # A loop's client is dropped with the loop
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        """Return the attribute of the running loop's client."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = self._make_client()
+        return getattr(client, name)
+
+
+def _ollama_factory(model: str) -> BaseChatModel:
+    """Build a ChatOllama client that keeps the model loaded between requests."""
+    from langchain_ollama import ChatOllama  # noqa: PLC0415
+
+    def make() -> ChatOllama:
+        return ChatOllama(model=model, keep_alive=DEFAULT_KEEP_ALIVE)
+
+    client = make()
+    # The temperature variants share this private attribute (model_copy is shallow), and so the per-loop clients
+    client._async_client = _PerLoopAsyncClient(lambda: make()._async_client)  # noqa: SLF001
+    return client
+
+
+def get_llm(temperature: float = 0.0, model: str = DEFAULT_MODEL) -> BaseChatModel:
+    """Return the shared client for a model and temperature."""
+    key = (model, temperature)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        if key not in _clients:
+            if model not in _base_clients:
+                _base_clients[model] = (_factory or _ollama_factory)(model)
+            update = {"temperature": temperature, "callbacks": list(_callbacks)} if _callbacks else {"temperature": temperature}
+            _clients[key] = _base_clients[model].model_copy(update=update)
+        return _clients[key]
+
+
+def set_llm_factory(factory: LLMFactory | None) -> None:
+    """Use `factory(model)` to build base clients (None restores ChatOllama) and drop cached clients."""
+    global _factory  # noqa: PLW0603
+    with _lock:
+        _factory = factory
+        _base_clients.clear()
+        _clients.clear()
+
+
+def add_llm_callback(handler: BaseCallbackHandler) -> None:
+    """Attach a callback handler to every client returned from now on (added once per handler)."""
+    with _lock:
+        if handler not in _callbacks:
+            _callbacks.append(handler)
+            _clients.clear()
+
+
+def warm_up(models: list[str] | None = None, *, background: bool = True) -> threading.Thread | None:
+    """Ask Ollama to load the models now, so the first real query finds them in memory.
+
+    Runs in a daemon thread unless `background` is False. Each model is warmed once per
+    process (safe to call on every Streamlit rerun). Does nothing when a custom factory is installed.
+    """
+    with _lock:
+        pending = [model for model in models or [DEFAULT_MODEL] if model not in _warmed]
+        _warmed.update(pending)
+    if _factory is not None or not pending:
+        return None
+
+    def load() -> None:
+        import ollama  # noqa: PLC0415
+
+        for model in pending:
+            try:
+                # An empty generate request loads the model without producing tokens
+                ollama.Client().generate(model=model, keep_alive=DEFAULT_KEEP_ALIVE)
+                logger.info("Warmed up model: %s", model)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Could not warm up model %s: %s", model, exc)
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, name="llm-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -1,17 +1,52 @@
 """Orchestrator Agent.
 
 Receive a user query, delegate work to two sub-agents, and combine results into a final answer.
+
+`Orchestrator.stream` yields the same pipeline as a sequence of events so that callers can
+render tokens as they arrive instead of waiting for every agent to finish:
+  {"type": "route", "route": ...}                    routing decision
+  {"type": "stage", "stage": ...}                    a stage ("direct", "research" or "writer") started
+  {"type": "token", "stage": ..., "text": ...}       a chunk of model output for that stage
+  {"type": "done", "result": ...}                    the final result, same shape as `run`
+
+Every query is traced (see `tracing.py`): one "query" span with a child span per stage, and one
+span per LLM call inside the stage, written to `.cache/traces.jsonl`.
 """
 
+import asyncio
+import contextlib
 import logging
+import random
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import research_agent
 import writer_agent
-from langchain_ollama import ChatOllama
+from concurrency import InflightCoalescer, get_model_limiter
+from llm_registry import DEFAULT_MODEL, add_llm_callback, get_llm, warm_up
+from response_cache import ResponseCache, normalize_query
+from router import DEFAULT_ROUTE_AUDIT_RATE, EmbeddingRouter
+from tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
-llm = ChatOllama(model="gpt-oss:latest", temperature=0)
+# Routing must be deterministic
+TEMPERATURE = 0.0
+
+# Identical queries in flight across all Orchestrator instances share one execution
+_inflight = InflightCoalescer()
+
+# One background thread, shared by all Orchestrator instances and started on first use, runs the route audits
+_audit_pool: ThreadPoolExecutor | None = None
+_audit_pool_lock = threading.Lock()
+
+# Every model call made by the agents is recorded as a span of the stage that made it
+tracer = get_tracer()
+add_llm_callback(tracer.callback)
 
 ROUTING_PROMPT = """You are an Orchestrator Agent. Given a user query, decide if it needs:
 1. "research_and_write" — needs factual research then a written response (most queries)
@@ -21,9 +56,43 @@ Respond with ONLY one word: either "research_and_write" or "direct".
 """
 
 
+def _get_audit_pool() -> ThreadPoolExecutor:
+    """Return the shared route audit thread pool, creating it on first use."""
+    global _audit_pool  # noqa: PLW0603
+    with _audit_pool_lock:
+        if _audit_pool is None:
+            _audit_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="route-audit")
+        return _audit_pool
+
+
 class Orchestrator:
     """Orchestrate two sub-agents: Research Agent and Writer Agent."""
 
+    def __init__(
+        self,
+        router: EmbeddingRouter | None = None,
+        cache: ResponseCache | None = None,
+        *,
+        use_local_router: bool = True,
+        route_audit_rate: float = DEFAULT_ROUTE_AUDIT_RATE,
+    ) -> None:
+        """Create the orchestrator.
+
+        Args:
+            router: Local embedding router tried before the routing LLM; a default one is created if omitted.
+            cache: Optional response cache checked before running the pipeline; it also stores research findings.
+            use_local_router: Set to False to always route with the LLM.
+            route_audit_rate: Fraction of confident local decisions that are also checked against the LLM
+                in the background, to keep measuring the router's accuracy.
+
+        """
+        self.router = (router or EmbeddingRouter()) if use_local_router else None
+        self.cache = cache
+        self.route_audit_rate = route_audit_rate
+        # How often `arun` started research before the route was known, and how often that was wasted
+        self.speculation_stats = {"speculated": 0, "wasted": 0, "overlap_seconds": 0.0}
+        self._speculation_lock = threading.Lock()  # `arun` may run on several threads' event loops at once
+
     def run(self, query: str) -> dict:
         """Process a user query through the multi-agent pipeline and return results."""
         logger.info("%s", "=" * 60)
@@ -31,49 +100,302 @@ class Orchestrator:
         logger.info('     "%s"', query)
         logger.info("%s\n", "=" * 60)
 
-        # Step 1: Decide routing
-        route = self._decide_route(query)
-        logger.info("  📋 Orchestrator: Route → %s", route)
+        with tracer.span("query", kind="query", mode="run") as root:
+            cached = self._cached_result(query)
+            if cached is not None:
+                root.attributes["cached"] = True
+                return cached
+
+            # Step 1: Decide routing
+            with tracer.span("routing"):
+                route = self._decide_route(query)
+            root.attributes["route"] = route
+            logger.info("  📋 Orchestrator: Route → %s", route)
+
+            if route == "direct":
+                with tracer.span("direct"):
+                    response = self._direct_response(query)
+                return self._remember({"query": query, "route": "direct", "research": None, "response": response})
+
+            # Step 2: Call Research Agent (or reuse findings cached for a similar query)
+            logger.info("%s", "-" * 40)
+            logger.info("  Step 1/2: Calling Research Agent")
+            logger.info("%s", "-" * 40)
+            with tracer.span("research") as span:
+                research = self._cached_research(query)
+                span.attributes["cached"] = research is not None
+                if research is None:
+                    research = research_agent.run(query)
+                    self._remember_research(query, research)
+
+            # Step 3: Call Writer Agent with research findings
+            logger.info("%s", "-" * 40)
+            logger.info("  Step 2/2: Calling Writer Agent")
+            logger.info("%s", "-" * 40)
+            with tracer.span("writer"):
+                response = writer_agent.run(query, research)
 
-        if route == "direct":
-            response = self._direct_response(query)
-            return {"query": query, "route": "direct", "research": None, "response": response}
+            logger.info("  ✅ Orchestrator: All agents finished.")
+            return self._remember({"query": query, "route": "research_and_write", "research": research, "response": response})
+
+    def stream(self, query: str) -> Iterator[dict]:
+        """Process a user query and yield stage and token events as they are produced."""
+        logger.info("  🎯 Orchestrator: Received query (streaming)")
+        logger.info('     "%s"', query)
+
+        with tracer.span("query", kind="query", mode="stream") as root:
+            cached = self._cached_result(query)
+            if cached is not None:
+                root.attributes["cached"] = True
+                yield from self._replay(cached)
+                return
+
+            with tracer.span("routing"):
+                route = self._decide_route(query)
+            root.attributes["route"] = route
+            logger.info("  📋 Orchestrator: Route → %s", route)
+            yield {"type": "route", "route": route}
+
+            if route == "direct":
+                yield {"type": "stage", "stage": "direct"}
+                response = ""
+                with tracer.span("direct"):
+                    for chunk in get_llm(TEMPERATURE).stream(self._direct_messages(query)):
+                        if chunk.content:
+                            response += chunk.content
+                            yield {"type": "token", "stage": "direct", "text": chunk.content}
+                yield {"type": "done", "result": self._remember({"query": query, "route": "direct", "research": None, "response": response})}
+                return
+
+            yield {"type": "stage", "stage": "research"}
+            with tracer.span("research") as span:
+                research = self._cached_research(query)
+                span.attributes["cached"] = research is not None
+                if research is not None:
+                    yield {"type": "token", "stage": "research", "text": research}
+                else:
+                    research = ""
+                    for text in research_agent.stream(query):
+                        research += text
+                        yield {"type": "token", "stage": "research", "text": text}
+                    self._remember_research(query, research)
+
+            yield {"type": "stage", "stage": "writer"}
+            response = ""
+            with tracer.span("writer"):
+                for text in writer_agent.stream(query, research):
+                    response += text
+                    yield {"type": "token", "stage": "writer", "text": text}
+
+            logger.info("  ✅ Orchestrator: All agents finished.")
+            yield {"type": "done", "result": self._remember({"query": query, "route": "research_and_write", "research": research, "response": response})}
+
+    async def arun(self, query: str) -> dict:
+        """Async version of `run`, safe to call concurrently for many users.
+
+        Model calls wait for a slot in a per-model FIFO queue (see `concurrency.py`), and
+        concurrent identical queries are coalesced so they share one pipeline execution.
+        """
+        result = await _inflight.run(normalize_query(query), lambda: self._arun(query))
+        return dict(result)
+
+    async def _arun(self, query: str) -> dict:
+        """Run the async pipeline, speculatively starting research while the route is decided.
+
+        Most queries end up on "research_and_write", so the Research Agent is started together
+        with routing. If the route comes back "direct", the research call is cancelled.
+        """
+        logger.info("  🎯 Orchestrator: Received query (async)")
+        logger.info('     "%s"', query)
 
-        # Step 2: Call Research Agent
-        logger.info("%s", "-" * 40)
-        logger.info("  Step 1/2: Calling Research Agent")
-        logger.info("%s", "-" * 40)
-        research = research_agent.run(query)
+        with tracer.span("query", kind="query", mode="async") as root:
+            cached = await asyncio.to_thread(self._cached_result, query)
+            if cached is not None:
+                root.attributes["cached"] = True
+                return cached
 
-        # Step 3: Call Writer Agent with research findings
-        logger.info("%s", "-" * 40)
-        logger.info("  Step 2/2: Calling Writer Agent")
-        logger.info("%s", "-" * 40)
-        response = writer_agent.run(query, research)
+            research_task = asyncio.create_task(self._aresearch(query))
+            start = time.perf_counter()
+            try:
+                with tracer.span("routing"):
+                    route = await self._adecide_route(query)
+            except BaseException:
+                research_task.cancel()
+                raise
+            routing_seconds = time.perf_counter() - start
+            root.attributes["route"] = route
+            logger.info("  📋 Orchestrator: Route → %s", route)
 
-        logger.info("  ✅ Orchestrator: All agents finished.")
-        return {"query": query, "route": "research_and_write", "research": research, "response": response}
+            if route == "direct":
+                research_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await research_task
+                self._record_speculation(wasted=True)
+                logger.info("  🔮 Orchestrator: Speculative research cancelled (%.0f%% wasted so far)", 100 * self.speculation_waste_rate)
+                with tracer.span("direct"):
+                    response = await self._adirect_response(query)
+                return await asyncio.to_thread(self._remember, {"query": query, "route": "direct", "research": None, "response": response})
+
+            # Routing ran in the shadow of the research call instead of in front of it
+            self._record_speculation(wasted=False, overlap_seconds=routing_seconds)
+            research = await research_task
+            with tracer.span("writer"):
+                response = await writer_agent.arun(query, research)
+
+            logger.info("  ✅ Orchestrator: All agents finished.")
+            # Storing a result embeds the query, which must not block the event loop
+            return await asyncio.to_thread(self._remember, {"query": query, "route": "research_and_write", "research": research, "response": response})
+
+    @property
+    def speculation_waste_rate(self) -> float:
+        """Return the fraction of speculative research calls that were cancelled."""
+        with self._speculation_lock:
+            speculated = self.speculation_stats["speculated"]
+            return self.speculation_stats["wasted"] / speculated if speculated else 0.0
+
+    def _record_speculation(self, *, wasted: bool, overlap_seconds: float = 0.0) -> None:
+        """Count one speculative research start, and whether it was cancelled."""
+        with self._speculation_lock:
+            self.speculation_stats["speculated"] += 1
+            self.speculation_stats["wasted"] += int(wasted)
+            self.speculation_stats["overlap_seconds"] += overlap_seconds
+
+    def _cached_result(self, query: str) -> dict | None:
+        """Return a cached result for the query, if the cache has one."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(query)
+        if cached is not None:
+            logger.info("  💾 Orchestrator: Answered from cache.")
+        return cached
+
+    def _cached_research(self, query: str) -> str | None:
+        """Return cached research findings for the query, if any."""
+        return self.cache.get_research(query) if self.cache is not None else None
+
+    def _remember(self, result: dict) -> dict:
+        """Store a finished result in the cache and return it."""
+        if self.cache is not None:
+            self.cache.put(result["query"], result)
+        return result
+
+    def _remember_research(self, query: str, research: str) -> None:
+        """Store research findings in the cache."""
+        if self.cache is not None:
+            self.cache.put_research(query, research)
+
+    async def _aresearch(self, query: str) -> str:
+        """Return research findings for `arun`, reusing cached findings when possible."""
+        with tracer.span("research", speculative=True) as span:
+            research = await asyncio.to_thread(self._cached_research, query)
+            span.attributes["cached"] = research is not None
+            if research is None:
+                research = await research_agent.arun(query)
+                await asyncio.to_thread(self._remember_research, query, research)
+        return research
+
+    def _replay(self, result: dict) -> Iterator[dict]:
+        """Yield the stream events for an already finished (cached) result."""
+        yield {"type": "route", "route": result["route"]}
+        if result["research"] is not None:
+            yield {"type": "stage", "stage": "research"}
+            yield {"type": "token", "stage": "research", "text": result["research"]}
+        stage = "direct" if result["route"] == "direct" else "writer"
+        yield {"type": "stage", "stage": stage}
+        yield {"type": "token", "stage": stage, "text": result["response"]}
+        yield {"type": "done", "result": result}
 
     def _decide_route(self, query: str) -> str:
+        """Decide routing with the local router when it is confident, otherwise with the LLM."""
+        local = self._local_route(query)
+        if local is not None and local[1]:
+            return local[0]
+        route = self._llm_route(query)
+        if local is not None and self.router is not None:
+            self.router.record(query, local[0], route)
+        return route
+
+    async def _adecide_route(self, query: str) -> str:
+        """Async version of `_decide_route`; the local router runs in a worker thread."""
+        local = await asyncio.to_thread(self._local_route, query)
+        if local is not None and local[1]:
+            return local[0]
+        route = await self._allm_route(query)
+        if local is not None and self.router is not None:
+            self.router.record(query, local[0], route)
+        return route
+
+    def _local_route(self, query: str) -> tuple[str, bool] | None:
+        """Return the local router's (route, confident) decision, or None if there is no usable router."""
+        if self.router is None:
+            return None
+        try:
+            local_route, confident = self.router.route(query)
+        except (ImportError, OSError):
+            logger.warning("  🧭 Local router unavailable, routing with the LLM from now on.", exc_info=True)
+            self.router = None
+            return None
+        if confident and random.random() < self.route_audit_rate:  # noqa: S311
+            _get_audit_pool().submit(self._audit_route, query, local_route)
+        return local_route, confident
+
+    def _audit_route(self, query: str, local_route: str) -> None:
+        """Ask the LLM for a route off the critical path and record it against the local decision."""
+        if self.router is not None:
+            self.router.record(query, local_route, self._llm_route(query), audit=True)
+
+    def _llm_route(self, query: str) -> str:
         """Decide routing using the local LLM and return the route string."""
-        messages = [{"role": "system", "content": ROUTING_PROMPT}, {"role": "user", "content": query}]
-        response = llm.invoke(messages)
-        route = response.content.strip().lower()
+        response = get_llm(TEMPERATURE).invoke(self._routing_messages(query))
+        return self._parse_route(response.content)
+
+    async def _allm_route(self, query: str) -> str:
+        """Async version of `_llm_route`."""
+        async with get_model_limiter(DEFAULT_MODEL).slot():
+            response = await get_llm(TEMPERATURE).ainvoke(self._routing_messages(query))
+        return self._parse_route(response.content)
+
+    def _routing_messages(self, query: str) -> list[dict]:
+        """Build the chat messages for the routing decision."""
+        return [{"role": "system", "content": ROUTING_PROMPT}, {"role": "user", "content": query}]
+
+    def _parse_route(self, content: str) -> str:
+        """Turn the routing model's answer into a route, defaulting to research_and_write."""
+        route = content.strip().lower()
         if route not in ("research_and_write", "direct"):
             route = "research_and_write"
         return route
 
+    def _direct_messages(self, query: str) -> list[dict]:
+        """Build the chat messages for a direct short response."""
+        return [{"role": "system", "content": "You are a friendly assistant. Answer briefly."}, {"role": "user", "content": query}]
+
     def _direct_response(self, query: str) -> str:
         """Return a direct short response for trivial queries."""
-        messages = [{"role": "system", "content": "You are a friendly assistant. Answer briefly."}, {"role": "user", "content": query}]
-        response = llm.invoke(messages)
+        response = get_llm(TEMPERATURE).invoke(self._direct_messages(query))
         return response.content
 
+    async def _adirect_response(self, query: str) -> str:
+        """Async version of `_direct_response`."""
+        async with get_model_limiter(DEFAULT_MODEL).slot():
+            response = await get_llm(TEMPERATURE).ainvoke(self._direct_messages(query))
+        return response.content
+
+
+CACHE_PATH = Path(__file__).resolve().parent / ".cache" / "responses.json"
+
+STAGE_HEADERS = {
+    "direct": "\n💬 Response:\n",
+    "research": "\n📊 Research Findings:\n",
+    "writer": "\n\n📝 Final Response:\n",
+}
+
 
 # CLI usage
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, format="%(message)s")
-    orch = Orchestrator()
+    warm_up()  # Load the model while the user types the first question
+    orch = Orchestrator(cache=ResponseCache(path=CACHE_PATH))
     logger.info("\n🤖 Multi-Agent Orchestrator (type 'quit' to exit)\n")
 
     while True:
@@ -84,8 +406,11 @@ if __name__ == "__main__":
         if not query:
             continue
 
-        result = orch.run(query)
-        if result["research"]:
-            logger.info("\n📊 Research Findings:\n%s", result["research"])
-
-        logger.info("\n📝 Final Response:\n%s\n", result["response"])
+        # Tokens are written to stdout as they arrive
+        for event in orch.stream(query):
+            if event["type"] == "stage":
+                sys.stdout.write(STAGE_HEADERS[event["stage"]])
+            elif event["type"] == "token":
+                sys.stdout.write(event["text"])
+            sys.stdout.flush()
+        sys.stdout.write("\n\n")
@@ -5,12 +5,14 @@ This agent acts as a researcher and focuses on finding and organizing raw inform
 """
 
 import logging
+from collections.abc import Iterator
 
-from langchain_ollama import ChatOllama
+from concurrency import get_model_limiter
+from llm_registry import DEFAULT_MODEL, get_llm
 
 logger = logging.getLogger(__name__)
 
-llm = ChatOllama(model="gpt-oss:latest", temperature=0.3)
+TEMPERATURE = 0.3
 
 SYSTEM_PROMPT = """You are a Research Agent. Your job is to:
 1. Analyze the user's question
@@ -25,14 +27,36 @@ Rules:
 """
 
 
-def run(query: str) -> str:
-    """Run the research agent on the given query and return findings as text."""
-    logger.info("  🔍 Research Agent: Working...")
-    messages = [
+def build_messages(query: str) -> list[dict]:
+    """Build the chat messages sent to the model for a query."""
+    return [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": query},
     ]
-    response = llm.invoke(messages)
+
+
+def run(query: str) -> str:
+    """Run the research agent on the given query and return findings as text."""
+    logger.info("  🔍 Research Agent: Working...")
+    response = get_llm(TEMPERATURE).invoke(build_messages(query))
     result = response.content
     logger.info("  🔍 Research Agent: Done.")
     return result
+
+
+async def arun(query: str) -> str:
+    """Async version of `run`; waits for a free slot on the model before calling it."""
+    logger.info("  🔍 Research Agent: Working (async)...")
+    async with get_model_limiter(DEFAULT_MODEL).slot():
+        response = await get_llm(TEMPERATURE).ainvoke(build_messages(query))
+    logger.info("  🔍 Research Agent: Done.")
+    return response.content
+
+
+def stream(query: str) -> Iterator[str]:
+    """Run the research agent and yield the findings token by token as they arrive."""
+    logger.info("  🔍 Research Agent: Streaming...")
+    for chunk in get_llm(TEMPERATURE).stream(build_messages(query)):
+        if chunk.content:
+            yield chunk.content
+    logger.info("  🔍 Research Agent: Done.")
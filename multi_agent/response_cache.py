@@ -0,0 +1,243 @@
+"""Semantic Response Cache.
+
+Cache Orchestrator results so that repeated questions skip routing, research and writing:
+  1. Exact lookup on the normalized query text (lowercase, collapsed whitespace, no trailing punctuation)
+  2. Semantic lookup: the most similar cached query above `similarity_threshold` (cosine on local embeddings)
+
+Entries expire after `ttl_seconds` and the least recently used entry is evicted beyond `max_entries`.
+Research findings are cached separately, so the writer stage can reuse them for a new phrasing.
+With `path` set, the cache is persisted as JSON and reloaded on startup; writes happen in a background
+timer `save_delay` seconds after the first unsaved change (and at exit), never on the request thread.
+"""
+
+import atexit
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from embeddings import Embedder, get_default_embedder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_SAVE_DELAY = 5.0
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for exact matching."""
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+
+class _Namespace:
+    """One LRU+TTL table of cached values with their query embeddings."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        """Create an empty table."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def get_exact(self, key: str) -> Any | None:  # noqa: ANN401
+        """Return the value stored under the exact key, if present and fresh."""
+        entry = self.entries.get(key)
+        if entry is None or self._expired(entry):
+            self.entries.pop(key, None)
+            return None
+        self.entries.move_to_end(key)
+        return entry["value"]
+
+    def get_similar(self, vector: np.ndarray, threshold: float) -> tuple[Any | None, float]:
+        """Return the value of the most similar entry above the threshold, and its similarity."""
+        self.purge_expired()
+        candidates = [(key, entry) for key, entry in self.entries.items() if entry["vector"] is not None]
+        if not candidates:
+            return None, 0.0
+        scores = np.array([entry["vector"] for _, entry in candidates]) @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None, float(scores[best])
+        key, entry = candidates[best]
+        self.entries.move_to_end(key)
+        return entry["value"], float(scores[best])
+
+    def put(self, key: str, value: Any, vector: np.ndarray | None) -> None:  # noqa: ANN401
+        """Store a value, evicting the least recently used entries beyond the size limit."""
+        self.entries[key] = {"value": value, "vector": vector, "created": time.time()}
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def purge_expired(self) -> None:
+        """Drop every entry older than the TTL."""
+        for key in [key for key, entry in self.entries.items() if self._expired(entry)]:
+            del self.entries[key]
+
+    def _expired(self, entry: dict[str, Any]) -> bool:
+        """Return True if the entry is older than the TTL."""
+        return time.time() - entry["created"] > self.ttl_seconds
+
+
+class ResponseCache:
+    """Exact + semantic cache for Orchestrator results and research findings."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        embed: Embedder | None = None,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        path: Path | None = None,
+        *,
+        semantic: bool = True,
+        save_delay: float = DEFAULT_SAVE_DELAY,
+    ) -> None:
+        """Configure the cache; pass `semantic=False` for exact matching only.
+
+        Changes are written to `path` at most once per `save_delay` seconds, in the background.
+        """
+        self.embed = (embed or get_default_embedder()) if semantic else None
+        self.similarity_threshold = similarity_threshold
+        self.path = path
+        self._tables = {
+            "response": _Namespace(max_entries, ttl_seconds),
+            "research": _Namespace(max_entries, ttl_seconds),
+        }
+        self._lock = threading.Lock()
+        self.save_delay = save_delay
+        self._save_timer: threading.Timer | None = None
+        self._save_lock = threading.Lock()  # one writer at a time
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+        if path is not None:
+            self.load()
+            atexit.register(self.flush)
+
+    def get(self, query: str) -> dict | None:
+        """Return a cached Orchestrator result for the query (with `query` set to this phrasing), or None."""
+        result = self._get("response", query)
+        return None if result is None else {**result, "query": query}
+
+    def put(self, query: str, result: dict) -> None:
+        """Cache an Orchestrator result."""
+        self._put("response", query, result)
+
+    def get_research(self, query: str) -> str | None:
+        """Return cached research findings for the query, or None."""
+        return self._get("research", query)
+
+    def put_research(self, query: str, research: str) -> None:
+        """Cache research findings."""
+        self._put("research", query, research)
+
+    def load(self) -> None:
+        """Load persisted entries from `path`, skipping expired ones."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable response cache: %s", self.path)
+            return
+        with self._lock:
+            for name, entries in data.items():
+                table = self._tables.get(name)
+                if table is None:
+                    continue
+                for key, entry in entries.items():
+                    vector = np.asarray(entry["vector"], dtype=np.float32) if entry["vector"] is not None else None
+                    table.entries[key] = {"value": entry["value"], "vector": vector, "created": entry["created"]}
+                table.purge_expired()
+        logger.info("Loaded %d cached responses from %s", len(self._tables["response"].entries), self.path)
+
+    def flush(self) -> None:
+        """Write pending changes to `path` now, instead of when the save timer fires."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save()
+
+    def save(self) -> None:
+        """Persist all entries to `path` (written atomically)."""
+        if self.path is None:
+            return
+        with self._save_lock:
+            # Entries are replaced, never changed in place, so a shallow snapshot is enough
+            with self._lock:
+                snapshot = {name: list(table.entries.items()) for name, table in self._tables.items()}
+            data = {
+                name: {
+                    key: {"value": e["value"], "vector": None if e["vector"] is None else e["vector"].tolist(), "created": e["created"]} for key, e in entries
+                }
+                for name, entries in snapshot.items()
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(data), encoding="utf-8")
+                tmp.replace(self.path)
+            except OSError:
+                logger.warning("Could not write response cache: %s", self.path)
+
+    def _get(self, name: str, query: str) -> Any | None:  # noqa: ANN401
+        """Look up a query exactly, then semantically."""
+        key = normalize_query(query)
+        with self._lock:
+            value = self._tables[name].get_exact(key)
+        if value is not None:
+            self.stats["exact_hits"] += 1
+            logger.info("  💾 Cache: exact %s hit", name)
+            return value
+
+        vector = self._embed(query)
+        if vector is not None:
+            with self._lock:
+                value, score = self._tables[name].get_similar(vector, self.similarity_threshold)
+            if value is not None:
+                self.stats["semantic_hits"] += 1
+                logger.info("  💾 Cache: semantic %s hit (similarity %.3f)", name, score)
+                return value
+        self.stats["misses"] += 1
+        return None
+
+    def _put(self, name: str, query: str, value: Any) -> None:  # noqa: ANN401
+        """Store a value under the normalized query and its embedding."""
+        vector = self._embed(query)
+        with self._lock:
+            self._tables[name].put(normalize_query(query), value, vector)
+        self._schedule_save()
+
+    def _schedule_save(self) -> None:
+        """Start the background save timer, unless one is already pending."""
+        if self.path is None:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self._save_pending)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_pending(self) -> None:
+        """Timer callback: clear the pending timer, then write everything changed so far."""
+        with self._lock:
+            self._save_timer = None
+        self.save()
+
+    def _embed(self, query: str) -> np.ndarray | None:
+        """Embed a query, disabling semantic lookups if the model is unavailable."""
+        if self.embed is None:
+            return None
+        try:
+            return np.asarray(self.embed([normalize_query(query)])[0], dtype=np.float32)
+        except (ImportError, OSError):
+            logger.warning("  💾 Cache: embedding model unavailable, using exact matching only.", exc_info=True)
+            self.embed = None
+            return None
@@ -0,0 +1,132 @@
+"""Embedding Router.
+
+Classify a query as "direct" or "research_and_write" locally, without an LLM call:
+  - Each route is described by a handful of labeled example queries
+  - Examples are embedded once and averaged into one centroid per route
+  - A query goes to the nearest centroid (cosine similarity)
+
+The confidence is the similarity margin between the best and second-best route.
+Below `min_confidence` the caller should fall back to the LLM, and report the
+LLM's decision through `record` so local accuracy can be tracked.
+
+The default `min_confidence` is a starting point, not a calibrated value. Fallbacks only measure
+the uncertain queries, so callers should also audit a random sample (`DEFAULT_ROUTE_AUDIT_RATE`)
+of the confident decisions against the LLM: `audited_accuracy` estimates how often skipping the LLM
+gave the wrong route, and is the number to tune `min_confidence` with.
+"""
+
+import logging
+import threading
+
+import numpy as np
+from embeddings import Embedder, get_default_embedder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_CONFIDENCE = 0.08
+DEFAULT_ROUTE_AUDIT_RATE = 0.05  # fraction of confident decisions also checked against the LLM
+
+ROUTE_EXAMPLES = {
+    "direct": [
+        "Hi!",
+        "Hello there",
+        "Good morning",
+        "Thanks a lot",
+        "Thank you, that helps",
+        "How are you?",
+        "Who are you?",
+        "Bye",
+        "What's 2 + 2?",
+        "Ok, got it",
+    ],
+    "research_and_write": [
+        "What is quantum computing?",
+        "Explain how vaccines work",
+        "Compare Docker and Kubernetes",
+        "What are the causes of climate change?",
+        "How does a transformer neural network work?",
+        "Summarize the history of the Roman Empire",
+        "What are the benefits of renewable energy?",
+        "How do I design a scalable REST API?",
+        "What is retrieval-augmented generation?",
+        "Why did the 2008 financial crisis happen?",
+    ],
+}
+
+
+class EmbeddingRouter:
+    """Nearest-centroid query router over a local embedding model."""
+
+    def __init__(
+        self,
+        examples: dict[str, list[str]] | None = None,
+        embed: Embedder | None = None,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+    ) -> None:
+        """Configure the router; example embeddings are computed on first use."""
+        self.examples = examples or ROUTE_EXAMPLES
+        self.embed = embed or get_default_embedder()
+        self.min_confidence = min_confidence
+        self._routes: list[str] = list(self.examples)
+        self._centroids: np.ndarray | None = None
+        self._lock = threading.Lock()
+        self.stats = {"local": 0, "fallback": 0, "compared": 0, "agreed": 0, "audited": 0, "audit_agreed": 0}
+
+    def classify(self, query: str) -> tuple[str, float]:
+        """Return the nearest route and its confidence (margin over the runner-up)."""
+        centroids = self._get_centroids()
+        scores = centroids @ self.embed([query])[0]
+        order = np.argsort(scores)[::-1]
+        margin = float(scores[order[0]] - scores[order[1]]) if len(order) > 1 else 1.0
+        return self._routes[order[0]], margin
+
+    def route(self, query: str) -> tuple[str, bool]:
+        """Return the nearest route and whether it is confident enough to skip the LLM."""
+        route, confidence = self.classify(query)
+        confident = confidence >= self.min_confidence
+        self.stats["local" if confident else "fallback"] += 1
+        if confident:
+            logger.info("  🧭 Router: %s (confidence %.3f)", route, confidence)
+        else:
+            logger.info("  🧭 Router: low confidence %.3f for %s, falling back to LLM", confidence, route)
+        return route, confident
+
+    def record(self, query: str, local_route: str, llm_route: str, *, audit: bool = False) -> None:
+        """Compare a local decision against the LLM's and log the running accuracy.
+
+        Pass `audit=True` for a confident decision checked in the background (a random sample).
+        """
+        with self._lock:
+            self.stats["compared"] += 1
+            self.stats["agreed"] += int(local_route == llm_route)
+            if audit:
+                self.stats["audited"] += 1
+                self.stats["audit_agreed"] += int(local_route == llm_route)
+        if local_route != llm_route:
+            logger.info("  🧭 Router: disagreed with LLM (%s vs %s) on %r", local_route, llm_route, query)
+        logger.info(
+            "  🧭 Router: accuracy vs LLM %.1f%% over %d queries (confident decisions: %.1f%% over %d audits)",
+            100 * self.accuracy,
+            self.stats["compared"],
+            100 * self.audited_accuracy,
+            self.stats["audited"],
+        )
+
+    @property
+    def accuracy(self) -> float:
+        """Return the fraction of compared queries (fallbacks and audits) where the local route matched the LLM."""
+        return self.stats["agreed"] / self.stats["compared"] if self.stats["compared"] else 0.0
+
+    @property
+    def audited_accuracy(self) -> float:
+        """Return the fraction of audited confident decisions that matched the LLM (0.0 before any audit)."""
+        return self.stats["audit_agreed"] / self.stats["audited"] if self.stats["audited"] else 0.0
+
+    def _get_centroids(self) -> np.ndarray:
+        """Embed the labeled examples once and return one normalized centroid per route."""
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    centroids = np.stack([self.embed(self.examples[route]).mean(axis=0) for route in self._routes])
+                    self._centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+        return self._centroids
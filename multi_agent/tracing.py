@@ -0,0 +1,247 @@
+"""Pipeline Tracing.
+
+Record where the time of each query goes, as structured spans:
+  - Stage spans ("query", "routing", "research", "writer", "direct") opened with `Tracer.span`
+  - LLM call spans, recorded by `TracingCallbackHandler` (attached to the model clients with
+    `llm_registry.add_llm_callback`), with time-to-first-token, token counts and tokens/sec
+
+Spans nest through a context variable, so they follow asyncio tasks and `asyncio.to_thread`.
+Finished spans are appended as JSON lines to `path` and kept in memory for `summary`.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_PATH = Path(os.environ.get("AGENT_TRACE_PATH", Path(__file__).resolve().parent / ".cache" / "traces.jsonl"))
+DEFAULT_MAX_SPANS = 2000
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id() -> str:
+    """Return a short random span/trace id."""
+    return uuid.uuid4().hex[:16]
+
+
+@dataclass
+class Span:
+    """One timed unit of work: a pipeline stage or an LLM call."""
+
+    name: str
+    kind: str = "stage"
+    trace_id: str = field(default_factory=_new_id)
+    span_id: str = field(default_factory=_new_id)
+    parent: "Span | None" = field(default=None, repr=False)
+    started_at: float = field(default_factory=time.time)
+    wall_seconds: float | None = None
+    ttft_seconds: float | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    generation_seconds: float | None = None
+    error: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Return the completion token rate, measured after the first token when possible."""
+        seconds = self.generation_seconds
+        if seconds is None and self.wall_seconds is not None:
+            seconds = self.wall_seconds - (self.ttft_seconds or 0.0)
+        if not self.completion_tokens or not seconds or seconds <= 0:
+            return None
+        return self.completion_tokens / seconds
+
+    def mark_first_token(self, at: float | None = None) -> None:
+        """Record the time to the first output token (only the first call counts)."""
+        if self.ttft_seconds is not None:
+            return
+        at = time.perf_counter() if at is None else at
+        self.ttft_seconds = at - self._start
+        if self.parent is not None:
+            self.parent.mark_first_token(at)
+
+    def add_tokens(self, prompt: int, completion: int, generation_seconds: float | None = None) -> None:
+        """Add token usage to this span and its ancestors."""
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        if generation_seconds is not None:
+            self.generation_seconds = (self.generation_seconds or 0.0) + generation_seconds
+        if self.parent is not None:
+            self.parent.add_tokens(prompt, completion, generation_seconds)
+
+    def finish(self) -> None:
+        """Stop the clock."""
+        if self.wall_seconds is None:
+            self.wall_seconds = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span as a JSON-serializable record."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "name": self.name,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "wall_seconds": self.wall_seconds,
+            "ttft_seconds": self.ttft_seconds,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "error": self.error,
+            **self.attributes,
+        }
+
+
+def current_span() -> Span | None:
+    """Return the innermost open span, e.g. to attach attributes to the running stage."""
+    return _current_span.get()
+
+
+class Tracer:
+    """Create spans, write finished ones as JSON lines and summarize them per stage."""
+
+    def __init__(self, path: Path | None = DEFAULT_TRACE_PATH, max_spans: int = DEFAULT_MAX_SPANS) -> None:
+        """Write spans to `path` (None keeps them in memory only) and keep the last `max_spans`."""
+        self.path = path
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self.callback = TracingCallbackHandler(self)
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: str = "stage", **attributes: Any) -> Span:  # noqa: ANN401
+        """Create a span under the current one without making it current."""
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent is not None else _new_id()
+        return Span(name, kind, trace_id=trace_id, parent=parent, attributes=attributes)
+
+    @contextlib.contextmanager
+    def span(self, name: str, kind: str = "stage", **attributes: Any) -> Iterator[Span]:  # noqa: ANN401
+        """Time the block as a span; spans and LLM calls started inside it become its children."""
+        span = self.start_span(name, kind, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            # A generator closed from another context cannot reset the variable; its own context is gone anyway
+            with contextlib.suppress(ValueError):
+                _current_span.reset(token)
+            self.record(span)
+
+    def record(self, span: Span) -> None:
+        """Finish a span, keep it for the summary and append it to the trace file."""
+        span.finish()
+        with self._lock:
+            self.spans.append(span)
+            if self.path is None:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as file:
+                    file.write(json.dumps(span.to_dict(), default=str) + "\n")
+            except OSError:
+                logger.warning("Could not write trace file %s, keeping spans in memory only.", self.path)
+                self.path = None
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Return one row of latency and throughput statistics per span name, slowest first."""
+        groups: dict[str, list[Span]] = {}
+        with self._lock:
+            for span in self.spans:
+                groups.setdefault(span.name, []).append(span)
+        rows = []
+        for name, spans in groups.items():
+            walls = sorted(span.wall_seconds or 0.0 for span in spans)
+            ttfts = [span.ttft_seconds for span in spans if span.ttft_seconds is not None]
+            rates = [rate for span in spans if (rate := span.tokens_per_second) is not None]
+            rows.append(
+                {
+                    "span": name,
+                    "count": len(spans),
+                    "errors": sum(span.error is not None for span in spans),
+                    "mean_s": sum(walls) / len(walls),
+                    "p95_s": walls[min(len(walls) - 1, int(0.95 * len(walls)))],
+                    "mean_ttft_s": sum(ttfts) / len(ttfts) if ttfts else None,
+                    "prompt_tokens": sum(span.prompt_tokens for span in spans),
+                    "completion_tokens": sum(span.completion_tokens for span in spans),
+                    "tokens_per_s": sum(rates) / len(rates) if rates else None,
+                },
+            )
+        return sorted(rows, key=lambda row: row["mean_s"], reverse=True)
+
+    def clear(self) -> None:
+        """Forget the in-memory spans (the trace file is kept)."""
+        with self._lock:
+            self.spans.clear()
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback that records one span per chat model call."""
+
+    # Run in the caller's context, so the current stage span is the parent
+    run_inline = True
+
+    def __init__(self, tracer: Tracer) -> None:
+        """Record spans on `tracer`."""
+        self.tracer = tracer
+        self._spans: dict[uuid.UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list, *, run_id: uuid.UUID, metadata: dict | None = None, **kwargs: Any) -> None:  # noqa: ANN401, ARG002
+        """Open a span named after the enclosing stage."""
+        parent = _current_span.get()
+        name = f"{parent.name}.llm" if parent is not None else "llm"
+        self._spans[run_id] = self.tracer.start_span(name, kind="llm", model=(metadata or {}).get("ls_model_name"))
+
+    def on_llm_new_token(self, token: str, *, run_id: uuid.UUID, **kwargs: Any) -> None:  # noqa: ANN401, ARG002
+        """Record the time to the first token."""
+        span = self._spans.get(run_id)
+        if span is not None and token:
+            span.mark_first_token()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: uuid.UUID, **kwargs: Any) -> None:  # noqa: ANN401, ARG002
+        """Add token usage and close the span."""
+        span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or {}
+                # Ollama reports the pure generation time, which excludes model load and prompt processing
+                eval_ns = getattr(message, "response_metadata", {}).get("eval_duration")
+                span.add_tokens(usage.get("input_tokens", 0), usage.get("output_tokens", 0), eval_ns / 1e9 if eval_ns else None)
+        self.tracer.record(span)
+
+    def on_llm_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs: Any) -> None:  # noqa: ANN401, ARG002
+        """Close the span with the error."""
+        span = self._spans.pop(run_id, None)
+        if span is not None:
+            span.error = type(error).__name__
+            self.tracer.record(span)
+
+
+_default_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _default_tracer
@@ -2,13 +2,23 @@
 
 Role: Take research findings and transform them into a well-written, polished response.
 This agent focuses on clear communication and good structure.
+
+The findings are packed into `PROMPT_TOKEN_BUDGET` first (see `context_packer.py`), so long or
+repetitive research output does not inflate the writer's prompt processing time.
 """
 
 import logging
+from collections.abc import Iterator
+
+from concurrency import get_model_limiter
+from context_packer import ContextPacker
+from llm_registry import DEFAULT_MODEL, get_llm
+from tracing import current_span
 
-from langchain_ollama import ChatOllama
+TEMPERATURE = 0.7
 
-llm = ChatOllama(model="gpt-oss:latest", temperature=0.7)
+# Token budget for the whole prompt: system prompt, question and research findings
+PROMPT_TOKEN_BUDGET = 1200
 
 logger = logging.getLogger(__name__)
 
@@ -25,18 +35,49 @@ Rules:
 - Do NOT add new facts — only use what the research provides
 """
 
+USER_TEMPLATE = "Original question: {query}\n\nResearch findings:\n{findings}\n\nPlease write a clear, well-structured response based on these findings."
 
-def run(query: str, research_findings: str) -> str:
-    """Run the writer agent and return a polished response based on research findings."""
-    logger.info("  ✍️  Writer Agent: Working...")
-    user_message = (
-        f"Original question: {query}\n\nResearch findings:\n{research_findings}\n\nPlease write a clear, well-structured response based on these findings."
-    )
-    messages = [
+packer = ContextPacker()
+
+
+def build_messages(query: str, research_findings: str) -> list[dict]:
+    """Build the chat messages sent to the model, with the findings packed into the prompt budget."""
+    fixed_tokens = packer.count_tokens(SYSTEM_PROMPT) + packer.count_tokens(USER_TEMPLATE.format(query=query, findings=""))
+    packed = packer.pack(query, research_findings, max(0, PROMPT_TOKEN_BUDGET - fixed_tokens))
+    span = current_span()
+    if span is not None:
+        # Lets the writer's latency in the trace be read against the prompt size it got
+        span.attributes.update(findings_tokens=packed.tokens_before, packed_tokens=packed.tokens_after)
+    user_message = USER_TEMPLATE.format(query=query, findings=packed.text)
+    return [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": user_message},
     ]
-    response = llm.invoke(messages)
+
+
+def run(query: str, research_findings: str) -> str:
+    """Run the writer agent and return a polished response based on research findings."""
+    logger.info("  ✍️  Writer Agent: Working...")
+    response = get_llm(TEMPERATURE).invoke(build_messages(query, research_findings))
     result = response.content
     logger.info("  ✍️  Writer Agent: Done.")
     return result
+
+
+async def arun(query: str, research_findings: str) -> str:
+    """Async version of `run`; waits for a free slot on the model before calling it."""
+    logger.info("  ✍️  Writer Agent: Working (async)...")
+    messages = build_messages(query, research_findings)
+    async with get_model_limiter(DEFAULT_MODEL).slot():
+        response = await get_llm(TEMPERATURE).ainvoke(messages)
+    logger.info("  ✍️  Writer Agent: Done.")
+    return response.content
+
+
+def stream(query: str, research_findings: str) -> Iterator[str]:
+    """Run the writer agent and yield the response token by token as they arrive."""
+    logger.info("  ✍️  Writer Agent: Streaming...")
+    for chunk in get_llm(TEMPERATURE).stream(build_messages(query, research_findings)):
+        if chunk.content:
+            yield chunk.content
+    logger.info("  ✍️  Writer Agent: Done.")
@@ -1,4 +1,50 @@
 """agenticai_foundations_to_advanced package.
 
 Provide package-level initialization and exports.
+
+The exports are loaded lazily, on first attribute access, so that importing the package
+(and running the `agentic` CLI) does not import torch, langchain or mcp:
+  - RAGEngine: the embedding RAG engine (`mcp_rag_server/rag_engine.py`)
+  - Orchestrator: the multi-agent pipeline (`multi_agent/orchestrator.py`)
+  - rag_server, my_server: the FastMCP server modules (`mcp_rag_server/`, `mcp_server/`)
 """
+
+from typing import TYPE_CHECKING, Any
+
+from agenticai_foundations_to_advanced._examples import import_example
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    from orchestrator import Orchestrator
+    from rag_engine import RAGEngine
+
+    rag_server: ModuleType
+    my_server: ModuleType
+
+# Export name -> (example directory, module, attribute or None for the module itself)
+_EXPORTS: dict[str, tuple[str, str, str | None]] = {
+    "RAGEngine": ("mcp_rag_server", "rag_engine", "RAGEngine"),
+    "Orchestrator": ("multi_agent", "orchestrator", "Orchestrator"),
+    "rag_server": ("mcp_rag_server", "rag_server", None),
+    "my_server": ("mcp_server", "my_server", None),
+}
+
+__all__ = ["Orchestrator", "RAGEngine", "my_server", "rag_server"]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    """Import an export on first access and keep it as a module attribute."""
+    if name not in _EXPORTS:
+        message = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(message)
+    directory, module_name, attribute = _EXPORTS[name]
+    module = import_example(directory, module_name)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the lazy exports alongside the loaded attributes."""
+    return sorted({*globals(), *__all__})
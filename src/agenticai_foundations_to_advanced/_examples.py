@@ -0,0 +1,19 @@
+"""Import the example modules that live next to `src/` in a source checkout."""
+
+import importlib
+import sys
+from pathlib import Path
+from types import ModuleType
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def import_example(directory: str, module: str) -> ModuleType:
+    """Import a module from an example directory, which imports its siblings as top-level modules."""
+    path = REPO_ROOT / directory
+    if not path.is_dir():
+        message = f"Example directory not found: {path} (the examples are only available from a source checkout)"
+        raise ModuleNotFoundError(message, name=module)
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+    return importlib.import_module(module)
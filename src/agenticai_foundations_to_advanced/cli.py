@@ -0,0 +1,114 @@
+"""Command-line interface.
+
+Run the examples from one console script, `agentic <command>`:
+  - list: List the available examples
+  - ask: Answer a question with the multi-agent orchestrator
+  - rag-query: Search the sample documents with the RAG engine
+  - rag-server: Start the RAG MCP server (SSE, port 8001)
+  - mcp-server: Start the example MCP server (SSE, port 8000)
+
+Only the standard library is imported at startup; each command imports its heavy
+dependencies (torch, langchain, mcp) when it runs, so `--help` and `list` start instantly.
+"""
+
+import argparse
+import logging
+import sys
+from collections.abc import Sequence
+
+from agenticai_foundations_to_advanced._examples import import_example
+
+logger = logging.getLogger(__name__)
+
+# Command -> (example location, description)
+EXAMPLES = {
+    "ask": ("multi_agent/orchestrator.py", "Answer a question with the research and writer agents (needs Ollama)"),
+    "rag-query": ("mcp_rag_server/rag_engine.py", "Search the sample documents by meaning"),
+    "rag-server": ("mcp_rag_server/rag_server.py", "Serve the RAG engine as MCP tools on localhost:8001"),
+    "mcp-server": ("mcp_server/my_server.py", "Serve the example MCP tools on localhost:8000"),
+}
+
+
+def list_examples(_: argparse.Namespace) -> int:
+    """Log every command with its example module."""
+    logger.info("\n📚 Available commands:\n")
+    for command, (location, description) in EXAMPLES.items():
+        logger.info("  %-11s %s\n              (%s)", command, description, location)
+    logger.info("")
+    return 0
+
+
+def ask(args: argparse.Namespace) -> int:
+    """Stream the orchestrator's answer to one question to stdout."""
+    orchestrator = import_example("multi_agent", "orchestrator")
+    response_cache = import_example("multi_agent", "response_cache")
+    orch = orchestrator.Orchestrator(cache=response_cache.ResponseCache(path=orchestrator.CACHE_PATH))
+    for event in orch.stream(args.question):
+        if event["type"] == "stage":
+            sys.stdout.write(orchestrator.STAGE_HEADERS[event["stage"]])
+        elif event["type"] == "token":
+            sys.stdout.write(event["text"])
+        sys.stdout.flush()
+    sys.stdout.write("\n\n")
+    return 0
+
+
+def rag_query(args: argparse.Namespace) -> int:
+    """Log the sample documents most similar to a question."""
+    rag_engine = import_example("mcp_rag_server", "rag_engine")
+    rag = rag_engine.RAGEngine()
+    rag.add_documents(rag_engine.SAMPLE_DOCUMENTS)
+    for result in rag.query(args.question, top_k=args.top_k):
+        logger.info("  #%d [score: %.4f] %s", result["rank"], result["score"], result["document"])
+    return 0
+
+
+def rag_server(_: argparse.Namespace) -> int:
+    """Load the RAG collections and serve them over SSE until interrupted."""
+    server = import_example("mcp_rag_server", "rag_server")
+    collections = server.get_collections()
+    collections.get(server.DEFAULT_COLLECTION)
+    logger.info("🚀 Starting RAG MCP Server on localhost:8001 (collections: %s)...", ", ".join(collections.names()))
+    server.server.run(transport="sse")
+    return 0
+
+
+def mcp_server(_: argparse.Namespace) -> int:
+    """Serve the example MCP tools over SSE until interrupted."""
+    server = import_example("mcp_server", "my_server")
+    logger.info("🚀 Starting MCP Server on localhost:8000...")
+    server.server.run(transport="sse")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser with one subcommand per example."""
+    parser = argparse.ArgumentParser(prog="agentic", description="Run the AgenticAI examples.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show debug logs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List the available commands").set_defaults(func=list_examples)
+
+    ask_parser = commands.add_parser("ask", help=EXAMPLES["ask"][1])
+    ask_parser.add_argument("question", help="The question to answer")
+    ask_parser.set_defaults(func=ask)
+
+    query_parser = commands.add_parser("rag-query", help=EXAMPLES["rag-query"][1])
+    query_parser.add_argument("question", help="The natural language query")
+    query_parser.add_argument("--top-k", type=int, default=3, help="Number of documents to return")
+    query_parser.set_defaults(func=rag_query)
+
+    commands.add_parser("rag-server", help=EXAMPLES["rag-server"][1]).set_defaults(func=rag_server)
+    commands.add_parser("mcp-server", help=EXAMPLES["mcp-server"][1]).set_defaults(func=mcp_server)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Parse the command line and run the chosen command."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
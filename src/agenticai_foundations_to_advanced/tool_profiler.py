@@ -0,0 +1,350 @@
+"""Tool Profiler.
+
+Opt-in profiling for FastMCP tool handlers, switched on at runtime:
+  - `@profiler.profile` (below `@server.tool()`) times every call while profiling is on
+  - A `sample_rate` fraction of calls is profiled, with cProfile or with a stack sampler
+  - The slowest `keep` profiled calls are kept with their arguments
+  - `dump` writes them for flamegraph tools: pstats `.prof` files (cProfile) or collapsed stacks `.folded` (sampler)
+
+Switch it on with environment variables (MCP_PROFILE_RATE, MCP_PROFILE_MODE, MCP_PROFILE_KEEP, MCP_PROFILE_DIR)
+or, while the server runs, with the admin tools added by `register_admin_tools`. Those tools show the
+arguments of every caller's requests; the example servers only add them when MCP_PROFILE_ADMIN=1.
+Profiling is off by default; a disabled profiler adds one attribute check per call.
+"""
+
+import contextlib
+import cProfile
+import functools
+import heapq
+import inspect
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sample")
+DEFAULT_KEEP = 20
+DEFAULT_SAMPLE_INTERVAL = 0.005
+MAX_ARGUMENT_CHARS = 200
+
+_OVERHEAD_FILES = (__file__, contextlib.__file__)
+
+
+@dataclass
+class CallProfile:
+    """One profiled tool call: its arguments, duration and profile data."""
+
+    tool: str
+    arguments: dict[str, str]
+    seconds: float
+    started_at: float
+    mode: str
+    stats: pstats.Stats | None = None  # cprofile mode
+    stacks: Counter[str] = field(default_factory=Counter)  # sample mode: collapsed stack -> samples
+    error: str | None = None
+
+    def top_functions(self, limit: int = 5) -> list[str]:
+        """Return the hottest functions (cumulative time) or stacks (samples) as text lines."""
+        if self.stats is not None:
+            rows = sorted(self.stats.stats.items(), key=lambda item: -item[1][3])  # type: ignore[attr-defined]
+            # Leave out the profiler's own frames, which wrap every call
+            rows = [row for row in rows if row[0][0] not in _OVERHEAD_FILES and "_lsprof" not in row[0][2]]
+            return [f"{cumulative * 1000:8.1f} ms  {pstats.func_std_string(func)}" for func, (_, _, _, cumulative, _) in rows[:limit]]
+        return [f"{count:8d} samples  {stack.rsplit(';', 1)[-1]}" for stack, count in self.stacks.most_common(limit)]
+
+
+class _StackSampler:
+    """Record the stacks of one thread running a handler at a fixed interval, as collapsed stacks."""
+
+    def __init__(self, thread_id: int, handler_code: CodeType, interval: float) -> None:
+        """Sample `thread_id` every `interval` seconds, keeping the frames from the handler down."""
+        self.thread_id = thread_id
+        self.handler_code = handler_code
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tool-profiler-sampler", daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Sample until stopped."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            stack = self._collapse(frame)
+            if stack:
+                self.stacks[stack] += 1
+
+    def _collapse(self, frame: FrameType | None) -> str | None:
+        """Return "handler;...;innermost" function names, or None while the thread is outside the handler."""
+        names = []
+        while frame is not None:
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}")
+            if frame.f_code is self.handler_code:
+                return ";".join(reversed(names))
+            frame = frame.f_back
+        return None
+
+
+class ToolProfiler:
+    """Time tool calls, profile a sample of them and keep the slowest profiles."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        mode: str = "cprofile",
+        keep: int = DEFAULT_KEEP,
+        output_dir: str | Path = Path(".cache") / "profiles",
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        """Configure profiling; with `sample_rate` 0 (the default) it stays off until `configure` is called."""
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.sample_rate = 0.0
+        self.mode = "cprofile"
+        self.keep = keep
+        self._lock = threading.Lock()
+        # cProfile allows one active profiler per process
+        self._profiling = threading.Lock()
+        self._slowest: list[tuple[float, int, CallProfile]] = []  # min-heap on seconds
+        self._sequence = itertools.count()
+        self.timings: dict[str, dict[str, float]] = {}
+        self.configure(sample_rate, mode, keep)
+
+    @classmethod
+    def from_env(cls, output_dir: str | Path = Path(".cache") / "profiles") -> "ToolProfiler":
+        """Create a profiler configured by the MCP_PROFILE_* environment variables."""
+        return cls(
+            sample_rate=float(os.environ.get("MCP_PROFILE_RATE", "0")),
+            mode=os.environ.get("MCP_PROFILE_MODE", "cprofile"),
+            keep=int(os.environ.get("MCP_PROFILE_KEEP", str(DEFAULT_KEEP))),
+            output_dir=os.environ.get("MCP_PROFILE_DIR", output_dir),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return True while calls are being timed and sampled."""
+        return self.sample_rate > 0
+
+    def configure(self, sample_rate: float, mode: str | None = None, keep: int | None = None) -> None:
+        """Change the sampled fraction of calls (0 turns profiling off), the profiling mode and how many profiles to keep."""
+        if not 0 <= sample_rate <= 1:
+            message = f"sample_rate must be between 0 and 1, got {sample_rate}"
+            raise ValueError(message)
+        if mode is not None and mode not in MODES:
+            message = f"mode must be one of {', '.join(MODES)}, got {mode!r}"
+            raise ValueError(message)
+        was_enabled = self.enabled
+        with self._lock:
+            self.sample_rate = sample_rate
+            self.mode = mode or self.mode
+            self.keep = keep if keep is not None else self.keep
+            while len(self._slowest) > self.keep:
+                heapq.heappop(self._slowest)
+        if self.enabled:
+            logger.info("🔬 Profiling %.0f%% of tool calls (%s, keeping the slowest %d)", 100 * sample_rate, self.mode, self.keep)
+        elif was_enabled:
+            logger.info("🔬 Tool profiling off")
+
+    def profile(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a tool handler (sync or async) so that its calls are timed and sampled while profiling is on."""
+        signature = inspect.signature(fn)
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                if not self.enabled:
+                    return await fn(*args, **kwargs)
+                # A cProfile profile also covers whatever else the event loop runs while the handler awaits
+                with self._call(fn, signature, args, kwargs):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            with self._call(fn, signature, args, kwargs):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    def slowest(self) -> list[CallProfile]:
+        """Return the kept profiles, slowest first."""
+        with self._lock:
+            return [profile for _, _, profile in sorted(self._slowest, reverse=True)]
+
+    def report(self, limit: int = 10) -> str:
+        """Return per-tool timings and the slowest profiled calls as text."""
+        lines = [f"Profiling: {'on' if self.enabled else 'off'} ({100 * self.sample_rate:.0f}% of calls, {self.mode})", ""]
+        with self._lock:
+            timings = dict(self.timings)
+        for tool, timing in sorted(timings.items(), key=lambda item: -item[1]["total_s"]):
+            mean_ms = 1000 * timing["total_s"] / timing["calls"]
+            lines.append(f"  {tool}: {timing['calls']:.0f} calls, mean {mean_ms:.1f} ms, max {1000 * timing['max_s']:.1f} ms")
+        for rank, profile in enumerate(self.slowest()[:limit], 1):
+            lines.append(f"\n#{rank} {profile.tool} {1000 * profile.seconds:.1f} ms {profile.arguments}" + (f" ❌ {profile.error}" if profile.error else ""))
+            lines.extend(f"    {line}" for line in profile.top_functions())
+        return "\n".join(lines)
+
+    def dump(self, output_dir: str | Path | None = None) -> Path:
+        """Write the kept profiles (`.prof` or `.folded`) and an `index.json` of their tools and arguments; return the directory."""
+        directory = Path(output_dir or self.output_dir) / time.strftime("%Y%m%d-%H%M%S")
+        directory.mkdir(parents=True, exist_ok=True)
+        index = []
+        for rank, profile in enumerate(self.slowest(), 1):
+            stem = f"{rank:02d}-{profile.tool}-{1000 * profile.seconds:.0f}ms"
+            if profile.stats is not None:
+                path = directory / f"{stem}.prof"
+                profile.stats.dump_stats(path)
+            else:
+                path = directory / f"{stem}.folded"
+                path.write_text("".join(f"{stack} {count}\n" for stack, count in profile.stacks.items()), encoding="utf-8")
+            index.append(
+                {
+                    "file": path.name,
+                    "tool": profile.tool,
+                    "arguments": profile.arguments,
+                    "seconds": profile.seconds,
+                    "started_at": profile.started_at,
+                    "error": profile.error,
+                },
+            )
+        (directory / "index.json").write_text(json.dumps(index, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info("🔬 Wrote %d tool profiles to %s", len(index), directory)
+        return directory
+
+    def clear(self) -> None:
+        """Drop the kept profiles and timings."""
+        with self._lock:
+            self._slowest.clear()
+            self.timings.clear()
+
+    @contextlib.contextmanager
+    def _call(self, fn: Callable[..., Any], signature: inspect.Signature, args: tuple, kwargs: dict) -> Iterator[None]:
+        """Time one call and, if it is sampled and no other call is being profiled, profile it."""
+        sampled = random.random() < self.sample_rate and self._profiling.acquire(blocking=False)  # noqa: S311
+        mode = self.mode
+        profiler = sampler = None
+        if sampled and mode == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler (e.g. one the whole server runs under) is active
+                logger.debug("🔬 Skipping the profile of %s: another profiler is active", fn.__name__)
+                profiler = None
+        elif sampled:
+            sampler = _StackSampler(threading.get_ident(), inspect.unwrap(fn).__code__, self.sample_interval)
+            sampler.start()
+        error = None
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+            if sampled:
+                self._profiling.release()
+            self._record(fn.__name__, seconds)
+            if profiler is not None or sampler is not None:
+                call = CallProfile(
+                    tool=fn.__name__,
+                    arguments=_describe_arguments(signature, args, kwargs),
+                    seconds=seconds,
+                    started_at=started_at,
+                    mode=mode,
+                    stats=pstats.Stats(profiler, stream=io.StringIO()) if profiler is not None else None,
+                    stacks=sampler.stacks if sampler is not None else Counter(),
+                    error=error,
+                )
+                self._keep(call)
+
+    def _record(self, tool: str, seconds: float) -> None:
+        """Add one call to the tool's timings."""
+        with self._lock:
+            timing = self.timings.setdefault(tool, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+            timing["calls"] += 1
+            timing["total_s"] += seconds
+            timing["max_s"] = max(timing["max_s"], seconds)
+
+    def _keep(self, call: CallProfile) -> None:
+        """Keep a profile if it is among the slowest `keep` so far."""
+        with self._lock:
+            heapq.heappush(self._slowest, (call.seconds, next(self._sequence), call))
+            while len(self._slowest) > self.keep:
+                heapq.heappop(self._slowest)
+
+
+def _describe_arguments(signature: inspect.Signature, args: tuple, kwargs: dict) -> dict[str, str]:
+    """Return the call's arguments by name, as shortened reprs."""
+    try:
+        bound = signature.bind(*args, **kwargs).arguments
+    except TypeError:
+        bound = {**dict(enumerate(args)), **kwargs}
+    described = {}
+    for name, value in bound.items():
+        text = repr(value)
+        described[str(name)] = text if len(text) <= MAX_ARGUMENT_CHARS else text[: MAX_ARGUMENT_CHARS - 3] + "..."
+    return described
+
+
+def register_admin_tools(server: FastMCP, profiler: ToolProfiler) -> None:
+    """Add tools that switch profiling on and off, report on it and dump the profiles."""
+
+    @server.tool()
+    def profiling_configure(sample_rate: float, mode: str = "cprofile", keep: int = DEFAULT_KEEP) -> str:
+        """Profile a fraction (0 to 1, 0 = off) of tool calls with cProfile ("cprofile") or a stack sampler ("sample")."""
+        try:
+            profiler.configure(sample_rate, mode, keep)
+        except ValueError as exc:
+            return f"❌ {exc}"
+        return f"✅ Profiling {100 * sample_rate:.0f}% of tool calls ({mode}), keeping the slowest {keep}."
+
+    @server.tool()
+    def profiling_report(limit: int = 10) -> str:
+        """Show per-tool timings and the slowest profiled calls with their arguments."""
+        return profiler.report(limit)
+
+    @server.tool()
+    def profiling_dump() -> str:
+        """Write the slowest profiles to disk (pstats .prof or collapsed-stack .folded files) and return the directory."""
+        return f"✅ Profiles written to {profiler.dump()}"
+
+    @server.tool()
+    def profiling_clear() -> str:
+        """Drop the kept profiles and timings."""
+        profiler.clear()
+        return "✅ Profiles cleared."
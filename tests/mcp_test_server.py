@@ -0,0 +1,61 @@
+"""FastMCP stdio server used by the MCP client tests (started with `sys.executable`).
+
+Tools: echo, add, sleep, fail, pid and crash; `extra` too when MCP_TEST_EXTRA_TOOL=1.
+"""
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP(name="Test Server")
+
+
+@server.tool()
+def echo(message: str) -> str:
+    """Return the message."""
+    return message
+
+
+@server.tool()
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+@server.tool()
+async def sleep(seconds: float) -> str:
+    """Wait, then answer."""
+    await asyncio.sleep(seconds)
+    return "slept"
+
+
+@server.tool()
+def fail() -> str:
+    """Raise an error, always."""
+    message = "This tool always fails."
+    raise ValueError(message)
+
+
+@server.tool()
+def pid() -> int:
+    """Return the server's process id."""
+    return os.getpid()
+
+
+@server.tool()
+def crash() -> str:
+    """Exit the server process without answering."""
+    os._exit(1)
+
+
+if os.environ.get("MCP_TEST_EXTRA_TOOL") == "1":
+
+    @server.tool()
+    def extra() -> str:
+        """Answer from a tool that only some server builds have."""
+        return "extra"
+
+
+if __name__ == "__main__":
+    server.run()
@@ -0,0 +1,169 @@
+"""Tests for the process-wide concurrency controls of the async agents."""
+
+import asyncio
+
+import pytest
+from concurrency import FairLimiter, InflightCoalescer
+
+
+class AbortError(BaseException):
+    """A BaseException that is not an Exception, like KeyboardInterrupt."""
+
+
+async def settle() -> None:
+    """Let every ready task and callback run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def acquire_and_record(limiter: FairLimiter, name: str, order: list[str]) -> None:
+    """Wait for a slot and record when it is granted (the slot is kept)."""
+    await limiter.acquire()
+    order.append(name)
+
+
+def test_fair_limiter_serves_waiters_in_arrival_order() -> None:
+    """Released slots go to the longest waiting caller."""
+    order: list[str] = []
+
+    async def main() -> None:
+        limiter = FairLimiter(1)
+        await limiter.acquire()
+        waiters = []
+        for name in ("first", "second", "third"):
+            waiters.append(asyncio.create_task(acquire_and_record(limiter, name, order)))
+            await settle()
+        assert limiter.queued == 3  # noqa: PLR2004
+        for _ in waiters:
+            limiter.release()
+            await settle()
+        await asyncio.gather(*waiters)
+        assert limiter.active == 1
+
+    asyncio.run(main())
+    assert order == ["first", "second", "third"]
+
+
+def test_fair_limiter_hands_a_slot_past_a_cancelled_waiter() -> None:
+    """A cancelled waiter gives up its place, and the slot goes to the next one."""
+    order: list[str] = []
+
+    async def main() -> None:
+        limiter = FairLimiter(1)
+        await limiter.acquire()
+        cancelled = asyncio.create_task(acquire_and_record(limiter, "cancelled", order))
+        await settle()
+        waiting = asyncio.create_task(acquire_and_record(limiter, "waiting", order))
+        await settle()
+
+        cancelled.cancel()
+        await settle()
+        limiter.release()
+        await waiting
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert (limiter.active, limiter.queued) == (1, 0)
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(main())
+    assert order == ["waiting"]
+
+
+def test_fair_limiter_follows_limit_changes() -> None:
+    """Raising the limit wakes queued waiters; lowering it lets running holders drain first."""
+    order: list[str] = []
+
+    async def main() -> None:
+        limiter = FairLimiter(1)
+        await limiter.acquire()
+        waiters = [asyncio.create_task(acquire_and_record(limiter, name, order)) for name in ("a", "b")]
+        await settle()
+
+        limiter.set_limit(3)
+        await asyncio.wait_for(asyncio.gather(*waiters), 1.0)
+        assert limiter.active == 3  # noqa: PLR2004
+
+        limiter.set_limit(1)
+        late = asyncio.create_task(acquire_and_record(limiter, "late", order))
+        limiter.release()
+        limiter.release()
+        await settle()
+        assert not late.done()
+        limiter.release()
+        await asyncio.wait_for(late, 1.0)
+        assert limiter.active == 1
+
+    asyncio.run(main())
+    assert order == ["a", "b", "late"]
+
+
+def test_coalescer_runs_identical_requests_once() -> None:
+    """Concurrent calls with one key share one execution; other keys run on their own."""
+    calls: list[str] = []
+    coalescer = InflightCoalescer()
+
+    def request(key: str) -> object:
+        async def func() -> str:
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return f"answer to {key}"
+
+        return coalescer.run(key, func)
+
+    async def main() -> list[str]:
+        return await asyncio.gather(request("q"), request("q"), request("q"), request("other"))
+
+    results = asyncio.run(main())
+
+    assert results == ["answer to q"] * 3 + ["answer to other"]
+    assert calls == ["q", "other"]
+    assert coalescer.stats == {"executed": 2, "coalesced": 2}
+
+
+@pytest.mark.parametrize("error", [ValueError("failed"), AbortError("aborted")])
+def test_coalescer_shares_any_failure_and_forgets_the_key(error: BaseException) -> None:
+    """Followers get the owner's error (even a BaseException) instead of waiting forever."""
+    coalescer = InflightCoalescer()
+
+    async def fail() -> str:
+        await asyncio.sleep(0.05)
+        raise error
+
+    async def succeed() -> str:
+        return "fresh"
+
+    async def main() -> None:
+        owner = asyncio.create_task(coalescer.run("q", fail))
+        await settle()
+        follower = asyncio.create_task(coalescer.run("q", succeed))
+        done, _ = await asyncio.wait([owner, follower], timeout=2.0)
+        assert done == {owner, follower}
+        for task in (owner, follower):
+            with pytest.raises(type(error)):
+                task.result()
+        assert await coalescer.run("q", succeed) == "fresh"
+
+    asyncio.run(main())
+
+
+def test_coalescer_follower_takes_over_when_the_owner_is_cancelled() -> None:
+    """If the owner is cancelled, a waiting follower runs the request itself."""
+    coalescer = InflightCoalescer()
+
+    async def slow() -> str:
+        await asyncio.sleep(10)
+        return "slow"
+
+    async def fast() -> str:
+        return "fast"
+
+    async def main() -> str:
+        owner = asyncio.create_task(coalescer.run("q", slow))
+        await settle()
+        follower = asyncio.create_task(coalescer.run("q", fast))
+        await settle()
+        owner.cancel()
+        return await asyncio.wait_for(follower, 2.0)
+
+    assert asyncio.run(main()) == "fast"
@@ -0,0 +1,47 @@
+"""Tests for the length-bucketed encode scheduler."""
+
+import numpy as np
+from encode_scheduler import EncodeScheduler, estimate_tokens, make_mixed_corpus, padded_tokens, plan_batches
+
+TOKEN_BUDGET = 512
+
+
+class RecordingModel:
+    """Encode each text as [its length, its position in the batch]; record the batches."""
+
+    def __init__(self) -> None:
+        """Start with no batches."""
+        self.batches: list[list[str]] = []
+
+    def encode(self, texts: list[str], **_: object) -> np.ndarray:
+        """Return one vector per text."""
+        self.batches.append(texts)
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_batches_fit_the_token_budget_and_group_similar_lengths() -> None:
+    """Every batch stays within the padded budget, and far less is padding than with arrival-order batches."""
+    lengths = [estimate_tokens(text) for text in make_mixed_corpus(500)]
+
+    batches = plan_batches(lengths, TOKEN_BUDGET)
+    arrival = [list(range(i, min(i + 32, len(lengths)))) for i in range(0, len(lengths), 32)]
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    assert all(len(batch) * max(lengths[i] for i in batch) <= TOKEN_BUDGET for batch in batches)
+    assert padded_tokens(lengths, batches) < 0.5 * padded_tokens(lengths, arrival)
+
+
+def test_encode_restores_the_original_order_and_counts_throughput() -> None:
+    """Embeddings come back in input order, whatever batches the texts were encoded in."""
+    texts = ["short", "a much longer text " * 40, "mid length text here", "x", "a much longer text " * 30]
+    model = RecordingModel()
+    scheduler = EncodeScheduler(model, token_budget=400)
+
+    embeddings = scheduler.encode(texts)
+
+    assert embeddings[:, 0].tolist() == [len(text) for text in texts]
+    assert [len(batch) for batch in model.batches] == [2, 3]  # the two long texts, then the three short ones
+    assert scheduler.stats["documents"] == len(texts)
+    assert scheduler.stats["batches"] == len(model.batches)
+    assert 0 < scheduler.padding_rate < 1
+    assert scheduler.documents_per_second > 0
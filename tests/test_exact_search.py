@@ -0,0 +1,43 @@
+"""Tests for the blocked exact search over memory-mapped embeddings."""
+
+from pathlib import Path
+
+import numpy as np
+from exact_search import open_embeddings, search
+
+ROWS = 1000
+DIMENSIONS = 16
+TOP_K = 7
+
+
+def brute_force(embeddings: np.ndarray, query: np.ndarray, top_k: int) -> list[int]:
+    """Return the rows of the best cosine scores, computed in one pass in memory."""
+    scores = embeddings @ query / (np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query))
+    return list(np.argsort(-scores)[:top_k])
+
+
+def test_blocked_search_over_memory_map_matches_brute_force(tmp_path: Path) -> None:
+    """Scanning a memory-mapped file in parallel blocks finds exactly the in-memory top-k."""
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((ROWS, DIMENSIONS), dtype=np.float32)
+    np.save(tmp_path / "embeddings.npy", embeddings)
+    query = rng.standard_normal(DIMENSIONS, dtype=np.float32)
+
+    mapped = open_embeddings(tmp_path / "embeddings.npy")
+    hits = search(mapped, query, TOP_K, block_rows=64, max_workers=4)
+
+    assert isinstance(mapped, np.memmap)
+    assert [row for row, _ in hits] == brute_force(embeddings, query, TOP_K)
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+    assert search(mapped, query, TOP_K, block_rows=ROWS) == hits
+
+
+def test_search_handles_small_corpora_and_zero_rows() -> None:
+    """top_k larger than the corpus returns every row, and an all-zero row scores 0."""
+    embeddings = np.array([[1.0, 0.0], [0.0, 0.0], [0.6, 0.8]], dtype=np.float32)
+
+    hits = search(embeddings, np.array([1.0, 0.0]), top_k=10, block_rows=2)
+
+    assert [row for row, _ in hits] == [0, 2, 1]
+    assert hits[2] == (1, 0.0)
+    assert search(embeddings[:0], np.array([1.0, 0.0]), top_k=3) == []
@@ -0,0 +1,58 @@
+"""Startup-time tests: the package and its CLI import quickly and without heavy dependencies."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Cumulative import time of the CLI in a fresh interpreter (it is about 20 ms)
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "numpy", "langchain_core", "langchain_ollama", "mcp", "streamlit")
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Run code in a fresh interpreter with `-X importtime` and return each imported module's cumulative microseconds."""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, check=True)  # noqa: S603
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_imports_within_budget() -> None:
+    """Importing the CLI stays under the cold-start budget."""
+    times = import_times("import agenticai_foundations_to_advanced.cli")
+
+    assert times["agenticai_foundations_to_advanced.cli"] < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize("argv", [["list"], ["--help"], ["rag-query", "--help"]])
+def test_cli_commands_without_work_import_no_heavy_dependencies(argv: list[str]) -> None:
+    """`--help` and `list` never import torch, numpy, langchain or mcp."""
+    times = import_times(f"from agenticai_foundations_to_advanced.cli import main\ntry:\n    main({argv!r})\nexcept SystemExit:\n    pass")
+
+    assert "agenticai_foundations_to_advanced.cli" in times
+    assert not [module for module in times if module.split(".")[0] in HEAVY_MODULES]
+
+
+def test_exports_load_lazily() -> None:
+    """A package export is imported on first access, and the RAG engine defers sentence-transformers until it is created."""
+    code = """import sys
+import agenticai_foundations_to_advanced as package
+assert "rag_engine" not in sys.modules
+package.RAGEngine
+assert "rag_engine" in sys.modules"""
+    times = import_times(code)
+
+    assert "numpy" in times
+    assert "sentence_transformers" not in times
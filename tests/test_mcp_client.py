@@ -0,0 +1,342 @@
+"""Tests for the MCP client helpers, against fake sessions and a FastMCP stdio server (`mcp_test_server.py`)."""
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aggregator import MCPAggregator
+from catalog_cache import CatalogCache
+from concurrent_calls import ToolCall, call_many, discover
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import (
+    CallToolResult,
+    Implementation,
+    InitializeResult,
+    ListPromptsResult,
+    ListResourcesResult,
+    ListToolsResult,
+    Prompt,
+    ServerCapabilities,
+    TextContent,
+    Tool,
+    ToolsCapability,
+)
+from session_pool import SessionPool, SessionUnavailableError
+
+SERVER_SCRIPT = str(Path(__file__).with_name("mcp_test_server.py"))
+TEST_TIMEOUT = 60.0
+
+
+def server_params(**env: str) -> StdioServerParameters:
+    """Return the parameters that start the test server with this Python and extra environment variables."""
+    return StdioServerParameters(command=sys.executable, args=[SERVER_SCRIPT], env={**os.environ, **env})
+
+
+def run(coroutine: Any) -> Any:  # noqa: ANN401
+    """Run a coroutine in a new event loop, failing the test instead of hanging."""
+    return asyncio.run(asyncio.wait_for(coroutine, TEST_TIMEOUT))
+
+
+def text_of(result: Any) -> str:  # noqa: ANN401
+    """Return the text of a tool result."""
+    return "".join(content.text for content in result.content)
+
+
+class CountingSession:
+    """Stand-in for a ClientSession that serves fixed catalogs and counts the list requests."""
+
+    def __init__(self, tools: list[str]) -> None:
+        """Serve tools with the given names, and one prompt."""
+        self.tools = [Tool(name=name, inputSchema={"type": "object"}) for name in tools]
+        self.requests: list[str] = []
+
+    async def list_tools(self, cursor: str | None = None) -> ListToolsResult:
+        """Return every tool in one page."""
+        self.requests.append(f"tools:{cursor}")
+        return ListToolsResult(tools=self.tools)
+
+    async def list_resources(self, cursor: str | None = None) -> ListResourcesResult:
+        """Return no resources."""
+        self.requests.append(f"resources:{cursor}")
+        return ListResourcesResult(resources=[])
+
+    async def list_prompts(self, cursor: str | None = None) -> ListPromptsResult:
+        """Return one prompt."""
+        self.requests.append(f"prompts:{cursor}")
+        return ListPromptsResult(prompts=[Prompt(name="greeting")])
+
+
+class RecordingSession(CountingSession):
+    """CountingSession whose tools echo their name and record their timeouts; "boom" and listing resources fail."""
+
+    def __init__(self) -> None:
+        """Serve one tool, and record no calls yet."""
+        super().__init__(["echo"])
+        self.timeouts: dict[str, float] = {}
+
+    async def call_tool(self, name: str, arguments: dict[str, Any], read_timeout_seconds: Any) -> CallToolResult:  # noqa: ANN401
+        """Answer one tool call."""
+        self.timeouts[name] = read_timeout_seconds.total_seconds()
+        if name == "boom":
+            message = f"not an MCP error ({arguments})"
+            raise RuntimeError(message)
+        return CallToolResult(content=[TextContent(type="text", text=name)])
+
+    async def list_resources(self, cursor: str | None = None) -> ListResourcesResult:
+        """Fail, like a server that advertises resources but cannot list them."""
+        message = f"resources are broken (cursor {cursor})"
+        raise RuntimeError(message)
+
+
+def make_init_result(capabilities: ServerCapabilities | None = None) -> InitializeResult:
+    """Return the handshake result of a FastMCP-like server (its version is the SDK version)."""
+    return InitializeResult(
+        protocolVersion="2025-06-18",
+        capabilities=capabilities or ServerCapabilities(tools=ToolsCapability()),
+        serverInfo=Implementation(name="Test Server", version="1.26.0"),
+    )
+
+
+def tool_names(tools: list[Any]) -> list[str]:
+    """Return the names of catalog entries."""
+    return [tool.name for tool in tools]
+
+
+def test_catalog_cache_serves_from_memory_until_the_ttl() -> None:
+    """A cached catalog is reused, then fetched again once older than the TTL."""
+    init_result = make_init_result()
+    fresh = CatalogCache()
+    stale = CatalogCache(ttl_seconds=0.0)
+    session = CountingSession(["echo"])
+
+    async def main() -> None:
+        await fresh.get(session, init_result)
+        await fresh.get(session, init_result)
+        await stale.get(session, init_result)
+        await asyncio.sleep(0.01)
+        session.tools.append(Tool(name="added", inputSchema={"type": "object"}))
+        assert tool_names(await stale.get(session, init_result)) == ["echo", "added"]
+
+    asyncio.run(main())
+    assert fresh.cache_dir is None
+    assert session.requests == ["tools:None"] * 3
+
+
+def test_catalog_cache_persists_to_disk_only_with_a_cache_dir(tmp_path: Path) -> None:
+    """With a cache_dir, a new cache reads the catalog from disk, until the TTL expires."""
+    init_result = make_init_result()
+    session = CountingSession(["echo"])
+
+    async def main() -> None:
+        await CatalogCache(cache_dir=tmp_path).get(session, init_result)
+        assert tool_names(await CatalogCache(cache_dir=tmp_path).get(session, init_result)) == ["echo"]
+        await CatalogCache(cache_dir=tmp_path, ttl_seconds=0.0).get(session, init_result)
+
+    asyncio.run(main())
+    assert len(list(tmp_path.glob("*-tools.json"))) == 1
+    assert session.requests == ["tools:None", "tools:None"]
+
+
+def test_discover_skips_unadvertised_lists_and_uses_the_cache() -> None:
+    """Discovery fetches only advertised lists, and with a cache fetches them once."""
+    init_result = make_init_result()
+    cache = CatalogCache()
+    session = CountingSession(["echo", "add"])
+
+    async def main() -> None:
+        plain = await discover(session, init_result.capabilities)
+        first = await discover(session, cache=cache, init_result=init_result)
+        second = await discover(session, cache=cache, init_result=init_result)
+        assert tool_names(plain.tools) == tool_names(first.tools) == tool_names(second.tools) == ["echo", "add"]
+        assert plain.prompts == first.prompts == []
+
+    asyncio.run(main())
+    assert session.requests == ["tools:None", "tools:None"]
+
+
+def test_discover_keeps_the_lists_that_load() -> None:
+    """A list that fails to load is left empty; the others are returned."""
+    catalog = asyncio.run(discover(RecordingSession()))
+
+    assert tool_names(catalog.tools) == ["echo"]
+    assert catalog.resources == []
+    assert tool_names(catalog.prompts) == ["greeting"]
+
+
+def test_discover_lists_a_stdio_server() -> None:
+    """Discovery returns the tools of a real server."""
+
+    async def main() -> list[str]:
+        async with stdio_client(server_params()) as (read, write), ClientSession(read, write) as session:
+            init_result = await session.initialize()
+            return tool_names((await discover(session, init_result.capabilities)).tools)
+
+    assert {"echo", "add", "sleep", "fail"} <= set(run(main()))
+
+
+def test_call_many_keeps_partial_results_and_explicit_timeouts() -> None:
+    """Any exception becomes that call's outcome, and an explicit timeout of 0 is not replaced by the default."""
+    session = RecordingSession()
+    calls = [ToolCall("first", timeout=0.0), ToolCall("boom"), ToolCall("last")]
+
+    outcomes = asyncio.run(call_many(session, calls, timeout=30.0))
+
+    assert [outcome.ok for outcome in outcomes] == [True, False, True]
+    assert isinstance(outcomes[1].error, RuntimeError)
+    assert text_of(outcomes[2].result) == "last"
+    assert session.timeouts == {"first": 0.0, "boom": 30.0, "last": 30.0}
+
+
+def test_call_many_runs_calls_concurrently_with_timeouts() -> None:
+    """A timed-out or failing call does not hold up or abort the others."""
+    calls = [
+        ToolCall("sleep", {"seconds": 5.0}, timeout=0.5),
+        ToolCall("sleep", {"seconds": 0.3}),
+        ToolCall("sleep", {"seconds": 0.3}),
+        ToolCall("fail"),
+    ]
+
+    async def main() -> tuple[list[Any], float]:
+        async with stdio_client(server_params()) as (read, write), ClientSession(read, write) as session:
+            await session.initialize()
+            start = time.perf_counter()
+            outcomes = await call_many(session, calls, max_concurrency=4, timeout=10.0)
+            return outcomes, time.perf_counter() - start
+
+    outcomes, seconds = run(main())
+
+    assert isinstance(outcomes[0].error, McpError)
+    assert [text_of(outcome.result) for outcome in outcomes[1:3]] == ["slept", "slept"]
+    assert outcomes[3].result.isError
+    assert not outcomes[3].ok
+    assert seconds < 2.0  # noqa: PLR2004
+
+
+def test_aggregator_namespaces_tools_and_skips_servers_that_fail() -> None:
+    """Tools of every server that comes up are merged under "<server>__<tool>" and routed to it."""
+    servers = {
+        "one": server_params(),
+        "two": server_params(),
+        "broken": StdioServerParameters(command=sys.executable, args=["-c", "raise SystemExit(1)"]),
+    }
+
+    async def main() -> None:
+        async with MCPAggregator(servers) as agg:
+            assert agg.connected == ["one", "two"]
+            names = tool_names(await agg.list_tools())
+            assert {"one__echo", "two__echo", "two__add"} <= set(names)
+            assert text_of(await agg.call_tool("two__add", {"a": 2, "b": 3})) == "5"
+            with pytest.raises(KeyError, match="one__missing"):
+                await agg.call_tool("one__missing")
+
+    run(main())
+
+
+def test_aggregator_refetches_a_stale_catalog_for_an_unknown_tool() -> None:
+    """A tool added to a server whose catalog is cached is found by invalidating that cache entry."""
+    cache = CatalogCache()
+
+    async def main() -> None:
+        async with MCPAggregator({"test": server_params()}, catalog_cache=cache) as agg:
+            assert "test__extra" not in tool_names(await agg.list_tools())
+        # Same name and version, so the cached catalog is stale
+        async with MCPAggregator({"test": server_params(MCP_TEST_EXTRA_TOOL="1")}, catalog_cache=cache) as agg:
+            assert "test__extra" not in tool_names(await agg.list_tools())
+            assert text_of(await agg.call_tool("test__extra")) == "extra"
+            assert "test__extra" in tool_names(await agg.list_tools())
+
+    run(main())
+
+
+def test_session_pool_multiplexes_up_to_the_cap() -> None:
+    """Busy sessions make the pool start more, up to the cap; then calls share the least busy one."""
+
+    async def main() -> None:
+        async with SessionPool({"test": server_params()}, max_sessions_per_server=2, max_in_flight_per_session=1, health_check_interval=None) as pool:
+            results = await asyncio.gather(*(pool.call_tool("test", "sleep", {"seconds": 0.5}) for _ in range(4)))
+            pids = await asyncio.gather(*(pool.call_tool("test", "pid") for _ in range(4)))
+            assert [text_of(result) for result in results] == ["slept"] * 4
+            assert len(pool.stats()["test"]) == 2  # noqa: PLR2004
+            assert len({text_of(result) for result in pids}) <= 2  # noqa: PLR2004
+
+    run(main())
+
+
+def test_session_pool_keeps_serving_while_a_session_starts() -> None:
+    """A session being started does not hold up calls that can share a running session."""
+    finished: list[str] = []
+
+    async def call(pool: SessionPool, label: str, tool: str, arguments: dict[str, Any]) -> None:
+        await pool.call_tool("test", tool, arguments)
+        finished.append(label)
+
+    async def main() -> None:
+        async with SessionPool({"test": server_params()}, max_sessions_per_server=2, max_in_flight_per_session=1, health_check_interval=None) as pool:
+            await pool.warm()
+            busy = asyncio.create_task(call(pool, "busy", "sleep", {"seconds": 1.0}))
+            await asyncio.sleep(0.1)
+            # The only session is busy, so this call starts a second one (a new process and handshake)
+            starts = asyncio.create_task(call(pool, "starts", "echo", {"message": "hi"}))
+            await asyncio.sleep(0.01)
+            # At the cap, this one shares the busy session instead of waiting for the start
+            await call(pool, "shares", "echo", {"message": "hi"})
+            await asyncio.gather(busy, starts)
+
+    run(main())
+    assert finished.index("shares") < finished.index("starts")
+
+
+def test_session_pool_replaces_a_session_whose_server_died() -> None:
+    """After the server process dies, the next call is retried on a new session and process."""
+
+    async def main() -> None:
+        async with SessionPool({"test": server_params()}, health_check_interval=None) as pool:
+            first_pid = int(text_of(await pool.call_tool("test", "pid")))
+            os.kill(first_pid, signal.SIGKILL)
+            await asyncio.sleep(0.2)
+            assert int(text_of(await pool.call_tool("test", "pid"))) != first_pid
+
+            # A call in flight when the server exits fails, and its session is dropped
+            with pytest.raises(McpError, match="Connection closed"):
+                await pool.call_tool("test", "crash")
+            assert text_of(await pool.call_tool("test", "echo", {"message": "back"})) == "back"
+            assert len(pool.stats()["test"]) == 1
+
+    run(main())
+
+
+def test_health_check_restarts_dead_sessions() -> None:
+    """A session that does not answer a ping is replaced."""
+
+    async def main() -> None:
+        async with SessionPool({"test": server_params()}, health_check_interval=None) as pool:
+            await pool.warm()
+            os.kill(int(text_of(await pool.call_tool("test", "pid"))), signal.SIGKILL)
+            await asyncio.sleep(0.2)
+            await pool.health_check()
+            assert len(pool.stats()["test"]) == 1
+            assert text_of(await pool.call_tool("test", "echo", {"message": "ok"})) == "ok"
+
+    run(main())
+
+
+def test_session_pool_gives_up_on_a_server_that_never_answers() -> None:
+    """A server that never finishes the handshake is shut down after the start timeout instead of hanging the pool."""
+    silent = StdioServerParameters(command=sys.executable, args=["-c", "import time; time.sleep(60)"])
+
+    async def main() -> None:
+        async with SessionPool({"silent": silent}, health_check_interval=None, start_timeout=0.5) as pool:
+            start = time.perf_counter()
+            with pytest.raises(SessionUnavailableError, match="handshake"):
+                await pool.warm()
+            assert time.perf_counter() - start < 10.0  # noqa: PLR2004
+            assert pool.stats() == {"silent": []}
+
+    run(main())
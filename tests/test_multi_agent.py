@@ -0,0 +1,281 @@
+"""Offline tests for the multi-agent example and the tool-calling chatbot, using the fake chat model."""
+
+import asyncio
+import importlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import ModuleType
+
+import benchmark
+import llm_registry
+import pytest
+from context_packer import ContextPacker
+from fake_llm import DEFAULT_REPLIES, FakeChatModel
+from jobs import JobManager
+from orchestrator import Orchestrator
+from tracing import get_tracer
+
+PIPELINE_CALLS = 3  # routing, research and writer
+AGENT_TURNS = 2  # the tool call, then the answer
+CONCURRENT_SPEEDUP = 1.5
+
+
+@pytest.fixture
+def fake_model() -> Iterator[FakeChatModel]:
+    """Make every agent use an instant fake model, without writing trace files."""
+    model = benchmark.install_fake_model(latency=0.0, tokens_per_second=0.0)
+    yield model
+    llm_registry.set_llm_factory(None)
+
+
+class _FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answer Ollama `/api/chat` requests with the fake model's replies, streamed as NDJSON if asked."""
+
+    protocol_version = "HTTP/1.1"  # keep connections open, so clients pool them like with Ollama
+
+    def do_POST(self) -> None:
+        """Reply to one chat request, picked by matching the system prompt like FakeChatModel does."""
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        system = " ".join(m["content"] for m in body["messages"] if m["role"] == "system")
+        reply = next((text for key, text in DEFAULT_REPLIES.items() if key in system), "Hello!")
+        done = {"model": body["model"], "done": True, "done_reason": "stop", "prompt_eval_count": 10, "eval_count": len(reply.split())}
+        if body.get("stream", True):
+            chunks = [{"model": body["model"], "message": {"role": "assistant", "content": reply[i : i + 8]}, "done": False} for i in range(0, len(reply), 8)]
+            lines = [*chunks, {**done, "message": {"role": "assistant", "content": ""}}]
+        else:
+            lines = [{**done, "message": {"role": "assistant", "content": reply}}]
+        payload = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_: object) -> None:
+        """Keep the test output quiet."""
+
+
+@pytest.fixture
+def ollama_server(monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Point the real ChatOllama clients at a local fake Ollama server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllamaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setenv("OLLAMA_HOST", host)
+    llm_registry.set_llm_factory(None)
+    get_tracer().path = None
+    yield host
+    llm_registry.set_llm_factory(None)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def chatbot() -> ModuleType:
+    """Import the tool-calling chatbot without contacting Ollama."""
+    # The chatbot builds its client at import time, from the same registry as the agents
+    llm_registry.set_llm_factory(lambda _: FakeChatModel())
+    try:
+        return importlib.import_module("chatbotwith_tool")
+    finally:
+        llm_registry.set_llm_factory(None)
+
+
+def test_fake_model_streams_reply_with_usage() -> None:
+    """The fake model picks its reply from the system prompt and reports token usage."""
+    model = FakeChatModel()
+    messages = [{"role": "system", "content": "You are a Research Agent."}, {"role": "user", "content": "What is X?"}]
+    chunks = list(model.stream(messages))
+    message = chunks[0]
+    for chunk in chunks[1:]:
+        message += chunk
+
+    assert message.content == DEFAULT_REPLIES["Research Agent"]
+    assert len(chunks) > 1
+    assert message.usage_metadata["output_tokens"] == len(message.content.split())
+    assert model.stats["calls"] == 1
+
+
+def test_context_packer_dedupes_and_keeps_relevant_findings_in_budget() -> None:
+    """Duplicates are dropped and, when over budget, the findings about the query win."""
+    findings = """Research Findings:
+- Solar panels convert sunlight into electricity.
+- Solar panels convert sunlight to electricity!
+- The Roman Empire lasted for centuries.
+- Solar power costs fell sharply over the last decade."""
+    packer = ContextPacker()
+
+    result = packer.pack("How cheap is solar power compared to before?", findings, budget=30)
+
+    assert result.duplicates == 1
+    assert result.tokens_after <= 30  # noqa: PLR2004
+    assert result.text.splitlines()[0] == "- Solar power costs fell sharply over the last decade."
+    assert "Roman" not in result.text
+    assert packer.stats["tokens_before"] - packer.stats["tokens_after"] == result.tokens_saved
+
+
+def test_orchestrator_run_stream_and_arun_agree(fake_model: FakeChatModel) -> None:
+    """All three entry points route, research and write with the injected model."""
+    orch = Orchestrator(use_local_router=False)
+
+    result = orch.run("What is quantum computing?")
+    events = list(orch.stream("What is quantum computing?"))
+    async_result = asyncio.run(orch.arun("What is quantum computing?"))
+
+    assert result["route"] == "research_and_write"
+    assert result["research"] == DEFAULT_REPLIES["Research Agent"]
+    assert result["response"] == DEFAULT_REPLIES["Writer Agent"]
+    assert events[-1] == {"type": "done", "result": result}
+    assert async_result == result
+    assert fake_model.stats["calls"] == 3 * PIPELINE_CALLS
+    assert {"routing", "research", "writer", "research.llm"} <= {row["span"] for row in get_tracer().summary()}
+
+
+def test_arun_works_across_event_loops(ollama_server: str) -> None:
+    """The cached Ollama clients serve `arun` from one `asyncio.run` after another."""
+    orch = Orchestrator(use_local_router=False)
+
+    first = asyncio.run(orch.arun("What is quantum computing?"))
+    second = asyncio.run(orch.arun("What is solar power?"))
+
+    assert ollama_server.startswith("http://127.0.0.1:")
+    assert first["response"] == second["response"] == DEFAULT_REPLIES["Writer Agent"]
+
+
+def test_arun_cancels_speculative_research_on_a_direct_route() -> None:
+    """When routing says "direct", the research started alongside it is cancelled and counted as wasted."""
+    # Research takes about 3 s of tokens, so it is still running when the one-word route arrives
+    replies = {**DEFAULT_REPLIES, "Orchestrator Agent": "direct", "Research Agent": "Research Findings: " + "fact " * 60}
+    model = FakeChatModel(latency=0.05, tokens_per_second=20.0, replies=replies)
+    llm_registry.set_llm_factory(lambda _: model)
+    get_tracer().path = None
+    orch = Orchestrator(use_local_router=False)
+
+    async def answer(query: str) -> tuple[dict, float, list[asyncio.Task]]:
+        start = time.perf_counter()
+        result = await orch.arun(query)
+        return result, time.perf_counter() - start, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    try:
+        result, seconds, pending = asyncio.run(answer("Hi there!"))
+        # Concurrent event loops on several threads update the same stats
+        threads = [threading.Thread(target=asyncio.run, args=(orch.arun(f"Hello number {i}"),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        llm_registry.set_llm_factory(None)
+
+    assert result["route"] == "direct"
+    assert result["research"] is None
+    assert pending == []
+    assert seconds < 2.0  # noqa: PLR2004
+    assert orch.speculation_stats["speculated"] == orch.speculation_stats["wasted"] == 5  # noqa: PLR2004
+    assert orch.speculation_stats["overlap_seconds"] == 0.0
+    assert orch.speculation_waste_rate == 1.0
+    # Routing and the direct answer for each query; a research call cancelled while queued for a slot never reaches the model
+    assert 2 * 5 <= model.stats["calls"] <= 3 * 5
+
+
+def test_job_manager_runs_queries_in_the_background(fake_model: FakeChatModel) -> None:
+    """Submitted jobs return an ID at once and fill in their progress until done."""
+    fake_model.latency = 0.05
+    manager = JobManager(Orchestrator(use_local_router=False), max_workers=2)
+
+    job_ids = [manager.submit("What is quantum computing?"), manager.submit("What is a qubit?")]
+    deadline = time.monotonic() + 5
+    while not all(manager.get(job_id).finished for job_id in job_ids) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.shutdown()
+
+    job = manager.get(job_ids[0])
+    assert job.status == "done"
+    assert job.route == "research_and_write"
+    assert job.response == job.result["response"] == DEFAULT_REPLIES["Writer Agent"]
+    assert manager.stats()["done"] == len(job_ids)
+
+
+def test_run_agent_executes_tool_calls(chatbot: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    """`run_agent` runs the tools the model asks for and sends their results back."""
+    model = FakeChatModel(tool_calls=[{"name": "equipment_history", "args": {"equipment_name": "EQ12345"}}], default_reply="Purchased on 2023-01-15.")
+    monkeypatch.setattr(chatbot, "llm", model)
+    monkeypatch.setattr(chatbot, "agent_llm", model.bind_tools(chatbot.tools))
+
+    assert chatbot.run_agent("When was EQ12345 purchased?") == "Purchased on 2023-01-15."
+    assert model.stats["calls"] == AGENT_TURNS
+
+
+def test_tool_calls_run_concurrently_with_timeouts_and_isolated_errors(chatbot: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Slow tools run side by side, and a hanging, failing or unknown tool does not break the turn."""
+
+    def slow(args: dict) -> str:
+        time.sleep(0.3)
+        return f"slow {args['code']}"
+
+    def fail(_: dict) -> str:
+        message = "vendor API down"
+        raise RuntimeError(message)
+
+    def hang(_: dict) -> str:
+        time.sleep(1.0)
+        return "too late"
+
+    tool_map = {name: type("FakeTool", (), {"run": staticmethod(fn)}) for name, fn in {"slow": slow, "fail": fail, "hang": hang}.items()}
+    monkeypatch.setattr(chatbot, "TOOL_MAP", tool_map)
+    monkeypatch.setattr(chatbot, "TOOL_TIMEOUTS", {"slow": 0.5})
+    monkeypatch.setattr(chatbot, "DEFAULT_TOOL_TIMEOUT", 0.1)
+    calls = [{"name": "slow", "args": {"code": f"EQ{i}"}, "id": str(i)} for i in range(3)]
+    calls += [{"name": name, "args": {}, "id": name} for name in ("fail", "hang", "missing")]
+
+    start = time.perf_counter()
+    messages = chatbot.run_tool_calls(calls)
+    elapsed = time.perf_counter() - start
+
+    assert [m["content"] for m in messages] == [
+        "slow EQ0",
+        "slow EQ1",
+        "slow EQ2",
+        "Tool fail failed: vendor API down",
+        "Tool hang timed out after 0.1s.",
+        "Unknown tool: missing.",
+    ]
+    assert [m["tool_call_id"] for m in messages] == ["0", "1", "2", "fail", "hang", "missing"]
+    assert elapsed < 0.3 * 2
+
+
+def test_equipment_lookups_are_cached_per_normalized_code(chatbot: ModuleType) -> None:
+    """Different spellings of one equipment code share a cached result."""
+    before = dict(chatbot.tool_cache.stats)
+
+    first = chatbot.technical_document_lookup.run({"equipment_name": "eq-67890"})
+    second = chatbot.technical_document_lookup.run({"equipment_name": " EQ67890 "})
+
+    assert first == second == "Technical details for EQ67890: Model X, Power: 999 W, Dimensions: 50x50x50 cm."
+    assert chatbot.tool_cache.stats["misses"] - before["misses"] == 1
+    assert chatbot.tool_cache.stats["hits"] - before["hits"] == 1
+
+
+def test_batch_tools_describe_many_codes_in_one_call(chatbot: ModuleType) -> None:
+    """Batch tools answer once for every requested code, in request order, including unknown codes."""
+    result = chatbot.equipment_history_batch.run({"equipment_names": ["eq-24680", "EQ67890", "EQ99999", "EQ24680"]})
+
+    assert result.splitlines() == [
+        "History for EQ24680: Purchased on 2022-03-02, Last serviced on 2024-11-20.",
+        "No history found for EQ67890.",
+        "No history found for EQ99999.",
+    ]
+    assert chatbot.store.get("eq 13579").power_w == 450  # noqa: PLR2004
+
+
+def test_benchmark_measures_scaling_and_cache() -> None:
+    """The benchmark runs offline and sees both concurrency scaling and cache hits."""
+    results = benchmark.run_benchmark(latency=0.01, tokens_per_second=0.0, queries=4)
+
+    speedups = {row["concurrency"]: row["speedup"] for row in results["concurrency"]}
+    assert speedups[4] > CONCURRENT_SPEEDUP
+    assert results["cache"]["hit_rate"] == pytest.approx(2 / 3)
+    assert results["overhead"]["model_ms"] == pytest.approx(PIPELINE_CALLS * 10.0)
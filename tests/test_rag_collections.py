@@ -0,0 +1,100 @@
+"""Tests for the RAG collections, with a small deterministic encoder in place of sentence-transformers."""
+
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+from rag_collections import CollectionManager
+
+DIMENSIONS = 64
+
+
+class HashingEncoder:
+    """Bag-of-words vectors from hashed words; counts the texts it encodes."""
+
+    def __init__(self) -> None:
+        """Start with no encoded texts."""
+        self.encoded = 0
+
+    def encode(self, texts: list[str], **_: object) -> np.ndarray:
+        """Return one float32 vector per text."""
+        self.encoded += len(texts)
+        vectors = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"[a-z]+", text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % DIMENSIONS] += 1
+        return vectors
+
+
+@pytest.fixture
+def encoder() -> HashingEncoder:
+    """Return a fresh encoder."""
+    return HashingEncoder()
+
+
+def test_collections_are_isolated_and_encode_only_new_documents(tmp_path: Path, encoder: HashingEncoder) -> None:
+    """Each collection answers from its own documents, and adding a document encodes just that document."""
+    collections = CollectionManager(tmp_path, model=encoder)
+
+    collections.add_documents("team-a", ["Docker runs containers.", "Redis is an in-memory cache."])
+    collections.add_documents("team-b", ["Kubernetes orchestrates containers."])
+    encoded = encoder.encoded
+    collections.add_documents("team-a", ["Git tracks source code changes."])
+
+    assert encoder.encoded - encoded == 1
+    assert collections.query("team-a", "source code changes", top_k=1)[0]["document"] == "Git tracks source code changes."
+    assert [r["document"] for r in collections.query("team-b", "containers")] == ["Kubernetes orchestrates containers."]
+    assert collections.query("team-c", "anything") is None
+    with pytest.raises(ValueError, match="Invalid collection name"):
+        collections.get("../etc")
+
+
+def test_adding_documents_again_does_not_duplicate_them(tmp_path: Path, encoder: HashingEncoder) -> None:
+    """Documents already in a collection, even from an earlier run, are skipped and not encoded again."""
+    first_run = CollectionManager(tmp_path, model=encoder)
+    assert first_run.add_documents("default", ["Docker runs containers.", "Docker runs containers."]) == (1, 1)
+    first_run.flush()
+
+    second_run = CollectionManager(tmp_path, model=encoder)
+    encoded = encoder.encoded
+
+    assert second_run.add_documents("default", ["Docker runs containers."]) == (0, 1)
+    assert second_run.add_documents("default", ["Docker runs containers.", "Git tracks source code changes."]) == (1, 2)
+    assert encoder.encoded - encoded == 1
+
+
+def test_least_recently_used_collections_are_evicted_to_disk_and_reloaded(tmp_path: Path, encoder: HashingEncoder) -> None:
+    """Over the memory budget, the least recently used collection is saved and dropped, then reloaded on use."""
+    # Each collection holds 2 documents: 2 * 64 * 4 bytes of embeddings plus the text, under 1 KB
+    collections = CollectionManager(tmp_path, memory_budget_mb=0.0015, model=encoder)
+    for name in ("a", "b", "c"):
+        collections.add_documents(name, [f"Document one of {name}.", f"Document two of {name}."])
+    encoded = encoder.encoded
+
+    assert not collections.is_loaded("a")
+    assert collections.is_loaded("c")
+    assert collections.memory_bytes <= collections.memory_budget_bytes
+    assert collections.names() == ["a", "b", "c"]
+
+    documents = collections.get("a").documents
+
+    assert documents == ["Document one of a.", "Document two of a."]
+    assert collections.stats["loads"] == 1
+    assert encoder.encoded == encoded  # reloading reads the saved embeddings
+    assert not collections.is_loaded("b")
+
+
+def test_memory_mapped_collections_query_from_disk(tmp_path: Path, encoder: HashingEncoder) -> None:
+    """With `mmap`, a reloaded collection searches its embeddings on disk and only its documents use the budget."""
+    writer = CollectionManager(tmp_path, model=encoder)
+    writer.add_documents("docs", ["Docker runs containers.", "Git tracks source code changes."])
+    writer.flush()
+
+    collections = CollectionManager(tmp_path, model=encoder, mmap=True)
+    engine = collections.get("docs")
+
+    assert isinstance(engine.embeddings, np.memmap)
+    assert engine.nbytes == sum(len(document) for document in engine.documents)
+    assert collections.query("docs", "source code", top_k=1)[0]["document"] == "Git tracks source code changes."
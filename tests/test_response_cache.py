@@ -0,0 +1,96 @@
+"""Tests for the semantic response cache, with a small bag-of-words embedder instead of sentence-transformers."""
+
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+from response_cache import ResponseCache
+
+DIMENSIONS = 64
+
+
+def embed(texts: list[str]) -> np.ndarray:
+    """Embed texts as normalized bags of hashed words, so shared words mean similar vectors."""
+    vectors = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.split():
+            vectors[row, zlib.crc32(word.encode()) % DIMENSIONS] += 1.0
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def make_result(query: str) -> dict:
+    """Return an Orchestrator-like result."""
+    return {"query": query, "route": "direct", "research": "", "response": f"Answer to {query}"}
+
+
+def test_exact_lookup_ignores_case_whitespace_and_punctuation() -> None:
+    """A rephrasing that normalizes to the same text is an exact hit, and reports the new phrasing."""
+    cache = ResponseCache(semantic=False)
+    cache.put("What is solar power?", make_result("What is solar power?"))
+
+    result = cache.get("  what IS solar   power ")
+
+    assert result["response"] == "Answer to What is solar power?"
+    assert result["query"] == "  what IS solar   power "
+    assert cache.get("What is wind power?") is None
+    assert cache.stats == {"exact_hits": 1, "semantic_hits": 0, "misses": 1}
+
+
+def test_semantic_lookup_returns_result_for_the_new_question() -> None:
+    """A similar question hits the cached result, with `query` set to the user's question."""
+    cache = ResponseCache(embed=embed, similarity_threshold=0.8)
+    cache.put("how do solar panels make electricity", make_result("how do solar panels make electricity"))
+
+    result = cache.get("how do solar panels make electricity today")
+
+    assert result["response"] == "Answer to how do solar panels make electricity"
+    assert result["query"] == "how do solar panels make electricity today"
+    assert cache.get("what did the roman empire trade") is None
+    assert cache.stats["semantic_hits"] == 1
+
+
+def test_entries_expire_after_the_ttl() -> None:
+    """An entry older than the TTL is neither an exact nor a semantic hit."""
+    cache = ResponseCache(embed=embed, ttl_seconds=0.05)
+    cache.put("what is solar power", make_result("what is solar power"))
+    cache.put_research("what is solar power", "Research Findings:\n- Sunlight.")
+    time.sleep(0.1)
+
+    assert cache.get("what is solar power") is None
+    assert cache.get_research("what is solar power") is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    """Beyond `max_entries`, the entry used longest ago is dropped."""
+    cache = ResponseCache(semantic=False, max_entries=2)
+    cache.put("first", make_result("first"))
+    cache.put("second", make_result("second"))
+    cache.get("first")  # now "second" is the least recently used
+    cache.put("third", make_result("third"))
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_persistence_writes_in_the_background_and_reloads(tmp_path: Path) -> None:
+    """`put` does not write the file; the save timer (or `flush`) does, and a new cache reloads it."""
+    path = tmp_path / "cache.json"
+    cache = ResponseCache(embed=embed, path=path, save_delay=60.0)
+    cache.put("what is solar power", make_result("what is solar power"))
+    cache.put_research("what is solar power", "Research Findings:\n- Sunlight.")
+    assert not path.exists()
+
+    cache.flush()
+    reloaded = ResponseCache(embed=embed, path=path, similarity_threshold=0.8)
+
+    assert reloaded.get("what is solar power")["response"] == "Answer to what is solar power"
+    assert reloaded.get_research("what is solar power today") == "Research Findings:\n- Sunlight."
+
+    timed = ResponseCache(embed=embed, path=tmp_path / "timed.json", save_delay=0.01)
+    timed.put("what is wind power", make_result("what is wind power"))
+    deadline = time.monotonic() + 5
+    while not (tmp_path / "timed.json").exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ResponseCache(embed=embed, path=tmp_path / "timed.json").get("what is wind power") is not None
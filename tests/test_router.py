@@ -0,0 +1,108 @@
+"""Tests for the local embedding router and the Orchestrator's LLM fallback, with a bag-of-words stub embedder."""
+
+import time
+import zlib
+from collections.abc import Iterator
+
+import benchmark
+import llm_registry
+import numpy as np
+import pytest
+from fake_llm import FakeChatModel
+from orchestrator import Orchestrator
+from router import DEFAULT_ROUTE_AUDIT_RATE, EmbeddingRouter
+
+DIMENSIONS = 4096
+EXAMPLES = {
+    "direct": ["hello there friend", "hello good friend", "thanks friend"],
+    "research_and_write": ["explain quantum physics", "explain solar energy physics", "explain quantum energy"],
+}
+CONFIDENT_DIRECT = "hello friend"
+UNCERTAIN = "describe the weather"
+PIPELINE_CALLS = 3  # routing, research and writer
+
+
+def embed(texts: list[str]) -> np.ndarray:
+    """Embed texts as normalized bags of hashed words."""
+    vectors = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[row, zlib.crc32(word.encode()) % DIMENSIONS] += 1.0
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+def unavailable(_: list[str]) -> np.ndarray:
+    """Fail like an embedder whose model is not installed."""
+    message = "No module named 'sentence_transformers'"
+    raise ImportError(message)
+
+
+@pytest.fixture
+def fake_model() -> Iterator[FakeChatModel]:
+    """Make every agent use an instant fake model (its routing reply is "research_and_write")."""
+    model = benchmark.install_fake_model(latency=0.0, tokens_per_second=0.0)
+    yield model
+    llm_registry.set_llm_factory(None)
+
+
+def test_router_picks_the_nearest_route_and_flags_low_confidence() -> None:
+    """Queries near one route's examples are confident; a query near neither falls back."""
+    router = EmbeddingRouter(EXAMPLES, embed)
+
+    assert router.route(CONFIDENT_DIRECT) == ("direct", True)
+    assert router.route("explain quantum physics please") == ("research_and_write", True)
+    assert router.route(UNCERTAIN)[1] is False
+    assert router.classify(UNCERTAIN)[1] < router.min_confidence
+    assert (router.stats["local"], router.stats["fallback"]) == (2, 1)
+
+
+def test_router_tracks_overall_and_audited_accuracy() -> None:
+    """Audited confident decisions are counted apart from the fallbacks."""
+    router = EmbeddingRouter(EXAMPLES, embed)
+
+    router.record(UNCERTAIN, "direct", "research_and_write")
+    router.record(CONFIDENT_DIRECT, "direct", "direct", audit=True)
+
+    assert router.accuracy == 0.5  # noqa: PLR2004
+    assert router.audited_accuracy == 1.0
+    assert DEFAULT_ROUTE_AUDIT_RATE > 0
+
+
+def test_orchestrator_routes_locally_and_falls_back_to_the_llm(fake_model: FakeChatModel) -> None:
+    """A confident query skips the routing LLM call; an uncertain one is routed by the LLM and recorded."""
+    router = EmbeddingRouter(EXAMPLES, embed)
+    orch = Orchestrator(router=router, route_audit_rate=0.0)
+
+    direct = orch.run(CONFIDENT_DIRECT)
+    calls_after_direct = fake_model.stats["calls"]
+    routed = orch.run(UNCERTAIN)
+
+    assert direct["route"] == "direct"
+    assert calls_after_direct == 1
+    assert routed["route"] == "research_and_write"
+    assert fake_model.stats["calls"] - calls_after_direct == PIPELINE_CALLS
+    assert router.stats["compared"] == 1
+
+
+def test_orchestrator_audits_confident_decisions_in_the_background(fake_model: FakeChatModel) -> None:
+    """With an audit rate of 1, every confident decision is also checked against the LLM."""
+    router = EmbeddingRouter(EXAMPLES, embed)
+    orch = Orchestrator(router=router, route_audit_rate=1.0)
+
+    assert orch.run(CONFIDENT_DIRECT)["route"] == "direct"
+    deadline = time.monotonic() + 5
+    while router.stats["audited"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert router.stats["audited"] == 1
+    assert router.audited_accuracy == 0.0  # the fake routing LLM always says "research_and_write"
+    assert fake_model.stats["calls"] == 2  # noqa: PLR2004
+
+
+def test_orchestrator_routes_with_the_llm_when_the_router_is_unavailable(fake_model: FakeChatModel) -> None:
+    """An embedder that cannot load disables the local router instead of failing the query."""
+    orch = Orchestrator(router=EmbeddingRouter(EXAMPLES, unavailable))
+
+    assert orch.run(CONFIDENT_DIRECT)["route"] == "research_and_write"
+    assert orch.router is None
+    assert fake_model.stats["calls"] == PIPELINE_CALLS
@@ -0,0 +1,125 @@
+"""Tests for the opt-in profiling of FastMCP tool handlers."""
+
+import asyncio
+import json
+import os
+import pstats
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from agenticai_foundations_to_advanced.tool_profiler import ToolProfiler, register_admin_tools
+
+SLOW_TOOL_CALLS = 3
+ROOT = Path(__file__).resolve().parent.parent
+
+# List the example server's tools, optionally as if the project package were not installed
+LIST_SERVER_TOOLS = """
+import asyncio, sys
+if sys.argv[1] == "without-package":
+    sys.modules["agenticai_foundations_to_advanced"] = None
+import my_server
+print(",".join(sorted(tool.name for tool in asyncio.run(my_server.server.list_tools()))))
+"""
+
+
+def make_server(profiler: ToolProfiler) -> FastMCP:
+    """Build a server with one profiled tool whose duration is an argument."""
+    server = FastMCP(name="Profiled Server")
+
+    def busy_wait(seconds: float) -> None:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    @server.tool()
+    @profiler.profile
+    def slow_tool(seconds: float, label: str = "") -> str:
+        """Spin for a number of seconds."""
+        busy_wait(seconds)
+        return f"{label} done"
+
+    register_admin_tools(server, profiler)
+    return server
+
+
+def call(server: FastMCP, name: str, arguments: dict) -> str:
+    """Call a tool through the server and return its text result."""
+    content, _ = asyncio.run(server.call_tool(name, arguments))
+    return content[0].text
+
+
+def test_profiling_is_off_until_configured(tmp_path: Path) -> None:
+    """A disabled profiler records nothing; the admin tool switches it on."""
+    profiler = ToolProfiler(output_dir=tmp_path)
+    server = make_server(profiler)
+
+    assert call(server, "slow_tool", {"seconds": 0.0, "label": "a"}) == "a done"
+    assert profiler.timings == {}
+
+    call(server, "profiling_configure", {"sample_rate": 1.0, "keep": 2})
+    call(server, "slow_tool", {"seconds": 0.0})
+
+    assert profiler.enabled
+    assert profiler.timings["slow_tool"]["calls"] == 1
+
+
+def test_cprofile_keeps_slowest_calls_and_dumps_pstats(tmp_path: Path) -> None:
+    """Only the slowest calls are kept, with their arguments, and dumped as loadable pstats files."""
+    profiler = ToolProfiler(sample_rate=1.0, keep=2, output_dir=tmp_path)
+    server = make_server(profiler)
+
+    for seconds in (0.01, 0.05, 0.001, 0.03):
+        call(server, "slow_tool", {"seconds": seconds, "label": "x"})
+    directory = profiler.dump()
+
+    slowest = profiler.slowest()
+    assert [profile.arguments["seconds"] for profile in slowest] == ["0.05", "0.03"]
+    index = json.loads((directory / "index.json").read_text(encoding="utf-8"))
+    assert [entry["arguments"]["label"] for entry in index] == ["'x'", "'x'"]
+    stats = pstats.Stats(str(directory / index[0]["file"]))
+    assert any(function == "busy_wait" for _, _, function in stats.stats)  # type: ignore[attr-defined]
+    assert "busy_wait" in profiler.report()
+
+
+def test_stack_sampler_dumps_collapsed_stacks(tmp_path: Path) -> None:
+    """The sampler records handler-rooted stacks in the collapsed format used by flamegraph tools."""
+    profiler = ToolProfiler(sample_rate=1.0, mode="sample", output_dir=tmp_path, sample_interval=0.001)
+    server = make_server(profiler)
+
+    for _ in range(SLOW_TOOL_CALLS):
+        call(server, "slow_tool", {"seconds": 0.05})
+    directory = profiler.dump()
+
+    lines = next(directory.glob("*.folded")).read_text(encoding="utf-8").splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.split(";")[0].endswith(":make_server.<locals>.slow_tool")
+    assert any(line.split(" ")[0].endswith("busy_wait") for line in lines)
+    assert int(count) > 0
+    assert len(profiler.slowest()) == SLOW_TOOL_CALLS
+
+
+@pytest.mark.parametrize(
+    ("package", "admin", "expected_admin_tools"),
+    [("with-package", "0", False), ("with-package", "1", True), ("without-package", "1", False)],
+)
+def test_example_server_adds_admin_tools_only_on_request(package: str, admin: str, *, expected_admin_tools: bool) -> None:
+    """The example server runs without the project package, and lists the profiling tools only with MCP_PROFILE_ADMIN=1."""
+    env = {**os.environ, "MCP_PROFILE_ADMIN": admin, "PYTHONPATH": os.pathsep.join([str(ROOT / "mcp_server"), str(ROOT / "src")])}
+    process = subprocess.run(  # noqa: S603
+        [sys.executable, "-W", "ignore", "-c", LIST_SERVER_TOOLS, package],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    tools = process.stdout.strip().split(",")
+
+    assert {"greet", "add", "multiply", "current_time"} <= set(tools)
+    assert ("profiling_report" in tools) is expected_admin_tools
+    # Asking for profiling without the package that provides it is not silently ignored
+    assert ("profiling needs the project package" in process.stderr) is (package == "without-package")